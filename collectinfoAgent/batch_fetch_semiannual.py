@@ -7,12 +7,48 @@ import sys
 import os
 import time
 import json
+import argparse
+import socket
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.sources.cninfo import fetch_semiannual_reports
+from src.config import load_config, AppCfg
+from src.http_client import configure_http
+from src.parsers.pdf_parser import configure_pdf_cache
+from src.sources.cninfo import iter_semiannual_reports, crawl_summary
+from src.sinks import open_sink, JsonlSink
+from src.storage import WatermarkStore, HoldingsStore
+from src.pipeline import parse_reports, parse_report
+from src import metrics
+from src.fulltext import ReportTextIndex
+from src.job_queue import JobQueue
+from src.extract import holding_rows, ShareholderRow
+from src.names import NameMatcher
+from src.rules import RulesEngine
 
-def batch_fetch_semiannual_reports():
+def store_parsed(batch, text_index, holdings=None, matcher=None):
+    """解析结果写入全文索引；holdings 不为空时，关注投资人（matcher，默认内置名单）在前十大股东表中的记录直接写入持仓库"""
+    text_index.add_many(batch)
+    if holdings is not None:
+        matcher = matcher or NameMatcher.from_config(None)
+        holdings.insert_many(
+            row for result in batch for row in holding_rows(result['shareholders'], result, matcher)
+        )
+
+def unindexed(reports, text_index, batch_size=100):
+    """按批查询全文索引，跳过已入索引的报告（每批一次查询，而不是每份报告一次）"""
+    batch = []
+    for report in reports:
+        batch.append(report)
+        if len(batch) >= batch_size:
+            todo = set(text_index.missing(r['url_path'] for r in batch))
+            yield from (r for r in batch if r['url_path'] in todo)
+            batch = []
+    if batch:
+        todo = set(text_index.missing(r['url_path'] for r in batch))
+        yield from (r for r in batch if r['url_path'] in todo)
+
+def batch_fetch_semiannual_reports(watermarks=None, fmt="json"):
     """批量获取半年报数据"""
     print("开始批量获取2025年半年报数据...")
     print("目标：获取约6000只股票的半年报")
@@ -20,72 +56,384 @@ def batch_fetch_semiannual_reports():
     
     start_time = time.time()
     
+    reports = []
     try:
-        # 获取半年报数据
-        reports = fetch_semiannual_reports(
+        # 获取半年报数据；中途出错时保留已获取的部分，照常保存
+        for report in iter_semiannual_reports(
             page_size=100,      # 每页100条
             max_pages=60,      # 最多60页
-            max_total=6000     # 最多6000份报告
-        )
-        
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        
-        print(f"获取完成！")
-        print(f"成功获取 {len(reports)} 份半年报")
-        print(f"耗时: {elapsed_time:.2f} 秒")
-        print("=" * 60)
-        
-        # 统计信息
-        sse_count = len([r for r in reports if r['column'] == 'sse'])
-        szse_count = len([r for r in reports if r['column'] == 'szse'])
-        
-        print(f"上交所报告: {sse_count} 份")
-        print(f"深交所报告: {szse_count} 份")
-        print("=" * 60)
-        
-        # 显示前10份报告信息
-        print("前10份报告信息：")
-        for i, report in enumerate(reports[:10]):
-            print(f"{i+1:2d}. {report['title'][:50]}...")
-            print(f"     交易所: {report['column']}")
-            print(f"     PDF链接: {report['pdf_url']}")
-            print()
-        
-        # 保存结果到文件
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"data/semiannual_reports_{timestamp}.json"
-        
-        # 确保目录存在
-        os.makedirs("data", exist_ok=True)
-        
+            max_total=6000,    # 最多6000份报告
+            concurrency=8,     # 并发抓取列表页
+            watermarks=watermarks
+        ):
+            reports.append(report)
+    except Exception as e:
+        print(f"获取过程中出现错误: {e}（已获取 {len(reports)} 份，保存已获取部分）")
+    
+    end_time = time.time()
+    elapsed_time = end_time - start_time
+    
+    print(f"获取完成！")
+    print(f"成功获取 {len(reports)} 份半年报")
+    print(f"耗时: {elapsed_time:.2f} 秒")
+    print("=" * 60)
+    
+    # 统计信息
+    sse_count = len([r for r in reports if r['column'] == 'sse'])
+    szse_count = len([r for r in reports if r['column'] == 'szse'])
+    
+    print(f"上交所报告: {sse_count} 份")
+    print(f"深交所报告: {szse_count} 份")
+    print("=" * 60)
+    
+    # 显示前10份报告信息
+    print("前10份报告信息：")
+    for i, report in enumerate(reports[:10]):
+        print(f"{i+1:2d}. {report['title'][:50]}...")
+        print(f"     交易所: {report['column']}")
+        print(f"     PDF链接: {report['pdf_url']}")
+        print()
+    
+    # 保存结果到文件
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f"data/semiannual_reports_{timestamp}.{fmt}"
+    
+    # 确保目录存在
+    os.makedirs("data", exist_ok=True)
+    
+    if fmt in ("parquet", "jsonl"):
+        # parquet 为列式文件：按行组写入，下游可内存映射并按交易所/股票代码过滤
+        with open_sink(output_file, fmt) as sink:
+            for report in reports:
+                sink.write(report)
+    else:
         # 保存JSON文件
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(reports, f, ensure_ascii=False, indent=2)
-        
-        print(f"结果已保存到: {output_file}")
-        
-        # 生成简单的统计报告
-        stats_file = f"data/semiannual_stats_{timestamp}.txt"
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            f.write("2025年半年报获取统计报告\n")
-            f.write("=" * 40 + "\n")
-            f.write(f"获取时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"总报告数: {len(reports)}\n")
-            f.write(f"上交所报告: {sse_count}\n")
-            f.write(f"深交所报告: {szse_count}\n")
-            f.write(f"获取耗时: {elapsed_time:.2f} 秒\n")
-            f.write("\n报告列表:\n")
-            for i, report in enumerate(reports):
-                f.write(f"{i+1:4d}. {report['title']}\n")
-        
-        print(f"统计报告已保存到: {stats_file}")
-        
-        return reports
-        
+    
+    print(f"结果已保存到: {output_file}")
+    
+    # 生成简单的统计报告
+    stats_file = f"data/semiannual_stats_{timestamp}.txt"
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write("2025年半年报获取统计报告\n")
+        f.write("=" * 40 + "\n")
+        f.write(f"获取时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"总报告数: {len(reports)}\n")
+        f.write(f"上交所报告: {sse_count}\n")
+        f.write(f"深交所报告: {szse_count}\n")
+        f.write(f"获取耗时: {elapsed_time:.2f} 秒\n")
+        _write_crawl_summary(f)
+        f.write("\n报告列表:\n")
+        for i, report in enumerate(reports):
+            f.write(f"{i+1:4d}. {report['title']}\n")
+    
+    print(f"统计报告已保存到: {stats_file}")
+    
+    return reports
+
+def _write_crawl_summary(f):
+    """写入列表页失败与HTTP重试统计，失败页逐条列出便于补抓"""
+    summary = crawl_summary()
+    http = summary["http"]
+    f.write(f"失败页数: {summary.get('dropped_pages', 0)}\n")
+    f.write(f"HTTP请求: {http.get('requests', 0)}，重试: {http.get('retries', 0)}，限流(429): {http.get('rate_limited', 0)}\n")
+    for column, cat, page_num, error in summary["dropped"]:
+        f.write(f"  失败页 {column}/{cat} 第{page_num}页: {error}\n")
+    if summary.get('dropped_pages'):
+        print(f"警告: {summary['dropped_pages']} 个列表页重试后仍失败，详见统计报告")
+
+def stream_fetch_semiannual_reports(watermarks=None, parse=False, workers=None, text_index=None, fmt="jsonl", holdings=None, matcher=None):
+    """流式获取半年报数据：边抓取边写入JSONL（fmt="parquet" 时按行组写入Parquet），内存占用不随报告数量增长
+    
+    parse=True 时列表边抓取边送入进程池下载解析，解析文本写入全文索引 text_index，
+    前十大股东表中关注投资人（matcher）的持仓写入 holdings；
+    已在索引中的报告直接跳过，不再下载解析
+    """
+    print("开始流式获取2025年半年报数据...")
+    print("=" * 60)
+    
+    start_time = time.time()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f"data/semiannual_reports_{timestamp}.{fmt}"
+    
+    sink = open_sink(output_file, fmt)
+    
+    def listed():
+        for report in iter_semiannual_reports(
+            page_size=100,
+            max_pages=60,
+            max_total=6000,
+            concurrency=8,
+            watermarks=watermarks
+        ):
+            sink.write(report)
+            if sink.total <= 10:
+                print(f"{sink.total:2d}. {report['title'][:50]}...")
+            elif sink.total % 500 == 0:
+                print(f"已获取 {sink.total} 份...")
+            yield report
+    
+    parsed_ok = parsed_failed = 0
+    try:
+        if parse:
+            to_parse = unindexed(listed(), text_index)
+            batch = []
+            for result in parse_reports(to_parse, workers=workers):
+                if result['ok']:
+                    parsed_ok += 1
+                    batch.append(result)
+                    if len(batch) >= 50:
+                        store_parsed(batch, text_index, holdings, matcher)
+                        batch = []
+                else:
+                    parsed_failed += 1
+                    print(f"解析失败: {result['title']} ({result['error']})")
+            if batch:
+                store_parsed(batch, text_index, holdings, matcher)
+        else:
+            for _ in listed():
+                pass
     except Exception as e:
-        print(f"获取过程中出现错误: {e}")
+        print(f"获取过程中出现错误: {e}（已写入 {sink.total} 份）")
+    finally:
+        sink.close()
+    
+    elapsed_time = time.time() - start_time
+    sse_count = sink.column_counts['sse']
+    szse_count = sink.column_counts['szse']
+    
+    print("=" * 60)
+    print(f"成功获取 {sink.total} 份半年报")
+    print(f"上交所报告: {sse_count} 份")
+    print(f"深交所报告: {szse_count} 份")
+    if parse:
+        print(f"解析成功: {parsed_ok} 份，失败: {parsed_failed} 份")
+    print(f"耗时: {elapsed_time:.2f} 秒")
+    print(f"结果已保存到: {output_file}")
+    
+    stats_file = f"data/semiannual_stats_{timestamp}.txt"
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write("2025年半年报获取统计报告\n")
+        f.write("=" * 40 + "\n")
+        f.write(f"获取时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"总报告数: {sink.total}\n")
+        f.write(f"上交所报告: {sse_count}\n")
+        f.write(f"深交所报告: {szse_count}\n")
+        f.write(f"获取耗时: {elapsed_time:.2f} 秒\n")
+        _write_crawl_summary(f)
+        f.write(f"报告列表: {output_file}\n")
+    
+    print(f"统计报告已保存到: {stats_file}")
+    
+    return {"total": sink.total, "sse": sse_count, "szse": szse_count, "output_file": output_file}
+
+def queue_fetch_semiannual_reports(queue, text_index, worker_id, shard=0, num_shards=1, workers=None, skip_listing=False, watermarks=None, holdings=None, matcher=None):
+    """基于任务队列的可断点续跑模式：列表登记入队，各 worker 按分片领取任务，下载解析后写入全文索引
+    
+    进度全部记录在队列库中，进程中断后重新运行即从上次停下的地方继续；
+    多个进程/机器可共享同一队列库，用 shard/num_shards 各领一片（只需一个进程负责列表，其余加 skip_listing）
+    
+    每次运行都会重新翻列表：未传 watermarks 时使用队列库中的水位线，只翻到上次列表之后的新公告，
+    因此同一队列库可反复运行以补充新披露的报告（已登记的报告不会重复入队）
+    """
+    print(f"任务队列模式: worker={worker_id} 分片={shard}/{num_shards}")
+    print("=" * 60)
+    start_time = time.time()
+    
+    resumed = queue.release(worker_id)
+    if resumed:
+        print(f"收回上次中断时未完成的任务: {resumed} 份")
+    
+    if not skip_listing:
+        watermarks = watermarks or WatermarkStore(queue.path)
+        last_listing = queue.get_meta("last_listing")
+        if last_listing:
+            print(f"上次列表登记: {last_listing}，本次只登记之后的新公告")
+        listed = 0
+        try:
+            # 逐条入队：某个组合的水位线在翻到下一组合时才前移，此前它的公告都已入队，中断也不会漏登记
+            for report in iter_semiannual_reports(page_size=100, max_pages=60, max_total=6000, concurrency=8, watermarks=watermarks):
+                listed += queue.enqueue_many([report])
+            queue.set_meta("last_listing", datetime.now().isoformat())
+        except Exception as e:
+            # 列表未完成：该组合水位线不前移，已登记的任务照常处理，下次运行重新翻页补齐（重复记录不会重复入队）
+            print(f"列表获取出错: {e}，先处理已登记的任务")
+        print(f"列表登记完成，新增 {listed} 份")
+    
+    workers = workers or os.cpu_count() or 1
+    stored = failed = 0
+    
+    def claimed():
+        # 进程池有空位时才领取下一批，租约只覆盖即将处理的任务；
+        # 从 parsed 恢复的任务直接用暂存的解析结果写库
+        nonlocal stored
+        while True:
+            jobs = queue.claim(worker_id, limit=workers, shard=shard, num_shards=num_shards)
+            if not jobs:
+                return
+            resumed = []
+            todo = set(text_index.missing(job["url_path"] for job in jobs))
+            for job in jobs:
+                saved = queue.saved_result(job["url_path"]) if job["state"] == "parsed" else None
+                if job["url_path"] not in todo:
+                    queue.advance(job["url_path"], "stored", worker_id)
+                    stored += 1
+                elif saved is not None:
+                    saved["shareholders"] = [ShareholderRow(**row) for row in saved["shareholders"]]
+                    resumed.append(saved)
+                else:
+                    yield job["report"]
+            if resumed:
+                store(resumed)
+    
+    def store(batch):
+        nonlocal stored
+        store_parsed(batch, text_index, holdings, matcher)
+        for result in batch:
+            queue.advance(result['url_path'], "stored", worker_id)
+        stored += len(batch)
+        print(f"已完成 {stored} 份，失败 {failed} 次...")
+    
+    # 失败且未超过重试次数的任务回到 pending，下一轮再领取；某一轮没有任何任务时结束
+    while True:
+        before = stored + failed
+        batch = []
+        for result in parse_reports(claimed(), workers=workers):
+            queue.renew(worker_id)
+            if result['ok']:
+                # 解析结果随 parsed 状态暂存，写库前中断也不必重新解析
+                saved = {**result, "shareholders": [row._asdict() for row in result['shareholders']]}
+                queue.advance(result['url_path'], "parsed", worker_id, result=saved)
+                batch.append(result)
+                # 解析文本只在写入索引后才算落盘，小批量写入减少中断时需要重做的份数
+                if len(batch) >= 10:
+                    store(batch)
+                    batch = []
+            else:
+                queue.fail(result['url_path'], worker_id, result['error'] or "unknown error")
+                failed += 1
+                print(f"解析失败: {result['title']} ({result['error']})")
+        if batch:
+            store(batch)
+        if stored + failed == before:
+            break
+    
+    counts = queue.counts()
+    print("=" * 60)
+    print(f"本 worker 完成 {stored} 份，失败 {failed} 次，耗时 {time.time() - start_time:.2f} 秒")
+    print(f"队列状态: 完成 {counts.get('done', 0)}，待处理 {counts.get('pending', 0)}，处理中 {counts.get('leased', 0)}，放弃 {counts.get('failed', 0)}")
+    for item in queue.failures(limit=10):
+        print(f"  放弃: {item['url_path']}（{item['attempts']} 次，{item['error']}）")
+    return counts
+
+def report_alerts(holdings, engine):
+    """对比持仓库中最近两个报告期的持仓变动，按配置规则筛出提醒写入 data/alerts_*.jsonl"""
+    if not engine.rules:
+        print("未配置 rules.notify_on，跳过持仓变动提醒")
         return []
+    periods = holdings.periods()
+    if len(periods) < 2:
+        print("持仓库中不足两个报告期，跳过持仓变动提醒")
+        return []
+    prev, curr = periods[-2], periods[-1]
+    alerts = engine.alerts(holdings.diff_periods(prev, curr))
+    alerts_file = f"data/alerts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    with JsonlSink(alerts_file) as sink:
+        for alert in alerts:
+            sink.write(alert)
+    print(f"持仓变动提醒（{prev} → {curr}）: {len(alerts)} 条，已保存到: {alerts_file}")
+    for alert in alerts[:10]:
+        print(f"  {alert['investor']} {alert['stock_name']}({alert['stock_code']}): {alert['change_type']} {alert['prev_shares']} → {alert['shares']}")
+    return alerts
+
+def write_run_metrics(mode, started_at):
+    """输出本次运行的分阶段指标：JSON 汇总 + Prometheus 文本，并打印各阶段耗时合计"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_file = f"data/run_metrics_{timestamp}.json"
+    crawl = crawl_summary()
+    metrics.REGISTRY.write_summary(summary_file, {
+        "mode": mode,
+        "elapsed_seconds": time.time() - started_at,
+        "dropped_pages": crawl.get("dropped_pages", 0),
+    })
+    metrics.REGISTRY.write_prometheus("data/run_metrics.prom")
+    reg = metrics.REGISTRY
+    print("分阶段耗时合计（并发阶段为各线程/进程累计）:")
+    print(f"  列表翻页: {reg.total('list_page_seconds'):.2f} 秒（{reg.total('list_pages_total'):.0f} 页）")
+    print(f"  PDF下载: {reg.total('pdf_download_seconds'):.2f} 秒（{reg.total('pdf_download_bytes') / 1024 / 1024:.1f} MB）")
+    print(f"  PDF解析: {reg.total('document_parse_seconds'):.2f} 秒（{reg.total('pdf_page_parse_seconds'):.2f} 秒为逐页提取）")
+    print(f"  写库: {reg.total('db_write_seconds'):.2f} 秒")
+    hits, misses = reg.total('pdf_cache_hits_total'), reg.total('pdf_cache_misses_total')
+    if hits + misses:
+        print(f"  PDF缓存: 命中 {hits:.0f} / {hits + misses:.0f}（{hits / (hits + misses):.0%}），节省下载 {reg.total('pdf_cache_bytes_saved_total') / 1024 / 1024:.1f} MB")
+    print(f"运行指标已保存到: {summary_file}")
 
 if __name__ == "__main__":
-    batch_fetch_semiannual_reports()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="批量获取半年报数据")
+    parser.add_argument("--stream", action="store_true", help="流式写入JSONL（内存占用恒定）")
+    parser.add_argument("--incremental", action="store_true", help="增量抓取，只获取上次运行之后的新公告")
+    parser.add_argument("--config", default="config.yaml", help="配置文件路径（HTTP限速/重试、PDF缓存、持仓库位置）")
+    parser.add_argument("--db", default=None, help="保存水位线、全文索引和持仓记录的SQLite文件（默认取配置 storage.sqlite_path）")
+    parser.add_argument("--parse", action="store_true", help="流式模式下同时用进程池下载解析PDF，写入全文索引和前十大股东持仓")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数（默认CPU核数）")
+    parser.add_argument("--format", choices=["json", "jsonl", "parquet"], default=None,
+                        help="公告记录输出格式：批量模式默认json，流式模式默认jsonl（不支持json）；parquet为列式文件（需要pyarrow）")
+    parser.add_argument("--queue", default=None, help="任务队列SQLite文件：启用可断点续跑、可分片的下载解析模式（如 data/jobs.db）")
+    parser.add_argument("--shard", default="0/1", help="队列模式下本进程处理的分片，格式 i/n")
+    parser.add_argument("--worker-id", default=None, help="队列模式下的 worker 标识，重启时保持不变即可立即接续（默认 主机名-分片号）")
+    parser.add_argument("--skip-listing", action="store_true", help="队列模式下不抓取列表，只处理已登记的任务（用于额外的 worker）")
+    parser.add_argument("--retry-failed", action="store_true", help="队列模式下把已放弃的任务重新置为待处理")
+    parser.add_argument("--profile-url", default=None, help="只对这一份PDF做 cProfile 剖析（下载+解析），结果写入 data/profile_document.prof")
+    parser.add_argument("--search", default=None, help="在已解析报告的全文索引中检索关键词（如投资人姓名），不抓取不解析")
+    parser.add_argument("--limit", type=int, default=100, help="--search 最多返回的报告数")
+    args = parser.parse_args()
+    if os.path.exists(args.config):
+        cfg = load_config(args.config)
+    else:
+        print(f"未找到配置文件 {args.config}，使用默认配置")
+        cfg = AppCfg()
+    configure_http(**cfg.http.model_dump())
+    configure_pdf_cache(cfg.storage.pdf_cache_dir, cfg.storage.pdf_cache_max_mb * 1024 * 1024, cfg.storage.pdf_cache_enabled)
+    args.db = args.db or cfg.storage.sqlite_path
+    # 持仓抽取按配置中的投资人及别名匹配（未配置时用内置名单）
+    matcher = NameMatcher.from_config(cfg.investors)
+    if args.profile_url:
+        item = {"pdf_url": args.profile_url, "url_path": args.profile_url, "title": args.profile_url}
+        result, report = metrics.profile_call(parse_report, item, out_path="data/profile_document.prof")
+        print(report)
+        print(f"解析{'成功' if result['ok'] else '失败: ' + str(result['error'])}，耗时 {result['elapsed']:.2f} 秒")
+        sys.exit(0)
+    if args.search:
+        text_index = ReportTextIndex(args.db)
+        hits = text_index.search(args.search, limit=args.limit)
+        print(f"全文索引共 {text_index.count()} 份报告，包含“{args.search}”的 {len(hits)} 份:")
+        for hit in hits:
+            print(f"  [{hit['column']}] {hit['title']}  {hit['url_path']}")
+        sys.exit(0)
+    started_at = time.time()
+    watermarks = WatermarkStore(args.db) if args.incremental else None
+    if args.queue:
+        shard, num_shards = (int(x) for x in args.shard.split("/"))
+        queue = JobQueue(args.queue)
+        if args.retry_failed:
+            print(f"重置放弃的任务: {queue.retry_failed()} 份")
+        queue_fetch_semiannual_reports(
+            queue, ReportTextIndex(args.db), args.worker_id or f"{socket.gethostname()}-{shard}",
+            shard=shard, num_shards=num_shards, workers=args.workers, skip_listing=args.skip_listing, watermarks=watermarks,
+            holdings=HoldingsStore(args.db), matcher=matcher,
+        )
+        queue.close()
+        report_alerts(HoldingsStore(args.db), RulesEngine(cfg.rules))
+    elif args.stream or args.parse:
+        if args.format == "json":
+            parser.error("流式模式不支持 --format json（JSON 数组无法边抓取边写入），请使用 jsonl 或 parquet")
+        text_index = ReportTextIndex(args.db) if args.parse else None
+        holdings = HoldingsStore(args.db) if args.parse else None
+        fmt = args.format or "jsonl"
+        stream_fetch_semiannual_reports(watermarks, parse=args.parse, workers=args.workers, text_index=text_index, fmt=fmt, holdings=holdings, matcher=matcher)
+        if holdings is not None:
+            report_alerts(holdings, RulesEngine(cfg.rules))
+    else:
+        batch_fetch_semiannual_reports(watermarks, fmt=args.format or "json")
+    write_run_metrics("queue" if args.queue else ("parse" if args.parse else ("stream" if args.stream else "batch")), started_at)
\ No newline at end of file
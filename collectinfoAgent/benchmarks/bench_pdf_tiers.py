@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PDF分级提取对比基准：pdfplumber 全量提取 vs PyPDF2 快速层 + pdfplumber 升级
+
+对每份PDF分别运行两种提取方式，统计吞吐（页/秒）、
+各级处理的页数，以及两种结果的一致性：
+- 正文一致性：逐页比较去空白后的字符多重集合（交集字符数 / 并集字符数）。
+  PyPDF2 按内容流顺序输出、pdfplumber 按版面位置排序，页眉页脚等的先后会不同，
+  因此不比较字符顺序；丢字、乱码、多出的字符都会拉低该值
+- 表格一致性：全量提取得到的表格文本在分级结果中出现的比例
+
+任一页正文一致性低于 --min-text-agreement（默认 0.98）或表格一致性低于
+--min-table-agreement（默认 1.0）时列出对应页并以退出码 1 结束，可作为回归门禁。
+
+默认使用 synthetic_pdf.py 生成的合成半年报，无需准备样本；真实报告可下载若干份
+（如 batch_fetch_semiannual.py 抓到的 pdf_url）放入一个目录后用 --corpus 指定。
+
+用法：
+    python benchmarks/bench_pdf_tiers.py
+    python benchmarks/bench_pdf_tiers.py --corpus data/sample_pdfs
+"""
+
+import sys
+import os
+import time
+import json
+import argparse
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.parsers.pdf_parser import extract_pages, extract_pages_tiered
+
+
+MIN_TEXT_AGREEMENT = 0.98
+MIN_TABLE_AGREEMENT = 1.0
+
+
+def _chars(text):
+    return Counter("".join(text.split()))
+
+
+def text_agreement(a, b):
+    ca, cb = _chars(a), _chars(b)
+    union = sum((ca | cb).values())
+    if not union:
+        return 1.0
+    return sum((ca & cb).values()) / union
+
+
+def table_agreement(full_pages, tiered_pages):
+    expected = [t for p in full_pages for t in p["tables"]]
+    if not expected:
+        return 1.0
+    got = set(t for p in tiered_pages for t in p["tables"])
+    return sum(1 for t in expected if t in got) / len(expected)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def bench_file(name, data, repeat, min_text_agreement=MIN_TEXT_AGREEMENT):
+    full_time = tiered_time = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        full = extract_pages(data)
+        full_time += time.perf_counter() - start
+        start = time.perf_counter()
+        tiered = extract_pages_tiered(data)
+        tiered_time += time.perf_counter() - start
+    full_text = "\n".join(p["text"] for p in full)
+    tiered_text = "\n".join(p["text"] for p in tiered)
+    page_agreement = [(f["page"], text_agreement(f["text"], t["text"]), t["tier"]) for f, t in zip(full, tiered)]
+    return {
+        "file": name,
+        "pages": len(full),
+        "full_seconds": full_time / repeat,
+        "tiered_seconds": tiered_time / repeat,
+        "tiers": dict(Counter(f"{p['tier']}:{p['reason']}" for p in tiered)),
+        "text_agreement": text_agreement(full_text, tiered_text),
+        "min_page_agreement": min((a for _, a, _ in page_agreement), default=1.0),
+        "low_pages": [{"page": n, "agreement": a, "tier": tier} for n, a, tier in page_agreement if a < min_text_agreement],
+        "table_agreement": table_agreement(full, tiered),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF分级提取对比基准")
+    parser.add_argument("--corpus", default=None, help="样本PDF目录（默认使用合成半年报）")
+    parser.add_argument("--synthetic", type=int, default=3, help="未指定 --corpus 时生成的合成报告份数")
+    parser.add_argument("--synthetic-pages", type=int, default=120, help="合成报告页数")
+    parser.add_argument("--repeat", type=int, default=1, help="每个文件重复次数")
+    parser.add_argument("--json", dest="json_out", default=None, help="结果另存为JSON")
+    parser.add_argument("--min-text-agreement", type=float, default=MIN_TEXT_AGREEMENT,
+                        help="每页正文一致性下限，低于该值退出码为 1")
+    parser.add_argument("--min-table-agreement", type=float, default=MIN_TABLE_AGREEMENT,
+                        help="每份文件表格一致性下限，低于该值退出码为 1")
+    args = parser.parse_args()
+
+    if args.corpus is None:
+        from synthetic_pdf import build_report
+        files = [(f"synthetic_{i}.pdf", lambda i=i: build_report(args.synthetic_pages, seed=i, split_table=i % 2 == 1))
+                 for i in range(args.synthetic)]
+    else:
+        if not os.path.isdir(args.corpus):
+            print(f"样本目录不存在: {args.corpus}（不指定 --corpus 时使用合成报告）")
+            return 1
+        files = [
+            (name, lambda path=os.path.join(args.corpus, name): _read(path))
+            for name in sorted(os.listdir(args.corpus))
+            if name.lower().endswith(".pdf")
+        ]
+    if not files:
+        print(f"样本目录中没有PDF: {args.corpus}")
+        return 1
+
+    results = []
+    print(f"{'文件':<40} {'页数':>5} {'全量(秒)':>9} {'分级(秒)':>9} {'加速':>6} {'正文一致':>8} {'最低页':>8} {'表格一致':>8}")
+    for name, load in files:
+        r = bench_file(name, load(), args.repeat, args.min_text_agreement)
+        results.append(r)
+        speedup = r["full_seconds"] / r["tiered_seconds"] if r["tiered_seconds"] else 0.0
+        print(f"{r['file'][:40]:<40} {r['pages']:>5} {r['full_seconds']:>9.2f} {r['tiered_seconds']:>9.2f} "
+              f"{speedup:>5.1f}x {r['text_agreement']:>8.3f} {r['min_page_agreement']:>8.3f} {r['table_agreement']:>8.3f}")
+
+    total_pages = sum(r["pages"] for r in results)
+    full_total = sum(r["full_seconds"] for r in results)
+    tiered_total = sum(r["tiered_seconds"] for r in results)
+    tiers = Counter()
+    for r in results:
+        tiers.update(r["tiers"])
+    summary = {
+        "files": len(results),
+        "pages": total_pages,
+        "full_pages_per_second": total_pages / full_total if full_total else 0.0,
+        "tiered_pages_per_second": total_pages / tiered_total if tiered_total else 0.0,
+        "tiers": dict(tiers),
+        "mean_text_agreement": sum(r["text_agreement"] for r in results) / len(results),
+        "mean_table_agreement": sum(r["table_agreement"] for r in results) / len(results),
+        "min_page_agreement": min(r["min_page_agreement"] for r in results),
+    }
+    print("=" * 60)
+    print(f"全量吞吐: {summary['full_pages_per_second']:.1f} 页/秒")
+    print(f"分级吞吐: {summary['tiered_pages_per_second']:.1f} 页/秒")
+    print(f"各级页数: {summary['tiers']}")
+    print(f"平均正文一致性: {summary['mean_text_agreement']:.3f}")
+    print(f"平均表格一致性: {summary['mean_table_agreement']:.3f}")
+    print(f"最低单页正文一致性: {summary['min_page_agreement']:.3f}（下限 {args.min_text_agreement}）")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "files": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.json_out}")
+
+    failed = False
+    for r in results:
+        for low in r["low_pages"]:
+            failed = True
+            print(f"[不达标] {r['file']} 第 {low['page']} 页（{low['tier']}）正文一致性 {low['agreement']:.3f}")
+        if r["table_agreement"] < args.min_table_agreement:
+            failed = True
+            print(f"[不达标] {r['file']} 表格一致性 {r['table_agreement']:.3f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
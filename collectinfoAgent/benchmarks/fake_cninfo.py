@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+本地模拟巨潮接口（基准测试用，无需联网）
+
+- POST /new/hisAnnouncement/query：按 column/pageNum/pageSize 返回公告列表，
+  字段与真实接口一致（announcements / totalAnnouncement / adjunctUrl / announcementTime）；
+- GET /finalpage/...PDF：返回合成半年报PDF（见 synthetic_pdf.py），按页数缓存；
+- 列表与PDF分别可配置响应延迟，模拟真实网络往返。
+
+用法（独立运行）：
+    python benchmarks/fake_cninfo.py --port 8765 --reports 2000 --latency 0.05
+然后把 cninfo.API_URL / cninfo.PDF_BASE 指向 http://127.0.0.1:8765/ 下的对应路径。
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import build_report
+
+QUERY_PATH = "/new/hisAnnouncement/query"
+COLUMNS = ("szse", "sse")
+
+
+class FakeCninfo:
+    """在后台线程运行的模拟服务。
+
+    reports：每个交易所的公告总数（决定列表页数）；
+    list_latency / pdf_latency：每次请求的额外延迟（秒）；
+    report_pages：合成PDF的页数。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, reports: int = 500, report_pages: int = 200,
+                 list_latency: float = 0.0, pdf_latency: float = 0.0):
+        self.reports = reports
+        self.report_pages = report_pages
+        self.list_latency = list_latency
+        self.pdf_latency = pdf_latency
+        self.requests = {"query": 0, "pdf": 0}
+        self._pdf: bytes | None = None
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url.rstrip("/") + QUERY_PATH
+
+    def pdf_bytes(self) -> bytes:
+        with self._lock:
+            if self._pdf is None:
+                self._pdf = build_report(self.report_pages, "基准样本股份有限公司", seed=42)
+            return self._pdf
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def announcements(self, column: str, page_num: int, page_size: int):
+        """第 page_num 页的公告（按时间降序），每个交易所共 reports 条。"""
+        start = (page_num - 1) * page_size
+        items = []
+        offset = COLUMNS.index(column) * 1_000_000 if column in COLUMNS else 0
+        for k in range(start, min(start + page_size, self.reports)):
+            code = f"{offset + k:06d}"
+            items.append({
+                "secCode": code,
+                "secName": f"样本{code}",
+                "announcementTitle": f"样本{code}：2025年半年度报告",
+                "adjunctUrl": f"finalpage/2025-08-28/{column}{code}.PDF",
+                "announcementTime": 1756310400000 - k * 1000,
+            })
+        return items
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if self.path != QUERY_PATH:
+                    self._send(404, b"not found", "text/plain")
+                    return
+                fake.count("query")
+                if fake.list_latency:
+                    time.sleep(fake.list_latency)
+                column = (form.get("column") or ["szse"])[0]
+                page_num = int((form.get("pageNum") or ["1"])[0])
+                page_size = int((form.get("pageSize") or ["30"])[0])
+                data = {
+                    "announcements": fake.announcements(column, page_num, page_size),
+                    "totalAnnouncement": fake.reports,
+                    "hasMore": page_num * page_size < fake.reports,
+                }
+                self._send(200, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json")
+
+            def do_GET(self):
+                if not self.path.upper().endswith(".PDF"):
+                    self._send(404, b"not found", "text/plain")
+                    return
+                fake.count("pdf")
+                if fake.pdf_latency:
+                    time.sleep(fake.pdf_latency)
+                self._send(200, fake.pdf_bytes(), "application/pdf")
+
+        return Handler
+
+    def start(self) -> "FakeCninfo":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-cninfo", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟巨潮接口")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reports", type=int, default=500, help="每个交易所的公告数")
+    parser.add_argument("--report-pages", type=int, default=200, help="合成PDF页数")
+    parser.add_argument("--latency", type=float, default=0.0, help="列表接口延迟（秒）")
+    parser.add_argument("--pdf-latency", type=float, default=0.0, help="PDF下载延迟（秒）")
+    args = parser.parse_args()
+
+    fake = FakeCninfo(args.host, args.port, args.reports, args.report_pages, args.latency, args.pdf_latency)
+    print(f"列表接口: {fake.api_url}")
+    print(f"PDF地址前缀: {fake.base_url}")
+    try:
+        fake.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
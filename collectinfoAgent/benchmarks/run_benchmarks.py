@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+采集热点路径离线基准：列表翻页 → PDF下载 → PDF解析
+
+全部请求发往本地模拟服务（fake_cninfo.py），PDF为合成半年报（synthetic_pdf.py），无需联网。
+download 阶段测生产使用的 fetch_pdf_file（流式落盘），download_bytes 为整份读入内存的对照。
+每个阶段在独立子进程中运行，分别记录：
+- 吞吐（条/秒、页/秒、MB/秒）
+- 单次请求或单份文档的延迟分位数 p50 / p95 / p99
+- 子进程峰值常驻内存（ru_maxrss）
+
+传入 --baseline 时作为回归门禁：吞吐下降、p95 延迟或峰值内存上升超过 --tolerance 即返回非零退出码。
+
+用法：
+    python benchmarks/run_benchmarks.py --json benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+
+import sys
+import os
+import json
+import time
+import resource
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ("list", "download", "download_bytes", "parse")
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _summarize(name, elapsed, latencies, **throughput):
+    return {
+        "stage": name,
+        "seconds": elapsed,
+        "count": len(latencies),
+        **throughput,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        # Linux 下 ru_maxrss 单位为 KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _setup(opts):
+    from src.http_client import configure_http
+    from src.parsers.pdf_parser import configure_pdf_cache
+    from src.sources import cninfo
+    # 基准测的是本地实现，不让限速与缓存掩盖耗时
+    configure_http(default_rate=opts["rate"], burst=opts["concurrency"], max_retries=0)
+    configure_pdf_cache(enabled=False)
+    cninfo.API_URL = opts["api_url"]
+    cninfo.PDF_BASE = opts["pdf_base"]
+    return cninfo
+
+
+def bench_list(opts):
+    cninfo = _setup(opts)
+    latencies = []
+    query_page = cninfo._query_page
+
+    def timed_query(*args):
+        start = time.perf_counter()
+        try:
+            return query_page(*args)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    cninfo._query_page = timed_query
+    start = time.perf_counter()
+    records = cninfo.fetch_announcements(
+        ["semiannual"], page_size=opts["page_size"], max_pages=10_000, max_total=10 ** 9,
+        concurrency=opts["concurrency"],
+    )
+    elapsed = time.perf_counter() - start
+    return _summarize("list", elapsed, latencies,
+                      records=len(records),
+                      records_per_second=len(records) / elapsed if elapsed else 0.0,
+                      pages_per_second=len(latencies) / elapsed if elapsed else 0.0)
+
+
+def _bench_download(opts, name, fetch):
+    """并发下载 opts["downloads"] 份PDF，fetch(url) 返回下载的字节数。"""
+    urls = [f"{opts['pdf_base']}finalpage/2025-08-28/szse{k:06d}.PDF" for k in range(opts["downloads"])]
+    latencies = []
+    sizes = []
+
+    def one(url):
+        start = time.perf_counter()
+        size = fetch(url)
+        latencies.append(time.perf_counter() - start)
+        sizes.append(size)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=opts["concurrency"]) as pool:
+        list(pool.map(one, urls))
+    elapsed = time.perf_counter() - start
+    total_mb = sum(sizes) / 1024 / 1024
+    return _summarize(name, elapsed, latencies,
+                      documents=len(sizes),
+                      documents_per_second=len(sizes) / elapsed if elapsed else 0.0,
+                      mb_per_second=total_mb / elapsed if elapsed else 0.0)
+
+
+def bench_download(opts):
+    """生产路径：fetch_pdf_file 流式写入磁盘（之后以 mmap 解析）。"""
+    _setup(opts)
+    from src.parsers.pdf_parser import fetch_pdf_file
+
+    def fetch(url):
+        with fetch_pdf_file(url, use_cache=False) as path:
+            return os.path.getsize(path)
+
+    return _bench_download(opts, "download", fetch)
+
+
+def bench_download_bytes(opts):
+    """对照：fetch_pdf_bytes 整份读入内存，与 download 阶段比较吞吐和峰值内存。"""
+    _setup(opts)
+    from src.parsers.pdf_parser import fetch_pdf_bytes
+    return _bench_download(opts, "download_bytes", lambda url: len(fetch_pdf_bytes(url, use_cache=False)))
+
+
+def bench_parse(opts):
+    from synthetic_pdf import build_report
+    from src.parsers.pdf_parser import extract_text_with_tables
+    docs = [build_report(opts["report_pages"], seed=i) for i in range(opts["parse_docs"])]
+    latencies = []
+    start = time.perf_counter()
+    for data in docs:
+        t = time.perf_counter()
+        text = extract_text_with_tables(data, locate=opts["locate"])
+        latencies.append(time.perf_counter() - t)
+        if "前十名股东" not in text:
+            raise RuntimeError("解析结果缺少前十名股东表")
+    elapsed = time.perf_counter() - start
+    pages = opts["report_pages"] * len(docs)
+    return _summarize("parse", elapsed, latencies,
+                      documents=len(docs),
+                      pages_per_second=pages / elapsed if elapsed else 0.0)
+
+
+STAGE_FUNCS = {"list": bench_list, "download": bench_download, "download_bytes": bench_download_bytes, "parse": bench_parse}
+
+# 回归判定：吞吐越高越好，延迟与内存越低越好
+HIGHER_IS_BETTER = ("records_per_second", "pages_per_second", "documents_per_second", "mb_per_second")
+LOWER_IS_BETTER = ("p95_ms", "peak_rss_mb")
+
+
+def compare(results, baseline, tolerance):
+    """与基线逐项比较，返回回归项描述列表。"""
+    regressions = []
+    base_by_stage = {r["stage"]: r for r in baseline.get("stages", [])}
+    for r in results:
+        base = base_by_stage.get(r["stage"])
+        if not base:
+            continue
+        for key in HIGHER_IS_BETTER:
+            if key in r and base.get(key) and r[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{r['stage']}.{key}: {r[key]:.2f} < 基线 {base[key]:.2f}")
+        for key in LOWER_IS_BETTER:
+            if key in r and base.get(key) and r[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{r['stage']}.{key}: {r[key]:.2f} > 基线 {base[key]:.2f}")
+    return regressions
+
+
+def run_stage(name, opts):
+    # 每个阶段独立子进程，峰值内存互不影响
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(STAGE_FUNCS[name], opts).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集热点路径离线基准")
+    parser.add_argument("--stages", default=",".join(STAGES), help="要运行的阶段，逗号分隔")
+    parser.add_argument("--reports", type=int, default=3000, help="模拟服务每个交易所的公告数")
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8, help="列表翻页与下载的并发数")
+    parser.add_argument("--rate", type=float, default=1000.0, help="HTTP 客户端每主机限速（请求/秒）")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟列表接口延迟（秒）")
+    parser.add_argument("--pdf-latency", type=float, default=0.05, help="模拟PDF下载延迟（秒）")
+    parser.add_argument("--downloads", type=int, default=40, help="下载阶段的PDF份数")
+    parser.add_argument("--report-pages", type=int, default=200, help="合成PDF页数")
+    parser.add_argument("--parse-docs", type=int, default=2, help="解析阶段的PDF份数")
+    parser.add_argument("--no-locate", action="store_true", help="解析时不做股东章节定位（全页提取表格）")
+    parser.add_argument("--json", dest="json_out", default=None, help="结果另存为JSON（可作为基线）")
+    parser.add_argument("--baseline", default=None, help="基线JSON，启用回归门禁")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对退化幅度")
+    args = parser.parse_args()
+
+    from fake_cninfo import FakeCninfo
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in STAGE_FUNCS]
+    if unknown:
+        print(f"未知阶段: {unknown}")
+        return 2
+
+    fake = FakeCninfo(reports=args.reports, report_pages=args.report_pages,
+                      list_latency=args.latency, pdf_latency=args.pdf_latency)
+    opts = {
+        "api_url": fake.api_url,
+        "pdf_base": fake.base_url,
+        "page_size": args.page_size,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "downloads": args.downloads,
+        "report_pages": args.report_pages,
+        "parse_docs": args.parse_docs,
+        "locate": not args.no_locate,
+    }
+    results = []
+    with fake:
+        fake.pdf_bytes()  # 预先生成，避免计入首个下载请求
+        print(f"{'阶段':<14} {'耗时(秒)':>9} {'次数':>6} {'吞吐':>22} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'峰值内存(MB)':>12}")
+        for name in stages:
+            r = run_stage(name, opts)
+            results.append(r)
+            rate_key = next(k for k in HIGHER_IS_BETTER if k in r)
+            print(f"{name:<14} {r['seconds']:>9.2f} {r['count']:>6} {r[rate_key]:>10.1f} {rate_key:<11} "
+                  f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['peak_rss_mb']:>12.1f}")
+
+    report = {"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "options": vars(args), "stages": results}
+    if args.json_out:
+        os.makedirs(os.path.dirname(args.json_out) or ".", exist_ok=True)
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.json_out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("=" * 60)
+            print(f"性能回归（容差 {args.tolerance:.0%}）:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"未发现超过 {args.tolerance:.0%} 的性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
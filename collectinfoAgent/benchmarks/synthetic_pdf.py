@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+合成半年报PDF生成器（基准测试用，无需联网）
+
+生成指定页数的报告：正文为填充文字，“股份变动及股东情况”一节含前十名股东表，
+并带书签，可触发 pdf_parser 的书签定位与表格提取。表格可选跨页拆分。
+字体使用 STSong-Light（Identity-H 编码 + ToUnicode），pdfplumber 与 PyPDF2 都能提取中文。
+
+用法：
+    python benchmarks/synthetic_pdf.py --out data/sample_pdfs --count 3 --pages 300
+"""
+
+import sys
+import os
+import random
+import argparse
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.names import DEFAULT_INVESTORS
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+TABLE_HEADER = ["股东名称", "股东性质", "持股比例(%)", "报告期末持股数量", "报告期内增减变动情况", "持有有限售条件的股份数量"]
+TABLE_WIDTHS = [110, 70, 60, 95, 95, 95]
+FILLER = "公司坚持稳健经营，持续优化产品结构，加强研发投入与成本控制，报告期内主营业务保持平稳发展。"
+OTHER_HOLDERS = ["香港中央结算有限公司", "中国证券金融股份有限公司", "全国社保基金一一八组合", "基本养老保险基金八零二组合",
+                 "某某混合型证券投资基金", "某某集团有限公司", "张某某", "李某某", "某某投资管理合伙企业"]
+
+
+class _Doc:
+    """最小PDF写出器：只支持单一中文字体的文字、直线与书签。"""
+
+    def __init__(self):
+        self.used = set()
+        self.pages: List[str] = []
+
+    def hex(self, s: str) -> str:
+        self.used.update(s)
+        return "<" + s.encode("utf-16-be").hex().upper() + ">"
+
+    def text(self, x: float, y: float, s: str, size: int = 10) -> str:
+        return f"BT /F1 {size} Tf {x} {y} Td {self.hex(s)} Tj ET\n"
+
+    def table(self, x: float, y: float, rows: List[List[str]], widths: List[int], h: int = 18) -> str:
+        ops = ""
+        total = sum(widths)
+        for r in range(len(rows) + 1):
+            ops += f"{x} {y - r * h} m {x + total} {y - r * h} l S\n"
+        cx = x
+        for w in widths + [0]:
+            ops += f"{cx} {y} m {cx} {y - len(rows) * h} l S\n"
+            cx += w
+        for r, row in enumerate(rows):
+            cx = x
+            for cell, w in zip(row, widths):
+                ops += self.text(cx + 2, y - r * h - 13, cell, 7)
+                cx += w
+        return ops
+
+    def _to_unicode(self) -> bytes:
+        pairs = [f"<{ord(c):04X}> <{ord(c):04X}>" for c in sorted(self.used) if ord(c) <= 0xFFFF]
+        body = ""
+        for k in range(0, len(pairs), 100):
+            chunk = pairs[k:k + 100]
+            body += f"{len(chunk)} beginbfchar\n" + "\n".join(chunk) + "\nendbfchar\n"
+        return ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+                "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+                "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n" + body +
+                "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n").encode()
+
+    def build(self, outlines: List[Tuple[str, int]] | None = None) -> bytes:
+        n = len(self.pages)
+        # 对象编号：1 目录，2 页树，3 字体，4 ToUnicode，之后每页 (页, 内容)，最后书签
+        first_page = 5
+        outline_root = first_page + 2 * n
+        catalog = "<< /Type /Catalog /Pages 2 0 R" + (f" /Outlines {outline_root} 0 R" if outlines else "") + " >>"
+        kids = " ".join(f"{first_page + 2 * i} 0 R" for i in range(n))
+        font = ("<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /Identity-H /ToUnicode 4 0 R "
+                "/DescendantFonts [<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 4 >> "
+                "/FontDescriptor << /Type /FontDescriptor /FontName /STSong-Light /Flags 4 /FontBBox [-25 -254 1000 880] "
+                "/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >> /DW 1000 >>] >>")
+        objs: list = [catalog, f"<< /Type /Pages /Kids [{kids}] /Count {n} >>", font, None]
+        for i, ops in enumerate(self.pages):
+            objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {first_page + 2 * i + 1} 0 R >>")
+            data = ops.encode()
+            objs.append(f"<< /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+        if outlines:
+            k = len(outlines)
+            objs.append(f"<< /Type /Outlines /First {outline_root + 1} 0 R /Last {outline_root + k} 0 R /Count {k} >>")
+            for j, (title, page) in enumerate(outlines):
+                me = outline_root + 1 + j
+                links = (f" /Prev {me - 1} 0 R" if j > 0 else "") + (f" /Next {me + 1} 0 R" if j < k - 1 else "")
+                objs.append(f"<< /Title {self.hex(title).replace('<', '<FEFF', 1)} /Parent {outline_root} 0 R{links} "
+                            f"/Dest [{first_page + 2 * page} 0 R /Fit] >>")
+        cmap = self._to_unicode()
+        objs[3] = f"<< /Length {len(cmap)} >>\nstream\n".encode() + cmap + b"\nendstream"
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for i, obj in enumerate(objs):
+            offsets.append(len(out))
+            out += f"{i + 1} 0 obj\n".encode()
+            out += obj if isinstance(obj, bytes) else obj.encode()
+            out += b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+        for off in offsets:
+            out += f"{off:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+def top10_rows(rng: random.Random, investors: List[str] | None = None) -> List[List[str]]:
+    """生成前十名股东表数据行（不含表头），随机混入关注的投资人。"""
+    investors = list(investors if investors is not None else DEFAULT_INVESTORS)
+    holders = rng.sample(OTHER_HOLDERS, 7) + rng.sample(investors, min(3, len(investors)))
+    rng.shuffle(holders)
+    rows = []
+    shares = sorted((rng.randint(1_000_000, 300_000_000) for _ in holders), reverse=True)
+    for holder, n in zip(holders, shares):
+        kind = "境内自然人" if len(holder) <= 3 or holder.endswith("某某") else "其他"
+        change = rng.choice([0, rng.randint(-5_000_000, 5_000_000)])
+        rows.append([holder, kind, f"{n / 1e7:.2f}", f"{n:,}", f"{change:+,}" if change else "0", "0"])
+    return rows
+
+
+def build_report(pages: int = 300, company: str = "某某股份有限公司", seed: int = 0,
+                 investors: List[str] | None = None, split_table: bool = False) -> bytes:
+    """生成一份 pages 页的合成半年报。
+
+    股东章节位于全文约 60% 处，含书签“第七节 股份变动及股东情况”；
+    split_table=True 时前十名股东表在两页之间拆开（续表不重复表头）。
+    """
+    rng = random.Random(seed)
+    pages = max(pages, 4)
+    doc = _Doc()
+    section = int(pages * 0.6)
+    while len(doc.pages) < pages:
+        i = len(doc.pages)
+        ops = doc.text(60, 800, f"{company} 2025年半年度报告全文", 9)
+        ops += doc.text(280, 30, f"{i + 1} / {pages}", 8)
+        if i == 0:
+            ops += doc.text(150, 600, f"{company}", 20)
+            ops += doc.text(180, 560, "2025年半年度报告", 18)
+        elif i == section:
+            rows = [TABLE_HEADER] + top10_rows(rng, investors)
+            ops += doc.text(60, 760, "第七节 股份变动及股东情况", 14)
+            ops += doc.text(60, 730, "二、股东情况", 11)
+            ops += doc.text(60, 705, "前十名股东持股情况（不含通过转融通出借股份）", 10)
+            if split_table and i + 1 < pages:
+                ops += doc.table(40, 200, rows[:6], TABLE_WIDTHS)
+                doc.pages.append(ops)
+                ops = doc.text(280, 30, f"{i + 2} / {pages}", 8) + doc.table(40, 780, rows[6:], TABLE_WIDTHS)
+            else:
+                ops += doc.table(40, 690, rows, TABLE_WIDTHS)
+        else:
+            for line in range(30):
+                start = (i * 7 + line * 3) % len(FILLER)
+                ops += doc.text(60, 760 - line * 22, (FILLER[start:] + FILLER[:start])[:38], 10)
+        doc.pages.append(ops)
+    outlines = [("第一节 重要提示、目录和释义", 0), ("第三节 管理层讨论与分析", max(1, pages // 5)),
+                ("第七节 股份变动及股东情况", section), ("第十节 财务报告", min(pages - 1, section + 3))]
+    return doc.build(outlines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成半年报PDF")
+    parser.add_argument("--out", default="data/sample_pdfs", help="输出目录")
+    parser.add_argument("--count", type=int, default=3, help="生成份数")
+    parser.add_argument("--pages", type=int, default=300, help="每份页数")
+    parser.add_argument("--split-table", action="store_true", help="前十名股东表跨页")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for i in range(args.count):
+        path = os.path.join(args.out, f"synthetic_{args.pages}p_{i:03d}.pdf")
+        with open(path, "wb") as f:
+            f.write(build_report(args.pages, f"合成样本{i:03d}股份有限公司", seed=i, split_table=args.split_table))
+        print(f"已生成: {path}")
+
+
+if __name__ == "__main__":
+    main()
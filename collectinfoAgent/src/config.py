@@ -15,6 +15,12 @@ class SourceCfg(BaseModel):
     max_total: int | None = 50
     se_date: str | None = None       # 示例："2025-01-01~2025-12-31"
     title_keywords: list[str] | None = None  # 例如 ["报告","季度报告","半年度报告","年度报告"]
+    concurrency: int | None = 1      # 列表页并发请求数，1 为串行
+    incremental: bool = False        # 增量模式：遇到 storage.sqlite_path 中记录的水位线即停止翻页
+
+class InvestorCfg(BaseModel):
+    name: str
+    aliases: list[str] = Field(default_factory=list)  # 报告中可能出现的其他写法
 
 class RulesCfg(BaseModel):
     notify_on: list[Dict[str, Any]] = Field(default_factory=list)
@@ -33,18 +39,41 @@ class RulesCfg(BaseModel):
 class ScheduleCfg(BaseModel):
     enabled: bool = False
     interval_minutes: int = 60
+    # 自适应轮询：有新公告时缩短间隔，无新公告时按 backoff_factor 放宽
+    min_interval_minutes: float = 5
+    max_interval_minutes: float = 240
+    backoff_factor: float = 1.5
+    burst_threshold: int = 50         # 单次新公告数达到该值时间隔直接缩为 1/4
+    jitter_seconds: float = 30
+    # 财报密集披露期（MM-DD~MM-DD）内间隔不超过 season_interval_minutes
+    season_windows: list[str] = Field(default_factory=lambda: ["03-20~04-30", "07-15~08-31", "10-15~10-31"])
+    season_interval_minutes: float = 10
 
 class StorageCfg(BaseModel):
     sqlite_path: str = "data/holdings.db"
+    pdf_cache_enabled: bool = True
+    pdf_cache_dir: str = "data/pdf_cache"
+    pdf_cache_max_mb: int = 2048     # 超出后按 LRU 淘汰
+
+class HttpCfg(BaseModel):
+    # 出站请求按主机令牌桶限速，瞬时错误（连接异常/超时/429/5xx）指数退避重试
+    default_rate: float = 5.0         # 每秒请求数
+    burst: int = 5
+    host_rates: Dict[str, float] = Field(default_factory=dict)  # 例如 {"www.cninfo.com.cn": 3}
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
 
 class PushCfg(BaseModel):
     email_enabled: bool = False
 
 class AppCfg(BaseModel):
     sources: list[SourceCfg] = Field(default_factory=list)
+    investors: list[InvestorCfg] = Field(default_factory=list)
     rules: RulesCfg = RulesCfg()
     schedule: ScheduleCfg = ScheduleCfg()
     storage: StorageCfg = StorageCfg()
+    http: HttpCfg = HttpCfg()
     push: PushCfg = PushCfg()
 
 def load_config(path: str = "config.yaml") -> AppCfg:
@@ -0,0 +1,211 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import re
+
+from src.names import NameMatcher
+
+# 表格类型：前十名股东 / 前十名无限售条件（流通）股东
+TOP10 = "top10"
+TOP10_TRADABLE = "top10_tradable"
+TOP10_ROWS = 10
+
+
+class ShareholderRow(NamedTuple):
+    table: str                      # TOP10 / TOP10_TRADABLE
+    holder: str                     # 股东名称（已去掉空白与换行）
+    shares: Optional[int]           # 报告期末持股数量 / 无限售条件股份数量（股）
+    ratio: Optional[float]          # 持股比例（%），流通股东表没有该列
+    change: Optional[int]           # 报告期内增减变动（股）
+    share_class: Optional[str]      # 股份种类，如 人民币普通股
+    holder_type: Optional[str]      # 股东性质，如 境内自然人
+    restricted_shares: Optional[int]
+    page: int                       # 表格起始页码（从1开始）
+
+
+def _clean(cell: Any) -> str:
+    return "".join(str(cell).split()) if cell is not None else ""
+
+
+_NUMBER = re.compile(r"[-+]?\d[\d,，]*(?:\.\d+)?")
+
+
+def parse_int(cell: Any) -> Optional[int]:
+    """'82,401,640' / '+4,978,241' / '减少1,000' → 整数；'-'、'无'、空白 → None。"""
+    text = _clean(cell)
+    m = _NUMBER.search(text)
+    if not m:
+        return None
+    value = int(float(m.group().replace(",", "").replace("，", "")))
+    if "减少" in text and value > 0:
+        value = -value
+    return value
+
+
+def parse_ratio(cell: Any) -> Optional[float]:
+    m = _NUMBER.search(_clean(cell))
+    return float(m.group().replace(",", "").replace("，", "")) if m else None
+
+
+# 表头关键词 → 字段；按顺序匹配，先命中的优先（“增减”“限售”要排在“持股数量”之前）
+_HEADER_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("holder", ("股东名称",)),
+    ("holder_type", ("股东性质",)),
+    ("ratio", ("比例",)),
+    ("change", ("增减",)),
+    ("pledge", ("质押", "冻结", "标记", "股份状态")),
+    ("restricted_shares", ("持有有限售条件",)),
+    ("share_class", ("种类",)),
+    ("shares", ("期末持股数量", "持股数量", "无限售条件流通股的数量", "无限售条件股份数量", "无限售条件股份的数量")),
+)
+# 同样以“股东名称”开头、但不是前十名股东表的表格（转融通出借、有限售条件股东明细）
+_OTHER_TABLES = ("转融通", "有限售条件股东")
+
+
+def _header_field(text: str) -> Optional[str]:
+    for field, keywords in _HEADER_RULES:
+        if any(k in text for k in keywords):
+            return field
+    return None
+
+
+def _is_header(row: List[Any]) -> bool:
+    return any("股东名称" in _clean(c) for c in row)
+
+
+def _map_columns(header_rows: List[List[Any]]) -> Dict[str, int]:
+    """由一行或两行表头得到 字段 → 列号。
+
+    横向合并的单元格在 pdfplumber 中为 None，沿用左侧文字，如“股份种类及数量”下的“种类”“数量”两列；
+    子表头“数量”与左侧的无限售股份数重复，或属于质押冻结情况，不作为持股数量列。
+    """
+    width = max(len(r) for r in header_rows)
+    top, last = [], ""
+    for i in range(width):
+        cell = header_rows[0][i] if i < len(header_rows[0]) else None
+        last = _clean(cell) if cell is not None else last
+        top.append(last)
+    sub = [_clean(c) for c in header_rows[1]] if len(header_rows) > 1 else []
+    sub += [""] * (width - len(sub))
+    columns: Dict[str, int] = {}
+    for i in range(width):
+        if sub[i] == "数量":
+            field = "pledge" if _header_field(top[i]) == "pledge" else None
+        else:
+            field = _header_field(top[i] + sub[i])
+        if field and field not in columns:
+            columns[field] = i
+    return columns
+
+
+def _parse_row(row: List[Any], columns: Dict[str, int], kind: str, page: int) -> Optional[ShareholderRow]:
+    def cell(field: str) -> Any:
+        i = columns.get(field)
+        return row[i] if i is not None and i < len(row) else None
+
+    holder = _clean(cell("holder"))
+    shares = parse_int(cell("shares"))
+    # 说明行（“上述股东关联关系…”）、合计行或空行：没有持股数量
+    if not holder or shares is None or holder.startswith(("上述", "注", "合计")):
+        return None
+    return ShareholderRow(
+        table=kind,
+        holder=holder,
+        shares=shares,
+        ratio=parse_ratio(cell("ratio")) if "ratio" in columns else None,
+        change=parse_int(cell("change")) if "change" in columns else None,
+        share_class=_clean(cell("share_class")) or None,
+        holder_type=_clean(cell("holder_type")) or None,
+        restricted_shares=parse_int(cell("restricted_shares")) if "restricted_shares" in columns else None,
+        page=page,
+    )
+
+
+def parse_shareholder_tables(pages: List[Dict[str, Any]]) -> List[ShareholderRow]:
+    """从 extract_pages(..., raw_tables=True) 的结果中识别前十名股东表和前十名无限售条件股东表，产出类型化记录。
+
+    - 表头含“股东名称”的表格开始一张新表，按表头关键词确定各列含义，有“持股比例”列的是前十名股东表；
+    - 下一页的第一张表没有表头、列数相同，且上一张表不足十行时，视为跨页续表。
+    """
+    rows: List[ShareholderRow] = []
+    current: Dict[str, Any] | None = None
+    for page in pages:
+        for n, table in enumerate(page.get("raw_tables") or []):
+            table = [r for r in table if r and any(_clean(c) for c in r)]
+            if not table:
+                continue
+            start = next((i for i, r in enumerate(table) if _is_header(r)), None)
+            if start is not None:
+                # 表头可能占两行（合并单元格下的子表头）：下一行没有任何数字时并入表头
+                header, body = [table[start]], table[start + 1:]
+                if body and all(parse_int(c) is None for c in body[0]):
+                    header.append(body[0])
+                    body = body[1:]
+                columns = _map_columns(header)
+                header_text = "".join(_clean(c) for r in header for c in r)
+                if "holder" not in columns or "shares" not in columns or any(k in header_text for k in _OTHER_TABLES):
+                    current = None
+                    continue
+                kind = TOP10 if "ratio" in columns or "无限售" not in header_text else TOP10_TRADABLE
+                current = {"columns": columns, "kind": kind, "width": len(table[start]), "count": 0,
+                           "page": page["page"], "last_page": page["page"]}
+            elif (current is not None and n == 0 and page["page"] == current["last_page"] + 1
+                  and len(table[0]) == current["width"] and current["count"] < TOP10_ROWS):
+                body = table
+                current["last_page"] = page["page"]
+            else:
+                current = None
+                continue
+            for raw in body:
+                record = _parse_row(raw, current["columns"], current["kind"], current["page"])
+                if record is not None:
+                    rows.append(record)
+                    current["count"] += 1
+    return rows
+
+
+# 报告标题 → 报告期
+_PERIODS = (("第一季度", "03-31"), ("半年", "06-30"), ("中期", "06-30"), ("第三季度", "09-30"), ("年度报告", "12-31"), ("年报", "12-31"))
+
+
+def report_period(title: str) -> Optional[str]:
+    """'2025年半年度报告' → '2025-06-30'；无法识别时返回 None。"""
+    m = re.search(r"(20\d{2})\s*年", title or "")
+    if not m:
+        return None
+    for keyword, suffix in _PERIODS:
+        if keyword in title:
+            return f"{m.group(1)}-{suffix}"
+    return None
+
+
+def holding_rows(shareholders: Iterable[ShareholderRow], report: Dict[str, Any], matcher: NameMatcher) -> List[Dict[str, Any]]:
+    """把关注投资人的股东记录转成 HoldingsStore.insert_many 的行。
+
+    report 为公告记录（secCode / secName / title / url_path）；同一投资人同时出现在两张表时，
+    以前十名股东表（总持股）为准，否则用流通股东表。
+    """
+    period = report_period(report.get("title", ""))
+    stock_code = report.get("secCode")
+    if not period or not stock_code:
+        return []
+    best: Dict[str, ShareholderRow] = {}
+    for row in shareholders:
+        # 只认整格就是投资人姓名的股东，避免“葛卫东”命中含该名字的机构名称
+        matches = [m for m in matcher.find_all(row.holder) if m.start == 0 and m.end == len(row.holder)]
+        if not matches:
+            continue
+        investor = matches[0].investor
+        if investor not in best or (best[investor].table != TOP10 and row.table == TOP10):
+            best[investor] = row
+    return [
+        {
+            "investor": investor,
+            "stock_code": stock_code,
+            "stock_name": report.get("secName"),
+            "period": period,
+            "shares": row.shares,
+            "ratio": row.ratio,
+            "share_class": row.share_class or ("流通股" if row.table == TOP10_TRADABLE else None),
+            "url_path": report.get("url_path"),
+        }
+        for investor, row in best.items()
+    ]
@@ -0,0 +1,124 @@
+from typing import Any, Dict, Iterable, List
+import hashlib
+import time
+import zlib
+
+from src import metrics
+from src.storage import connect
+
+
+def _normalize(text: str) -> str:
+    # 去掉全部空白后再建索引：PDF表格里常见“葛 卫 东”这类被拆开的姓名
+    return "".join(text.split())
+
+
+class ReportTextIndex:
+    """已解析报告的全文索引（与持仓库共用 StorageCfg.sqlite_path）。
+
+    - report_texts 按 url_path 保存 zlib 压缩后的解析文本；
+    - report_fts 为 FTS5 trigram 无内容（contentless）索引，只存倒排不存原文；
+    - 新增投资人或临时检索时直接查索引，无需重新下载、解析PDF。
+
+    trigram 分词要求查询词至少 3 个字符，更短的查询退化为解压逐篇扫描。
+    """
+
+    def __init__(self, sqlite_path: str):
+        self.conn = connect(sqlite_path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS report_texts (
+                id INTEGER PRIMARY KEY,
+                url_path TEXT NOT NULL UNIQUE,
+                title TEXT,
+                column_name TEXT,
+                sha256 TEXT NOT NULL,
+                text_z BLOB NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(body, content='', tokenize='trigram');
+            """
+        )
+        self.conn.commit()
+
+    def missing(self, url_paths: Iterable[str], chunk_size: int = 500) -> List[str]:
+        """返回尚未入索引的 url_path（保持输入顺序），每 chunk_size 个合并成一次 IN 查询，用于增量解析。"""
+        paths = list(url_paths)
+        indexed = set()
+        for i in range(0, len(paths), chunk_size):
+            chunk = paths[i:i + chunk_size]
+            sql = f"SELECT url_path FROM report_texts WHERE url_path IN ({', '.join('?' * len(chunk))})"
+            indexed.update(r[0] for r in self.conn.execute(sql, chunk))
+        return [u for u in paths if u not in indexed]
+
+    def _upsert(self, url_path: str, text: str, title: str = "", column: str = "") -> bool:
+        sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        row = self.conn.execute("SELECT id, sha256, text_z FROM report_texts WHERE url_path=?", (url_path,)).fetchone()
+        if row and row[1] == sha:
+            return False
+        text_z = zlib.compress(text.encode("utf-8"), 6)
+        if row:
+            rowid = row[0]
+            # 无内容索引删除旧条目时需要提供原先写入的内容
+            old = zlib.decompress(row[2]).decode("utf-8")
+            self.conn.execute("INSERT INTO report_fts(report_fts, rowid, body) VALUES('delete', ?, ?)", (rowid, _normalize(old)))
+            self.conn.execute(
+                "UPDATE report_texts SET title=?, column_name=?, sha256=?, text_z=?, indexed_at=? WHERE id=?",
+                (title, column, sha, text_z, time.time(), rowid),
+            )
+        else:
+            cur = self.conn.execute(
+                "INSERT INTO report_texts (url_path, title, column_name, sha256, text_z, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url_path, title, column, sha, text_z, time.time()),
+            )
+            rowid = cur.lastrowid
+        self.conn.execute("INSERT INTO report_fts(rowid, body) VALUES (?, ?)", (rowid, _normalize(text)))
+        return True
+
+    def add(self, url_path: str, text: str, title: str = "", column: str = "") -> bool:
+        """写入或更新一篇报告；内容未变化时跳过并返回 False。"""
+        with self.conn:
+            return self._upsert(url_path, text, title, column)
+
+    def add_many(self, reports: Iterable[Dict[str, Any]]) -> int:
+        """批量写入（单个事务），reports 为含 url_path/text/title/column 的字典。"""
+        changed = 0
+        with metrics.timer("db_write_seconds", table="report_texts"), self.conn:
+            for r in reports:
+                if self._upsert(r["url_path"], r.get("text") or "", r.get("title") or "", r.get("column") or ""):
+                    changed += 1
+        metrics.inc("db_rows_written_total", changed, table="report_texts")
+        return changed
+
+    def get_text(self, url_path: str) -> str | None:
+        row = self.conn.execute("SELECT text_z FROM report_texts WHERE url_path=?", (url_path,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def search(self, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """检索包含 query 的报告（忽略空白），返回 url_path / title / column。"""
+        q = _normalize(query)
+        if not q:
+            return []
+        if len(q) >= 3:
+            rows = self.conn.execute(
+                """
+                SELECT t.url_path, t.title, t.column_name
+                FROM report_fts f JOIN report_texts t ON t.id = f.rowid
+                WHERE report_fts MATCH ?
+                LIMIT ?
+                """,
+                ('"' + q.replace('"', '""') + '"', limit),
+            ).fetchall()
+        else:
+            rows = []
+            for url_path, title, column, text_z in self.conn.execute("SELECT url_path, title, column_name, text_z FROM report_texts"):
+                if q in _normalize(zlib.decompress(text_z).decode("utf-8")):
+                    rows.append((url_path, title, column))
+                    if len(rows) >= limit:
+                        break
+        return [{"url_path": r[0], "title": r[1], "column": r[2]} for r in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM report_texts").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
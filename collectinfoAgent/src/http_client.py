@@ -0,0 +1,205 @@
+from typing import Any, Dict
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import metrics
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# 可重试的状态码：限流与临时性服务端错误
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+# 默认每主机限速：每秒请求数 / 突发数
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 5
+
+
+class TokenBucket:
+    """令牌桶限速：平均每秒 rate 个请求，允许 burst 个突发；线程安全。"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时阻塞等待；返回等待的秒数。"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate if self.rate > 0 else 1.0)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """服务端要求退避（Retry-After）时，暂停整个主机的请求。"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """统一的出站HTTP客户端：连接池 + 按主机令牌桶限速 + 指数退避重试。
+
+    - 每个主机一个令牌桶（host_rates 可单独设置，其余用 default_rate）；
+    - 连接异常、超时及 429/5xx 按指数退避加随机抖动重试，最多 max_retries 次；
+    - 响应带 Retry-After 时按其要求暂停该主机的全部请求；
+    - stats() 返回请求数、重试数、限流次数、最终失败数等计数。
+    """
+
+    def __init__(self, default_rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, host_rates: Dict[str, float] | None = None,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 retry_after_max: float = 120.0, pool_maxsize: int = 32):
+        self.default_rate = default_rate
+        self.burst = burst
+        self.host_rates = dict(host_rates or {})
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.counters: Counter = Counter()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = self._buckets[host] = TokenBucket(self.host_rates.get(host, self.default_rate), self.burst)
+            return b
+
+    def _count(self, key: str, n: int = 1, host: str = "") -> None:
+        with self._lock:
+            self.counters[key] += n
+        metrics.inc(f"http_{key}_total", n, host=host)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """发送请求并按需重试；重试耗尽后返回最后一次响应或抛出最后一次异常。"""
+        host = urlsplit(url).netloc
+        bucket = self.bucket(host)
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            if waited:
+                self._count("throttle_wait_ms", int(waited * 1000), host=host)
+            self._count("requests", host=host)
+            try:
+                with metrics.timer("http_request_seconds", host=host):
+                    resp = self.session.request(method, url, **kwargs)
+            except RETRY_EXCEPTIONS:
+                if attempt >= self.max_retries:
+                    self._count("failures", host=host)
+                    raise
+                self._count("retries", host=host)
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            metrics.inc("http_responses_total", host=host, status=resp.status_code)
+            if resp.status_code not in RETRY_STATUS:
+                return resp
+            if resp.status_code == 429:
+                self._count("rate_limited", host=host)
+            if attempt >= self.max_retries:
+                self._count("failures", host=host)
+                return resp
+            self._count("retries", host=host)
+            delay = self._backoff(attempt)
+            retry_after = _retry_after_seconds(resp)
+            if retry_after is not None:
+                self._count("retry_after", host=host)
+                delay = max(delay, min(retry_after, self.retry_after_max))
+                bucket.pause(delay)
+            resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.counters.clear()
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+_client_settings: Dict[str, Any] = {}
+
+
+def configure_http(**settings: Any) -> None:
+    """设置默认客户端参数（见 HttpClient），下次 get_client() 时生效。"""
+    global _client
+    with _client_lock:
+        _client_settings.clear()
+        _client_settings.update({k: v for k, v in settings.items() if v is not None})
+        _client = None
+
+
+def http_settings(processes: int = 1) -> Dict[str, Any]:
+    """当前客户端配置，供子进程用 configure_http(**settings) 复现。
+
+    processes > 1 时各主机的限速按进程数均分（burst 同样均分，至少为 1），
+    这样 processes 个子进程各自的令牌桶合计仍不超过配置的每主机速率。
+    """
+    with _client_lock:
+        settings = dict(_client_settings)
+    if processes <= 1:
+        return settings
+    settings["default_rate"] = settings.get("default_rate", DEFAULT_RATE) / processes
+    settings["burst"] = max(1, settings.get("burst", DEFAULT_BURST) // processes)
+    settings["host_rates"] = {host: rate / processes for host, rate in (settings.get("host_rates") or {}).items()}
+    return settings
+
+
+def get_client() -> HttpClient:
+    """返回进程内共享的默认客户端。"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(**_client_settings)
+    return _client
@@ -0,0 +1,211 @@
+from typing import Any, Dict, Iterable, Iterator, List
+from contextlib import contextmanager
+import json
+import sqlite3
+import time
+import zlib
+
+from src.storage import connect
+
+# 报告处理阶段，state 记录已完成的最后一个阶段
+STAGES = ("listed", "parsed", "stored")
+SHARD_BUCKETS = 1024
+
+
+def _bucket(url_path: str) -> int:
+    return zlib.crc32(url_path.encode("utf-8")) % SHARD_BUCKETS
+
+
+class JobQueue:
+    """可断点续跑、可分片的报告处理队列（SQLite，可多进程/多机共享同一文件）。
+
+    - 每份报告一行，state 按 listed → parsed → stored 推进；
+    - claim 在 BEGIN IMMEDIATE 事务内领取任务并加租约，多个 worker 同时领取不会拿到同一份；
+    - worker 崩溃后租约到期，任务自动回到可领取状态（同一 worker_id 重启时用 release 立即收回）；
+      attempts 只统计真正的处理失败（fail），重启、租约过期不计入，失败 max_attempts 次后标记为 failed；
+    - 解析结果在 parsed 阶段暂存于 job_results，中断后从 parsed 恢复时直接写库，不必重新下载解析；
+    - 按 url_path 的哈希分桶，shard/num_shards 让每个 worker 只处理自己那一片；
+    - meta 表记录最近一次列表抓取的时间。
+    """
+
+    def __init__(self, sqlite_path: str, max_attempts: int = 3, lease_seconds: float = 600):
+        self.path = sqlite_path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        # 手动控制事务，claim 需要 BEGIN IMMEDIATE 抢写锁
+        self.conn = connect(sqlite_path)
+        self.conn.isolation_level = None
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS report_jobs (
+                url_path TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,          -- 列表记录（JSON）
+                bucket INTEGER NOT NULL,        -- 分片桶 0..1023
+                state TEXT NOT NULL,            -- 已完成的最后阶段
+                status TEXT NOT NULL,           -- pending / leased / done / failed
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_report_jobs_claim ON report_jobs (status, lease_expires, bucket);
+            CREATE TABLE IF NOT EXISTS job_results (
+                url_path TEXT PRIMARY KEY,
+                result TEXT NOT NULL            -- parsed 阶段的解析结果（JSON），stored 后删除
+            );
+            CREATE TABLE IF NOT EXISTS job_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE 事务：开始即持有写锁，并发领取时不会读到同一批任务。"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue_many(self, reports: Iterable[Dict[str, Any]]) -> int:
+        """登记列表记录（state=listed），已存在的报告不重复登记，返回新增数。"""
+        now = time.time()
+        rows = [
+            (r["url_path"], json.dumps(r, ensure_ascii=False), _bucket(r["url_path"]), STAGES[0], "pending", now)
+            for r in reports if r.get("url_path")
+        ]
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO report_jobs (url_path, payload, bucket, state, status, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def claim(self, worker_id: str, limit: int = 10, shard: int = 0, num_shards: int = 1, lease_seconds: float | None = None) -> List[Dict[str, Any]]:
+        """领取最多 limit 个待处理任务（含租约过期的），返回 [{"url_path", "state", "attempts", "report"}]。
+
+        state 为已完成的最后阶段，调用方据此跳过已完成的步骤；attempts 为此前失败的次数。
+        """
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+        with self._write() as conn:
+            rows = conn.execute(
+                """
+                SELECT url_path, payload, state, attempts FROM report_jobs
+                WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                  AND bucket % ? = ?
+                ORDER BY updated_at, url_path
+                LIMIT ?
+                """,
+                (now, num_shards, shard, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE report_jobs SET status='leased', lease_owner=?, lease_expires=?, updated_at=? WHERE url_path=?",
+                [(worker_id, expires, now, r[0]) for r in rows],
+            )
+        return [{"url_path": r[0], "report": json.loads(r[1]), "state": r[2], "attempts": r[3]} for r in rows]
+
+    def advance(self, url_path: str, state: str, worker_id: str, result: Dict[str, Any] | None = None) -> bool:
+        """记录任务推进到 state；到达最后阶段即完成。租约已被他人接手时返回 False。
+
+        result 为该阶段的产出（JSON 可序列化），与状态在同一事务内暂存，恢复时用 saved_result 取回。
+        """
+        done = state == STAGES[-1]
+        with self._write() as conn:
+            cur = conn.execute(
+                """
+                UPDATE report_jobs SET state=?, status=?, last_error=NULL, updated_at=?,
+                    lease_owner=CASE WHEN ? THEN NULL ELSE lease_owner END,
+                    lease_expires=CASE WHEN ? THEN NULL ELSE lease_expires END
+                WHERE url_path=? AND lease_owner=? AND status='leased'
+                """,
+                (state, "done" if done else "leased", time.time(), done, done, url_path, worker_id),
+            )
+            if cur.rowcount != 1:
+                return False
+            if done:
+                conn.execute("DELETE FROM job_results WHERE url_path=?", (url_path,))
+            elif result is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_results (url_path, result) VALUES (?, ?)",
+                    (url_path, json.dumps(result, ensure_ascii=False)),
+                )
+            return True
+
+    def saved_result(self, url_path: str) -> Dict[str, Any] | None:
+        """advance 时暂存的阶段产出，没有时返回 None。"""
+        row = self.conn.execute("SELECT result FROM job_results WHERE url_path=?", (url_path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def fail(self, url_path: str, worker_id: str, error: str) -> None:
+        """任务失败：失败次数加一并释放租约，未超过重试次数时回到 pending，否则标记 failed。"""
+        with self._write() as conn:
+            conn.execute(
+                """
+                UPDATE report_jobs SET status=CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    attempts=attempts+1, lease_owner=NULL, lease_expires=NULL, last_error=?, updated_at=?
+                WHERE url_path=? AND lease_owner=?
+                """,
+                (self.max_attempts, error, time.time(), url_path, worker_id),
+            )
+
+    def release(self, worker_id: str) -> int:
+        """收回该 worker 持有的全部租约（任务回到 pending）。
+
+        worker 重启时调用，上次崩溃时正在处理的任务立即可领取，不必等租约过期。
+        """
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE report_jobs SET status='pending', lease_owner=NULL, lease_expires=NULL, updated_at=? "
+                "WHERE lease_owner=? AND status='leased'",
+                (time.time(), worker_id),
+            )
+            return cur.rowcount
+
+    def renew(self, worker_id: str, lease_seconds: float | None = None) -> int:
+        """延长该 worker 持有的全部租约（长任务的心跳），返回续约数。"""
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE report_jobs SET lease_expires=? WHERE lease_owner=? AND status='leased'",
+                (time.time() + (lease_seconds or self.lease_seconds), worker_id),
+            )
+            return cur.rowcount
+
+    def retry_failed(self) -> int:
+        """把 failed 任务重置为 pending（重新计数重试次数）。"""
+        with self._write() as conn:
+            return conn.execute(
+                "UPDATE report_jobs SET status='pending', attempts=0, updated_at=? WHERE status='failed'", (time.time(),)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数，键为 status 以及 state:<阶段>。"""
+        result: Dict[str, int] = {}
+        for status, n in self.conn.execute("SELECT status, COUNT(*) FROM report_jobs GROUP BY status"):
+            result[status] = n
+        for state, n in self.conn.execute("SELECT state, COUNT(*) FROM report_jobs GROUP BY state"):
+            result[f"state:{state}"] = n
+        return result
+
+    def failures(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT url_path, state, attempts, last_error FROM report_jobs WHERE status='failed' ORDER BY updated_at LIMIT ?", (limit,)
+        )
+        return [dict(zip(("url_path", "state", "attempts", "error"), r)) for r in rows]
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM job_meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO job_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+数据收集员入口：执行一次采集，或以 --schedule 启动自适应轮询守护进程
+"""
+
+import sys
+import os
+import json
+import signal
+import time
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import load_config, AppCfg
+from src.sources.cninfo import iter_announcements, crawl_summary, reset_crawl_stats
+from src.http_client import configure_http
+from src.parsers.pdf_parser import configure_pdf_cache
+from src.storage import WatermarkStore
+from src.sinks import JsonlSink
+from src.scheduler import AdaptiveScheduler
+from src import metrics
+
+
+def collect_once(cfg: AppCfg) -> int:
+    """按配置抓取所有启用的巨潮数据源，新公告写入 data/announcements_<时间戳>.jsonl，返回新公告数"""
+    # 守护模式下反复调用：统计按轮清零，打印的失败页/重试次数只属于本轮
+    reset_crawl_stats()
+    watermarks = WatermarkStore(cfg.storage.sqlite_path)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sink = JsonlSink(f"data/announcements_{timestamp}.jsonl")
+    try:
+        for src in cfg.sources:
+            if not src.enabled or src.type != "cninfo":
+                continue
+            for item in iter_announcements(
+                periods=src.periods or ["semiannual"],
+                page_size=src.page_size or 50,
+                max_pages=src.max_pages or 1,
+                max_total=src.max_total or 50,
+                se_date=src.se_date,
+                title_keywords=src.title_keywords,
+                concurrency=src.concurrency or 1,
+                watermarks=watermarks if src.incremental else None,
+            ):
+                sink.write(item)
+    finally:
+        sink.close()
+        watermarks.close()
+    if sink.total == 0:
+        os.remove(sink.path)
+    summary = crawl_summary()
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] 新公告 {sink.total} 份，"
+          f"失败页 {summary.get('dropped_pages', 0)}，HTTP重试 {summary['http'].get('retries', 0)} 次")
+    return sink.total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据收集员智能体")
+    parser.add_argument("--config", default="config.yaml", help="配置文件路径")
+    parser.add_argument("--schedule", action="store_true", help="启动自适应轮询（等同 schedule.enabled: true）")
+    parser.add_argument("--status-file", default="data/scheduler_status.json", help="调度状态输出文件")
+    parser.add_argument("--metrics-file", default="data/collector.prom", help="Prometheus 文本格式指标文件")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    configure_http(**cfg.http.model_dump())
+    configure_pdf_cache(cfg.storage.pdf_cache_dir, cfg.storage.pdf_cache_max_mb * 1024 * 1024, cfg.storage.pdf_cache_enabled)
+
+    if not (args.schedule or cfg.schedule.enabled):
+        collect_once(cfg)
+        metrics.REGISTRY.write_prometheus(args.metrics_file)
+        return
+
+    scheduler = AdaptiveScheduler(lambda: collect_once(cfg), cfg.schedule)
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid> 立即触发一轮采集；正在运行时合并为下一轮
+        signal.signal(signal.SIGUSR1, lambda signum, frame: scheduler.request_trigger())
+    last_runs = [-1]
+
+    def on_tick(snapshot):
+        # 每完成一轮输出一次状态，供监控读取
+        if snapshot["runs"] != last_runs[0]:
+            last_runs[0] = snapshot["runs"]
+            os.makedirs(os.path.dirname(args.status_file) or ".", exist_ok=True)
+            with open(args.status_file, "w", encoding="utf-8") as f:
+                json.dump({**snapshot, "updated_at": time.time()}, f, ensure_ascii=False, indent=2)
+            metrics.REGISTRY.write_prometheus(args.metrics_file)
+            if snapshot["next_run_in"] is not None:
+                print(f"下次运行: {snapshot['next_run_in'] / 60:.1f} 分钟后（间隔 {snapshot['interval_seconds'] / 60:.1f} 分钟，合并 {snapshot['coalesced']} 次）")
+
+    try:
+        scheduler.run_forever(on_tick)
+    except KeyboardInterrupt:
+        scheduler.stop()
+        print("已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from collections import deque
+from contextlib import contextmanager
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+
+# 秒级延迟的默认分桶（Prometheus histogram 的 le 上界）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 字节数分桶，用于PDF大小
+SIZE_BUCKETS = (64e3, 256e3, 1e6, 2e6, 4e6, 8e6, 16e6, 32e6, 64e6)
+# 每个直方图保留的最近样本数，用于计算分位数
+SAMPLE_SIZE = 2048
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """累计分桶 + 最近样本（算 p50/p95/p99）。"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples: deque = deque(maxlen=SAMPLE_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "count": self.count,
+                "sum": self.sum, "max": self.max, "samples": list(self.samples)}
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        if tuple(state["buckets"]) != self.buckets:
+            for v in state["samples"]:
+                self.observe(v)
+            return
+        self.counts = [a + b for a, b in zip(self.counts, state["counts"])]
+        self.count += state["count"]
+        self.sum += state["sum"]
+        self.max = max(self.max, state["max"])
+        self.samples.extend(state["samples"])
+
+
+class MetricsRegistry:
+    """进程内指标注册表：计数器、直方图（计时器即以秒为单位的直方图）。
+
+    - 同名指标可带标签，如 observe("pdf_download_seconds", 0.3, host="static.cninfo.com.cn")；
+    - snapshot() 输出 JSON 友好的汇总，to_prometheus() 输出 Prometheus 文本格式；
+    - 子进程中用 drain() 取出并清空本进程指标，随结果传回父进程后 merge() 合并。
+    """
+
+    def __init__(self, prefix: str = "collector"):
+        self.prefix = prefix
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """计时上下文：耗时（秒）记入直方图 name，异常时另计 <name>_errors。"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(name.replace("_seconds", "") + "_errors_total", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        """函数计时装饰器，例如给 LangGraph 节点函数加上 @timed("node_seconds", node="fetch")。"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {name: [{"labels": dict(k), "value": v} for k, v in series.items()]
+                        for name, series in self.counters.items()}
+            histograms = {name: [{"labels": dict(k), **h.summary()} for k, h in series.items()]
+                          for name, series in self.histograms.items()}
+        return {"started_at": self.started_at, "uptime_seconds": time.time() - self.started_at,
+                "counters": counters, "histograms": histograms}
+
+    def total(self, name: str) -> float:
+        """计数器各标签求和，或直方图各标签的总耗时/总量。"""
+        with self._lock:
+            if name in self.counters:
+                return sum(self.counters[name].values())
+            return sum(h.sum for h in self.histograms.get(name, {}).values())
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = self._metric_name(name)
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                metric = self._metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for upper, n in zip(hist.buckets, hist.counts):
+                        cumulative += n
+                        lines.append(f"{metric}_bucket{_format_labels(key, le=f'{upper:g}')} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {hist.sum:g}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def _metric_name(self, name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_:]", "_", f"{self.prefix}_{name}" if self.prefix else name)
+
+    def write_summary(self, path: str, extra: Dict[str, Any] | None = None) -> None:
+        """写出 JSON 运行汇总，extra 中的字段（如耗时、报告数）一并写入。"""
+        _atomic_write(path, json.dumps({**(extra or {}), "metrics": self.snapshot()}, ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """写出 Prometheus 文本文件，可由 node_exporter 的 textfile collector 采集。"""
+        _atomic_write(path, self.to_prometheus())
+
+    def drain(self) -> Dict[str, Any]:
+        with self._lock:
+            state = {
+                "counters": [(name, list(k), v) for name, series in self.counters.items() for k, v in series.items()],
+                "histograms": [(name, list(k), h.state()) for name, series in self.histograms.items() for k, h in series.items()],
+            }
+            self.counters = {}
+            self.histograms = {}
+        return state
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, key, value in state.get("counters", []):
+                series = self.counters.setdefault(name, {})
+                key = tuple(tuple(kv) for kv in key)
+                series[key] = series.get(key, 0) + value
+            for name, key, hstate in state.get("histograms", []):
+                series = self.histograms.setdefault(name, {})
+                key = tuple(tuple(kv) for kv in key)
+                hist = series.get(key)
+                if hist is None:
+                    hist = series[key] = Histogram(hstate["buckets"])
+                hist.merge(hstate)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started_at = time.time()
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    items = list(key) + list(extra.items())
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def _atomic_write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+# 进程内默认注册表及便捷函数
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+
+
+def profile_call(fn: Callable, *args: Any, out_path: str | None = None, top: int = 30, **kwargs: Any) -> Tuple[Any, str]:
+    """在 cProfile 下执行一次 fn（通常是单份文档的下载+解析），返回 (结果, 按累计耗时排序的前 top 项)。
+
+    out_path 给定时另存 .prof 文件，可用 snakeviz / pstats 进一步查看。
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args, **kwargs)
+    if out_path:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        profiler.dump_stats(out_path)
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+    return result, buf.getvalue()
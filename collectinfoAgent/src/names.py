@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from collections import deque
+import time
+
+from src import metrics
+
+# 默认关注的投资人（config.yaml 未配置 investors 时使用）
+DEFAULT_INVESTORS: Dict[str, List[str]] = {
+    "葛卫东": [],
+    "葛贵莲": [],
+    "葛贵兰": [],
+    "王孝安": [],
+    "何雪萍": [],
+}
+
+
+class NameMatch(NamedTuple):
+    start: int       # 在原文中的起始偏移（含）
+    end: int         # 结束偏移（不含）
+    investor: str    # 规范名称
+    alias: str       # 实际命中的写法
+
+
+class NameMatcher:
+    """多模式投资人姓名匹配器（Aho-Corasick 自动机）。
+
+    由投资人名单及别名一次性构建，之后对任意文本只做一次线性扫描即可找出
+    所有名字的出现位置，耗时与名单长度基本无关。
+
+    ignore_spaces=True 时跳过空白字符，能匹配 PDF 表格里被拆开的“葛 卫 东”，
+    返回的偏移仍对应原文。
+    """
+
+    def __init__(self, investors: Dict[str, Iterable[str]] | Iterable[str], ignore_spaces: bool = True):
+        if not isinstance(investors, dict):
+            investors = {name: [] for name in investors}
+        self.ignore_spaces = ignore_spaces
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, str]]] = [[]]
+        self.max_len = 0
+        for investor, aliases in investors.items():
+            for alias in {investor, *(aliases or [])}:
+                self._add(self._normalize(alias), investor, alias)
+        self._build()
+
+    @classmethod
+    def from_config(cls, investors, ignore_spaces: bool = True) -> "NameMatcher":
+        """由 AppCfg.investors（InvestorCfg 列表）构建；为空时使用 DEFAULT_INVESTORS。"""
+        if not investors:
+            return cls(DEFAULT_INVESTORS, ignore_spaces)
+        return cls({inv.name: inv.aliases for inv in investors}, ignore_spaces)
+
+    def _normalize(self, pattern: str) -> str:
+        return "".join(pattern.split()) if self.ignore_spaces else pattern
+
+    def _add(self, pattern: str, investor: str, alias: str) -> None:
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append((len(pattern), investor, alias))
+        self.max_len = max(self.max_len, len(pattern))
+
+    def _build(self) -> None:
+        # 广度优先计算失败指针，并把失败链上的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[NameMatch]:
+        """返回所有命中（按结束位置排序，重叠的命中都会返回）。"""
+        start_time = time.perf_counter()
+        goto, fail, out = self._goto, self._fail, self._out
+        positions: deque = deque(maxlen=max(self.max_len, 1))
+        matches: List[NameMatch] = []
+        state = 0
+        for i, ch in enumerate(text):
+            if self.ignore_spaces and ch.isspace():
+                continue
+            positions.append(i)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, investor, alias in out[state]:
+                matches.append(NameMatch(positions[-length], i + 1, investor, alias))
+        metrics.observe("name_match_seconds", time.perf_counter() - start_time)
+        metrics.inc("name_match_chars_total", len(text))
+        return matches
+
@@ -1,9 +1,10 @@
 from typing import Tuple
-import requests
 from bs4 import BeautifulSoup
 
+from src.http_client import get_client
+
 def fetch_html(url: str, timeout: int = 20) -> str:
-    resp = requests.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
+    resp = get_client().get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
     resp.raise_for_status()
     return resp.text
 
@@ -0,0 +1,197 @@
+from urllib.parse import urlsplit
+import hashlib
+import os
+import threading
+import time
+
+from src import metrics
+from src.storage import connect
+
+
+HASH_CHUNK = 1 << 20
+
+
+def _file_sha256(path: str) -> str:
+    """分块计算文件哈希，不把整个文件读入内存。"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(url: str) -> str:
+    """以巨潮的 url_path（如 finalpage/2025-08-30/1224.PDF）作为缓存键。"""
+    parts = urlsplit(url)
+    if parts.scheme and parts.netloc:
+        return parts.path.lstrip("/")
+    return url.lstrip("/")
+
+
+class PdfCache:
+    """按内容寻址的本地PDF缓存。
+
+    - 文件按 sha256 存放在 objects/ 下，相同内容只存一份；
+    - index.db 记录 url_path → sha256、大小和最近访问时间；
+    - 读取时校验哈希，损坏的条目视为未命中并删除；
+    - 总大小超过 max_bytes 时按最近最少使用（LRU）淘汰；
+    - 命中/未命中次数与节省的下载字节记入 metrics（pdf_cache_*_total），子进程的计数随解析结果合并回父进程。
+    """
+
+    def __init__(self, root: str = "data/pdf_cache", max_bytes: int = 2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        # 流式下载的临时文件放在缓存目录内，下载完成后 os.replace 移入 objects/，不再复制
+        self.spool_dir = os.path.join(root, "spool")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        # 抓取线程池共用一个实例，访问由 self._lock 串行化
+        self.conn = connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pdf_cache (
+                url_path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_cache_access ON pdf_cache (last_access)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_cache_sha ON pdf_cache (sha256)")
+        self.conn.commit()
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], sha + ".pdf")
+
+    def get(self, url: str) -> bytes | None:
+        key = cache_key(url)
+        with self._lock:
+            row = self.conn.execute("SELECT sha256, size FROM pdf_cache WHERE url_path=?", (key,)).fetchone()
+            if row is None:
+                metrics.inc("pdf_cache_misses_total")
+                return None
+            sha, size = row
+            try:
+                with open(self._blob_path(sha), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is None or hashlib.sha256(data).hexdigest() != sha:
+                # 文件丢失或损坏：删除条目，按未命中处理
+                self._remove(key, sha)
+                metrics.inc("pdf_cache_misses_total")
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE pdf_cache SET last_access=? WHERE url_path=?", (time.time(), key))
+            self._hit(size)
+            return data
+
+    def get_path(self, url: str) -> str | None:
+        """命中时返回缓存文件路径（分块校验哈希，不读入内存），未命中或损坏返回 None。"""
+        key = cache_key(url)
+        with self._lock:
+            row = self.conn.execute("SELECT sha256, size FROM pdf_cache WHERE url_path=?", (key,)).fetchone()
+            if row is None:
+                metrics.inc("pdf_cache_misses_total")
+                return None
+            sha, size = row
+            path = self._blob_path(sha)
+            try:
+                ok = _file_sha256(path) == sha
+            except OSError:
+                ok = False
+            if not ok:
+                self._remove(key, sha)
+                metrics.inc("pdf_cache_misses_total")
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE pdf_cache SET last_access=? WHERE url_path=?", (time.time(), key))
+            self._hit(size)
+            return path
+
+    def put_file(self, url: str, src_path: str) -> str:
+        """把已下载到磁盘的文件移入缓存（同一文件系统内 os.replace，不复制），返回缓存文件路径。
+
+        单个文件超过缓存上限时不缓存，原样返回 src_path。
+        """
+        key = cache_key(url)
+        size = os.path.getsize(src_path)
+        if size > self.max_bytes:
+            return src_path
+        sha = _file_sha256(src_path)
+        path = self._blob_path(sha)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(src_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(src_path, path)
+            self._set_entry(key, sha, size)
+            self._evict()
+        return path
+
+    def put(self, url: str, data: bytes) -> str:
+        """写入缓存，返回内容的 sha256。"""
+        key = cache_key(url)
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            self._set_entry(key, sha, len(data))
+            self._evict()
+        return sha
+
+    @staticmethod
+    def _hit(size: int) -> None:
+        metrics.inc("pdf_cache_hits_total")
+        metrics.inc("pdf_cache_bytes_saved_total", size)
+
+    def _set_entry(self, key: str, sha: str, size: int) -> None:
+        """登记 url_path → sha256；同一 URL 内容变化时，旧文件若不再被引用则删除，否则它会留在磁盘上且不计入淘汰。"""
+        old = self.conn.execute("SELECT sha256 FROM pdf_cache WHERE url_path=?", (key,)).fetchone()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pdf_cache (url_path, sha256, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, sha, size, time.time()),
+            )
+        if old and old[0] != sha:
+            self._unlink_unused(old[0])
+
+    def _remove(self, key: str, sha: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM pdf_cache WHERE url_path=?", (key,))
+        self._unlink_unused(sha)
+
+    def _unlink_unused(self, sha: str) -> None:
+        still_used = self.conn.execute("SELECT 1 FROM pdf_cache WHERE sha256=? LIMIT 1", (sha,)).fetchone()
+        if not still_used:
+            try:
+                os.remove(self._blob_path(sha))
+            except OSError:
+                pass
+
+    def _total_bytes(self) -> int:
+        # 同一内容可能对应多个 url_path，按去重后的文件计算占用
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM pdf_cache)").fetchone()
+        return row[0]
+
+    def _evict(self) -> None:
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT url_path, sha256 FROM pdf_cache ORDER BY last_access").fetchall()
+        for key, sha in rows:
+            if total <= self.max_bytes:
+                break
+            self._remove(key, sha)
+            total = self._total_bytes()
+
+    def close(self) -> None:
+        self.conn.close()
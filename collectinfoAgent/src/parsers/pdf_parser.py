@@ -1,43 +1,374 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Set, Iterator, Union
+from contextlib import contextmanager
 import pdfplumber
-import requests
 import io
+import mmap
+import os
+import tempfile
+from pdfminer.psparser import PSLiteral
+from pdfminer.pdftypes import resolve1
+import time
+import warnings
+import unicodedata
 
-def fetch_pdf_bytes(url: str, timeout: int = 30) -> bytes:
-    resp = requests.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
-    resp.raise_for_status()
+try:
+    from PyPDF2 import PdfReader
+except ImportError:  # PyPDF2 可选：缺失时分级提取全部走 pdfplumber
+    PdfReader = None
+
+from src import metrics
+from src.http_client import get_client
+from src.parsers.pdf_cache import PdfCache
+
+_pdf_cache: PdfCache | None = None
+_pdf_cache_enabled = True
+_pdf_cache_root = "data/pdf_cache"
+_pdf_cache_max_bytes = 2 * 1024 ** 3
+
+def configure_pdf_cache(root: str | None = None, max_bytes: int | None = None, enabled: bool = True) -> None:
+    """设置默认PDF缓存的位置、容量上限，或整体关闭缓存。"""
+    global _pdf_cache, _pdf_cache_enabled, _pdf_cache_root, _pdf_cache_max_bytes
+    if _pdf_cache is not None:
+        _pdf_cache.close()
+        _pdf_cache = None
+    _pdf_cache_enabled = enabled
+    if root:
+        _pdf_cache_root = root
+    if max_bytes:
+        _pdf_cache_max_bytes = max_bytes
+
+def pdf_cache_settings() -> Dict[str, Any]:
+    """当前缓存配置，供子进程用 configure_pdf_cache(**settings) 复现。"""
+    return {"root": _pdf_cache_root, "max_bytes": _pdf_cache_max_bytes, "enabled": _pdf_cache_enabled}
+
+def get_pdf_cache() -> PdfCache | None:
+    """返回默认PDF缓存（首次使用时创建），关闭缓存时返回 None。"""
+    global _pdf_cache
+    if not _pdf_cache_enabled:
+        return None
+    if _pdf_cache is None:
+        _pdf_cache = PdfCache(_pdf_cache_root, _pdf_cache_max_bytes)
+    return _pdf_cache
+
+def fetch_pdf_bytes(url: str, timeout: int = 30, use_cache: bool = True) -> bytes:
+    """下载PDF；默认先查本地缓存，use_cache=False 时强制重新下载且不写缓存。"""
+    cache = get_pdf_cache() if use_cache else None
+    if cache is not None:
+        data = cache.get(url)
+        if data is not None:
+            return data
+    with metrics.timer("pdf_download_seconds"):
+        resp = get_client().get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
+        resp.raise_for_status()
+    metrics.observe("pdf_download_bytes", len(resp.content), buckets=metrics.SIZE_BUCKETS)
+    if cache is not None:
+        cache.put(url, resp.content)
     return resp.content
 
-def extract_text_from_pdf_bytes(data: bytes) -> str:
+# 流式下载每次写盘的块大小
+DOWNLOAD_CHUNK = 1 << 20
+
+def download_pdf(url: str, dest: str, timeout: int = 30) -> int:
+    """流式下载PDF到 dest：分块写盘，内存占用与PDF大小无关；按 Content-Length 校验完整性，返回字节数。"""
+    size = 0
+    with metrics.timer("pdf_download_seconds"):
+        resp = get_client().get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"}, stream=True)
+        try:
+            resp.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in resp.iter_content(DOWNLOAD_CHUNK):
+                    f.write(chunk)
+                    size += len(chunk)
+        finally:
+            resp.close()
+    expected = resp.headers.get("Content-Length")
+    # 压缩传输时 Content-Length 是压缩后的长度，无法与解压后的字节数对比
+    if expected is not None and not resp.headers.get("Content-Encoding") and int(expected) != size:
+        metrics.inc("pdf_download_truncated_total")
+        raise IOError(f"PDF下载不完整: 期望 {expected} 字节，实际 {size} 字节 ({url})")
+    metrics.observe("pdf_download_bytes", size, buckets=metrics.SIZE_BUCKETS)
+    return size
+
+@contextmanager
+def fetch_pdf_file(url: str, timeout: int = 30, use_cache: bool = True) -> Iterator[str]:
+    """下载PDF到磁盘并给出文件路径，供 extract_* 以 mmap 方式打开。
+
+    启用缓存时命中直接返回缓存文件，未命中则流式下载到缓存的 spool 目录后移入缓存；
+    关闭缓存时下载到临时文件，退出 with 块时删除。
+    """
+    cache = get_pdf_cache() if use_cache else None
+    if cache is not None:
+        path = cache.get_path(url)
+        if path is not None:
+            yield path
+            return
+    fd, spool = tempfile.mkstemp(suffix=".pdf", dir=cache.spool_dir if cache is not None else None)
+    os.close(fd)
+    try:
+        download_pdf(url, spool, timeout)
+        yield cache.put_file(url, spool) if cache is not None else spool
+    finally:
+        if os.path.exists(spool):
+            os.remove(spool)
+
+# extract_* 接受的PDF来源：内存中的字节、文件路径或已打开的 mmap
+PdfSource = Union[bytes, bytearray, memoryview, str, os.PathLike, mmap.mmap]
+
+@contextmanager
+def _open_pdf(source: PdfSource) -> Iterator[Any]:
+    """把PDF来源转成 pdfplumber / PyPDF2 可读取的流。
+
+    字节包成 BytesIO；路径以只读 mmap 打开，页面按需从页缓存读取，多个进程解析同一文件时共享物理内存。
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+        return
+    if isinstance(source, mmap.mmap):
+        source.seek(0)
+        yield source
+        return
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"PDF文件为空: {source}")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+def extract_text_from_pdf_bytes(data: PdfSource) -> str:
     text_parts = []
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
+    with _open_pdf(data) as fp, pdfplumber.open(fp) as pdf:
         for page in pdf.pages:
             txt = page.extract_text() or ""
             text_parts.append(txt)
     return "\n".join(text_parts)
 
-def extract_tables_text_from_pdf_bytes(data: bytes) -> str:
+def _raw_tables(page) -> List[List[List[Optional[str]]]]:
+    """提取单页表格的原始单元格（合并单元格为 None），失败时返回空列表。"""
+    try:
+        return page.extract_tables() or []
+    except Exception:
+        return []
+
+def _tables_text(page, tables: Optional[List[List[List[Optional[str]]]]] = None) -> List[str]:
+    """提取单页表格，每张表按行拼成一段文本；已提取过原始表格时传入 tables。"""
+    if tables is None:
+        tables = _raw_tables(page)
+    table_texts: List[str] = []
+    for tbl in tables:
+        rows = []
+        for row in tbl or []:
+            cells = [c.strip() if isinstance(c, str) else "" for c in row]
+            rows.append(" ".join(cells))
+        if rows:
+            table_texts.append("\n".join(rows))
+    return table_texts
+
+def _release_page(page) -> None:
+    """释放页面缓存的版面对象（字符、线条、textmap），避免长报告内存持续增长。"""
+    close = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+    if close is not None:
+        close()
+
+def extract_tables_text_from_pdf_bytes(data: PdfSource) -> str:
     """尽力从PDF表格中提取文本（用于前十大股东表）。"""
     table_texts: List[str] = []
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
+    with _open_pdf(data) as fp, pdfplumber.open(fp) as pdf:
         for page in pdf.pages:
-            try:
-                tables = page.extract_tables() or []
-            except Exception:
-                tables = []
-            for tbl in tables:
-                rows = []
-                for row in tbl or []:
-                    cells = [c.strip() if isinstance(c, str) else "" for c in row]
-                    rows.append(" ".join(cells))
-                if rows:
-                    table_texts.append("\n".join(rows))
+            table_texts.extend(_tables_text(page))
     return "\n".join(table_texts)
 
-def extract_text_with_tables(data: bytes) -> str:
-    """合并正文与表格文本，提升股东名识别概率。"""
-    body = extract_text_from_pdf_bytes(data)
-    tables = extract_tables_text_from_pdf_bytes(data)
+# 股东章节定位：书签标题关键词、正文小标题，以及命中后向后延伸的页数（表格常跨页）
+SHAREHOLDER_OUTLINE_KEYWORDS = ("股东情况", "股东信息", "前十名股东", "前10名股东")
+SHAREHOLDER_HEADINGS = ("前十名股东", "前十名流通股东", "前十名无限售条件股东", "前10名股东", "前10名流通股东", "前10名无限售条件股东")
+SHAREHOLDER_PAGE_SPAN = 2
+
+def _outline_page_index(pdf, dest, action, page_index: Dict[Any, int]) -> int | None:
+    """把书签的 Dest / GoTo 动作解析成页序号（从0开始），解析失败返回 None。"""
+    try:
+        if dest is None and action is not None:
+            action = resolve1(action)
+            if isinstance(action, dict):
+                dest = action.get("D")
+        dest = resolve1(dest)
+        if isinstance(dest, PSLiteral):
+            dest = dest.name
+        if isinstance(dest, (bytes, str)):
+            dest = resolve1(pdf.doc.get_dest(dest))
+        if isinstance(dest, dict):
+            dest = resolve1(dest.get("D"))
+        if isinstance(dest, list) and dest:
+            return page_index.get(getattr(dest[0], "objid", None))
+    except Exception:
+        return None
+    return None
+
+def locate_shareholder_pages_by_outline(pdf) -> Set[int]:
+    """根据PDF书签定位股东章节所在页（从0开始）；没有书签或未匹配时返回空集合。"""
+    try:
+        outlines = list(pdf.doc.get_outlines())
+    except Exception:
+        return set()
+    page_index = {p.page_obj.pageid: i for i, p in enumerate(pdf.pages)}
+    entries = []
+    for level, title, dest, action, _ in outlines:
+        idx = _outline_page_index(pdf, dest, action, page_index)
+        if idx is not None:
+            entries.append((level, title or "", idx))
+    pages: Set[int] = set()
+    for n, (level, title, start) in enumerate(entries):
+        if not any(kw in title for kw in SHAREHOLDER_OUTLINE_KEYWORDS):
+            continue
+        # 章节结束于之后第一个同级或更高级书签
+        end = start + SHAREHOLDER_PAGE_SPAN
+        for next_level, _, next_start in entries[n + 1:]:
+            if next_level <= level and next_start >= start:
+                end = next_start
+                break
+        pages.update(range(start, min(end, len(pdf.pages) - 1) + 1))
+    return pages
+
+def _has_shareholder_heading(text: str) -> bool:
+    compact = text.replace(" ", "")
+    return any(h in compact for h in SHAREHOLDER_HEADINGS)
+
+def extract_pages(data: PdfSource, locate: bool = False, raw_tables: bool = False) -> List[Dict[str, Any]]:
+    """单次遍历PDF：每页在同一次访问中提取正文和表格，处理完立即释放该页缓存。
+
+    locate=True 时只对股东章节所在页做表格提取（表格提取是最耗时的调用）：
+    先用书签定位，再结合正文中的“前十名股东”等小标题扫描；两者都未命中时
+    回退为对全文提取表格。
+
+    返回 [{"page": 页码, "text": 正文, "tables": [表格文本, ...]}, ...]；
+    raw_tables=True 时每页另含 "raw_tables"（原始单元格，供 src.extract 解析股东表）。
+    """
+    pages: List[Dict[str, Any]] = []
+    with _open_pdf(data) as fp, pdfplumber.open(fp) as pdf:
+        candidates = locate_shareholder_pages_by_outline(pdf) if locate else set()
+        scan_until = -1
+        for i, page in enumerate(pdf.pages):
+            try:
+                start = time.perf_counter()
+                txt = page.extract_text() or ""
+                metrics.observe("pdf_page_parse_seconds", time.perf_counter() - start, part="text")
+                if locate and _has_shareholder_heading(txt):
+                    scan_until = i + SHAREHOLDER_PAGE_SPAN
+                if not locate or i in candidates or i <= scan_until:
+                    candidates.add(i)
+                    start = time.perf_counter()
+                    raw = _raw_tables(page)
+                    tables = _tables_text(page, raw)
+                    metrics.observe("pdf_page_parse_seconds", time.perf_counter() - start, part="tables")
+                else:
+                    raw, tables = [], []
+            finally:
+                _release_page(page)
+            pages.append({"page": page.page_number, "text": txt, "tables": tables})
+            if raw_tables:
+                pages[-1]["raw_tables"] = raw
+        if locate and not candidates:
+            # 未定位到股东章节：回退到全文表格提取
+            for i, page in enumerate(pdf.pages):
+                try:
+                    start = time.perf_counter()
+                    raw = _raw_tables(page)
+                    pages[i]["tables"] = _tables_text(page, raw)
+                    if raw_tables:
+                        pages[i]["raw_tables"] = raw
+                    metrics.observe("pdf_page_parse_seconds", time.perf_counter() - start, part="tables")
+                finally:
+                    _release_page(page)
+    return pages
+
+def join_pages(pages: List[Dict[str, Any]]) -> str:
+    """把 extract_pages 的结果拼成 extract_text_with_tables 的输出格式。"""
+    body = "\n".join(p["text"] for p in pages)
+    tables = "\n".join(t for p in pages for t in p["tables"])
     if tables:
         return body + "\n" + tables
-    return body
\ No newline at end of file
+    return body
+
+def extract_text_with_tables(data: PdfSource, locate: bool = False) -> str:
+    """合并正文与表格文本，提升股东名识别概率。
+
+    locate=True 时只提取股东章节的表格，见 extract_pages。
+    """
+    return join_pages(extract_pages(data, locate=locate))
+
+# 分级提取：快速文本层至少要有这么多可见字符，否则视为扫描页/编码异常
+FAST_TEXT_MIN_CHARS = 10
+FAST_TEXT_MAX_GARBLED_RATIO = 0.05
+
+def _looks_garbled(text: str) -> bool:
+    """快速文本层是否像乱码：控制字符或私用区字符占比过高（常见于未实现的 CMap 编码）。"""
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < FAST_TEXT_MIN_CHARS:
+        return True
+    bad = sum(1 for c in chars if unicodedata.category(c) in ("Cc", "Co", "Cn") or c == "\ufffd")
+    return bad / len(chars) > FAST_TEXT_MAX_GARBLED_RATIO
+
+def _fast_page_texts(data: PdfSource) -> List[str] | None:
+    """用 PyPDF2 提取每页文本；不可用或整体失败时返回 None。"""
+    if PdfReader is None:
+        return None
+    texts: List[str] = []
+    with warnings.catch_warnings(), _open_pdf(data) as fp:
+        warnings.simplefilter("ignore")
+        try:
+            # 传入流而不是路径：PyPDF2 对路径会把整个文件读入内存
+            reader = PdfReader(fp)
+            for page in reader.pages:
+                start = time.perf_counter()
+                try:
+                    texts.append(page.extract_text() or "")
+                except Exception:
+                    texts.append("")
+                metrics.observe("pdf_page_parse_seconds", time.perf_counter() - start, part="fast_text")
+        except Exception:
+            return None
+    return texts
+
+def extract_pages_tiered(data: PdfSource) -> List[Dict[str, Any]]:
+    """分级提取：先用 PyPDF2 快速取全部页面文本，只有以下页面升级到 pdfplumber：
+
+    - 快速文本中出现“前十名股东”等小标题的页面（及其后 SHAREHOLDER_PAGE_SPAN 页），提取正文和表格；
+    - 快速文本为空或疑似乱码的页面（扫描件、特殊编码），改用 pdfplumber 重新提取。
+
+    返回结构同 extract_pages，另含 "tier"（"pypdf2" / "pdfplumber"）和
+    "reason"（"fast" / "shareholder" / "fallback"）。
+    """
+    fast = _fast_page_texts(data)
+    if fast is None:
+        pages = extract_pages(data, locate=True)
+        for p in pages:
+            p["tier"], p["reason"] = "pdfplumber", "fallback"
+        return pages
+
+    reasons: Dict[int, str] = {}
+    scan_until = -1
+    for i, txt in enumerate(fast):
+        if _has_shareholder_heading(txt):
+            scan_until = i + SHAREHOLDER_PAGE_SPAN
+        if i <= scan_until:
+            reasons[i] = "shareholder"
+        elif _looks_garbled(txt):
+            reasons[i] = "fallback"
+
+    pages = [{"page": i + 1, "text": txt, "tables": [], "tier": "pypdf2", "reason": "fast"} for i, txt in enumerate(fast)]
+    if not reasons:
+        return pages
+    with _open_pdf(data) as fp, pdfplumber.open(fp) as pdf:
+        for i in sorted(reasons):
+            if i >= len(pdf.pages):
+                break
+            page = pdf.pages[i]
+            try:
+                start = time.perf_counter()
+                pages[i]["text"] = page.extract_text() or ""
+                pages[i]["tables"] = _tables_text(page)
+                metrics.observe("pdf_page_parse_seconds", time.perf_counter() - start, part="upgrade")
+            finally:
+                _release_page(page)
+            pages[i]["tier"], pages[i]["reason"] = "pdfplumber", reasons[i]
+    return pages
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Iterable, Iterator, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import os
+import signal
+import time
+
+from src import metrics
+from src.http_client import configure_http, http_settings
+from src.extract import parse_shareholder_tables
+from src.parsers.pdf_parser import configure_pdf_cache, extract_pages, fetch_pdf_file, join_pages, pdf_cache_settings
+
+
+class DocumentTimeout(BaseException):
+    """单份文档解析超时。继承 BaseException，避免被解析代码里的 except Exception 吞掉。"""
+
+
+def _on_alarm(signum, frame):
+    raise DocumentTimeout()
+
+
+_in_worker = False
+
+
+def _init_worker(cache_settings: Dict[str, Any], http: Dict[str, Any]) -> None:
+    # spawn 出来的子进程不继承父进程的模块状态，需要重新配置PDF缓存和HTTP限速
+    global _in_worker
+    _in_worker = True
+    configure_pdf_cache(**cache_settings)
+    configure_http(**http)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def _new_result(item: Dict[str, Any], pid: int | None = None) -> Dict[str, Any]:
+    """单份报告结果的初始字段；parse_report 与进程池异常时产出的失败结果共用，字段集合一致。"""
+    return {"url_path": item.get("url_path"), "title": item.get("title"), "column": item.get("column"),
+            "secCode": item.get("secCode"), "secName": item.get("secName"),
+            "ok": False, "text": "", "shareholders": [], "error": None, "elapsed": 0.0, "pid": pid}
+
+
+def parse_report(item: Dict[str, Any], timeout: float | None = None, locate: bool = True) -> Dict[str, Any]:
+    """下载并解析一份报告（在子进程中执行）。
+
+    同一次遍历中得到全文（text）和前十名股东表的类型化记录（shareholders，见 src.extract）。
+    timeout 为单份文档的时限（秒），依赖 SIGALRM，仅在类 Unix 系统生效。
+    """
+    start = time.time()
+    result = _new_result(item, os.getpid())
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # 流式下载到磁盘后以 mmap 解析，单个子进程不持有整份PDF的内存副本
+        with fetch_pdf_file(item["pdf_url"]) as path:
+            with metrics.timer("document_parse_seconds"):
+                pages = extract_pages(path, locate=locate, raw_tables=True)
+                result["text"] = join_pages(pages)
+                result["shareholders"] = parse_shareholder_tables(pages)
+        result["ok"] = True
+    except DocumentTimeout:
+        result["error"] = f"timeout after {timeout}s"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["elapsed"] = time.time() - start
+    metrics.inc("documents_total", status="ok" if result["ok"] else "failed")
+    if _in_worker:
+        # 子进程的指标随结果带回父进程合并
+        result["metrics"] = metrics.REGISTRY.drain()
+    return result
+
+
+def parse_reports(items: Iterable[Dict[str, Any]], workers: int | None = None, max_in_flight: int | None = None, max_tasks_per_child: int = 50, timeout: float | None = 120, locate: bool = True) -> Iterator[Dict[str, Any]]:
+    """用进程池并行解析报告，按完成顺序逐条产出结果。
+
+    - items 可以是 iter_announcements 返回的迭代器，按需拉取，抓取与解析可同时进行；
+    - 同时在途的文档数不超过 max_in_flight（默认 workers 的两倍）；
+    - 每个子进程处理 max_tasks_per_child 份文档后重建，抑制 pdfplumber 的内存增长；
+    - 单份文档超过 timeout 秒即放弃，返回 ok=False 的结果而不阻塞整批；
+    - 子进程意外退出时进程池整体失效，无法得知是哪份文档导致：重建进程池后把受影响的文档
+      逐份单独重跑，只有单独运行时仍使进程池崩溃的文档记为失败，其余正常产出结果；
+    - 每主机限速按 workers 均分给各子进程，整个进程池对同一主机的请求速率不超过配置值。
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    source = iter(items)
+    exhausted = False
+    suspects: deque = deque()   # 进程池崩溃时在途、待逐份隔离重跑的文档
+    while True:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            max_tasks_per_child=max_tasks_per_child,
+            initializer=_init_worker,
+            initargs=(pdf_cache_settings(), http_settings(processes=workers)),
+        )
+        in_flight: Dict[Any, Dict[str, Any]] = {}
+        broken = False
+        try:
+            while True:
+                if suspects:
+                    # 隔离重跑：池中只有这一份文档，崩溃即可确定是它
+                    if not in_flight:
+                        item = suspects.popleft()
+                        in_flight[pool.submit(parse_report, item, timeout, locate)] = item
+                else:
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        try:
+                            item = next(source)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        in_flight[pool.submit(parse_report, item, timeout, locate)] = item
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if any(isinstance(fut.exception(), BrokenProcessPool) for fut in done):
+                    broken = True
+                    # 进程池失效后其余在途任务很快都会结束（完成或同样报错），一并收取
+                    done, _ = wait(in_flight)
+                affected: List[Dict[str, Any]] = []
+                for fut in done:
+                    item = in_flight.pop(fut)
+                    try:
+                        result = fut.result()
+                        metrics.REGISTRY.merge(result.pop("metrics", {}))
+                        yield result
+                    except BrokenProcessPool as e:
+                        affected.append(item)
+                        error = f"worker died: {e}"
+                if broken:
+                    metrics.inc("worker_pool_broken_total")
+                    if len(affected) == 1:
+                        yield {**_new_result(affected[0]), "error": error}
+                    else:
+                        suspects.extend(affected)
+                    break
+        finally:
+            pool.shutdown(wait=not broken, cancel_futures=True)
@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Set, Tuple
+import time
+
+import numpy as np
+
+from src.config import RulesCfg
+
+# notify_on 中可用的条件，对应 HoldingsStore.diff_periods 的 change_type
+CONDITIONS = ("new_entry", "increase", "decrease", "exit")
+
+
+class Predicate(NamedTuple):
+    key: Tuple[Any, ...]          # 相同 key 的谓词在一批数据上只计算一次
+    column: str
+    test: Callable[[np.ndarray], np.ndarray]   # 输入整列数组，返回布尔数组
+
+
+class Rule(NamedTuple):
+    name: str
+    predicates: Tuple[Predicate, ...]
+
+
+class RuleStats(NamedTuple):
+    name: str
+    matched: int
+    seconds: float
+    unknown: int = 0                # 门槛所需数据缺失（如无价格算不出市值）而放行的记录数
+
+
+class RulesResult(NamedTuple):
+    matches: Dict[str, List[int]]   # 规则名 → 命中记录的下标
+    stats: List[RuleStats]
+    total: int
+
+
+def _ratio_at_least(threshold: float) -> Callable[[np.ndarray], np.ndarray]:
+    # 新进/退出没有变动比例（NaN），不受比例门槛限制
+    return lambda v: np.isnan(v) | (np.abs(v) >= threshold)
+
+
+def _value_at_least(threshold: float) -> Callable[[np.ndarray], np.ndarray]:
+    # 缺少价格数据时无法计算市值（NaN），视为未知并放行，避免漏报
+    return lambda v: np.isnan(v) | (v >= threshold)
+
+
+def _threshold_predicates(values: Dict[str, Any]) -> List[Predicate]:
+    preds: List[Predicate] = []
+    if values.get("min_change_ratio") is not None:
+        t = float(values["min_change_ratio"])
+        preds.append(Predicate(("min_change_ratio", t), "change_ratio", _ratio_at_least(t)))
+    if values.get("min_market_value") is not None:
+        t = float(values["min_market_value"])
+        preds.append(Predicate(("min_market_value", t), "market_value", _value_at_least(t)))
+    if values.get("min_shares") is not None:
+        t = int(values["min_shares"])
+        preds.append(Predicate(("min_shares", t), "shares_or_prev", lambda v, t=t: np.nan_to_num(v) >= t))
+    return preds
+
+
+def compile_rules(cfg: RulesCfg) -> List[Rule]:
+    """把 RulesCfg 编译成谓词组合：每条 notify_on 为一条规则，全局 thresholds 作用于所有规则，
+    单条规则内可用同名字段覆盖门槛，并可用 investors 限定投资人。"""
+    rules: List[Rule] = []
+    for n, item in enumerate(cfg.notify_on):
+        condition = item.get("condition")
+        if condition not in CONDITIONS:
+            raise ValueError(f"未知的 notify_on 条件: {condition}")
+        preds = [Predicate(("change_type", condition), "change_type", lambda v, c=condition: v == c)]
+        thresholds = {**cfg.thresholds, **{k: v for k, v in item.items() if k.startswith("min_")}}
+        preds.extend(_threshold_predicates(thresholds))
+        if item.get("investors"):
+            names = frozenset(item["investors"])
+            preds.append(Predicate(("investors", names), "investor", lambda v, s=names: np.isin(v, list(s))))
+        name = item.get("name") or condition
+        if any(r.name == name for r in rules):
+            name = f"{name}#{n}"
+        rules.append(Rule(name, tuple(preds)))
+    return rules
+
+
+COLUMNS = ("investor", "stock_code", "change_type", "change_ratio", "shares", "prev_shares", "price", "market_value")
+_NUMERIC = ("change_ratio", "shares", "prev_shares", "price", "market_value")
+# 需要外部数据才能计算的列：缺失时门槛放行，但计入 RuleStats.unknown 并告警（每条规则只告警一次）
+_EXTERNAL_COLUMNS = {"market_value": "price"}
+
+
+def _array(values: Sequence[Any] | np.ndarray | None, total: int, numeric: bool) -> np.ndarray:
+    # 数值列统一为 float64，None 记为 NaN；其余列为 object 数组
+    if values is None:
+        return np.full(total, np.nan) if numeric else np.full(total, None, dtype=object)
+    if numeric:
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    return np.asarray(values, dtype=object)
+
+
+def to_columns(records: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """把变动记录（字典列表）转成列式数组，并补齐派生列 market_value / shares_or_prev。"""
+    return derive_columns({k: [r.get(k) for r in records] for k in COLUMNS})
+
+
+def derive_columns(cols: Dict[str, Sequence[Any]]) -> Dict[str, np.ndarray]:
+    """把列字典转成 numpy 数组并补齐派生列 market_value（shares × price）与 shares_or_prev，
+    返回新的列字典，不修改传入的列。"""
+    ct = cols.get("change_type")
+    total = 0 if ct is None else len(ct)
+    out = {k: _array(v, total, k in _NUMERIC) for k, v in cols.items()}
+    for k in COLUMNS:
+        if k not in out:
+            out[k] = _array(None, total, k in _NUMERIC)
+    mv = out["market_value"]
+    out["market_value"] = np.where(np.isnan(mv), out["shares"] * out["price"], mv)
+    out["shares_or_prev"] = np.where(np.isnan(out["shares"]), out["prev_shares"], out["shares"])
+    return out
+
+
+class RulesEngine:
+    """规则引擎：一次编译，按列对整批持仓变动做数组运算求值，并统计每条规则的命中数与耗时。"""
+
+    def __init__(self, cfg: RulesCfg):
+        self.rules = compile_rules(cfg)
+        self._warned: Set[str] = set()
+
+    def evaluate(self, records: Sequence[Dict[str, Any]] | Dict[str, Sequence[Any]]) -> RulesResult:
+        """records 为变动记录列表或同样字段的列字典；两种输入都会先补齐派生列。
+        缺少外部数据而放行的记录数记在 RuleStats.unknown，告警每条规则只打印一次。"""
+        cols = derive_columns(records) if isinstance(records, dict) else to_columns(records)
+        total = len(cols["change_type"])
+        unknown = {c: int(np.isnan(cols[c]).sum()) for c in _EXTERNAL_COLUMNS}
+        masks: Dict[Tuple[Any, ...], np.ndarray] = {}
+        matches: Dict[str, List[int]] = {}
+        stats: List[RuleStats] = []
+        for rule in self.rules:
+            start = time.perf_counter()
+            combined = np.ones(total, dtype=bool)
+            for pred in rule.predicates:
+                mask = masks.get(pred.key)
+                if mask is None:
+                    mask = masks[pred.key] = np.asarray(pred.test(cols[pred.column]), dtype=bool)
+                combined &= mask
+            hit = np.flatnonzero(combined).tolist()
+            matches[rule.name] = hit
+            missing = max((unknown.get(pred.column, 0) for pred in rule.predicates), default=0)
+            if missing and rule.name not in self._warned:
+                self._warned.add(rule.name)
+                needed = next(_EXTERNAL_COLUMNS[p.column] for p in rule.predicates if p.column in _EXTERNAL_COLUMNS)
+                print(f"[警告] 规则 {rule.name}: {missing}/{total} 条记录缺少 {needed}，市值门槛未生效（已放行）")
+            stats.append(RuleStats(rule.name, len(hit), time.perf_counter() - start, missing))
+        return RulesResult(matches, stats, total)
+
+    def alerts(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """返回触发任一规则的记录，附带命中的规则名 rules。"""
+        result = self.evaluate(records)
+        hit_rules: Dict[int, List[str]] = {}
+        for name, idxs in result.matches.items():
+            for i in idxs:
+                hit_rules.setdefault(i, []).append(name)
+        return [{**records[i], "rules": names} for i, names in sorted(hit_rules.items())]
@@ -0,0 +1,152 @@
+from typing import Any, Callable, Dict, List
+from collections import deque
+from datetime import datetime
+import random
+import threading
+import time
+
+from src.config import ScheduleCfg
+
+
+def in_report_season(now: datetime, windows: List[str]) -> bool:
+    """判断是否处于财报密集披露期，windows 形如 ["08-15~08-31", "12-15~01-31"]（可跨年）。"""
+    md = now.strftime("%m-%d")
+    for w in windows:
+        start, _, end = w.partition("~")
+        if start <= end:
+            if start <= md <= end:
+                return True
+        elif md >= start or md <= end:
+            return True
+    return False
+
+
+class AdaptiveScheduler:
+    """自适应轮询调度器。
+
+    - 轮询间隔随上次运行发现的新公告数调整：有新公告则缩短，连续无新公告则逐步放宽，
+      范围限定在 [min_interval_minutes, max_interval_minutes]；披露期内不超过 season_interval_minutes；
+    - 每次间隔叠加 ±jitter_seconds 的随机抖动，避免与其他客户端同步请求；
+    - 任务在后台线程执行，trigger() 可从任意线程调用（如手动触发的信号）；上一轮未结束时
+      新的触发只会合并为一次待执行（coalesce），不会并行启动，backlog 为当前合并的触发数；
+    - snapshot() 返回运行次数、耗时、合并次数、积压等指标。
+
+    job 返回本次发现的新公告数。
+    """
+
+    def __init__(self, job: Callable[[], int], cfg: ScheduleCfg, name: str = "collect"):
+        self.job = job
+        self.cfg = cfg
+        self.name = name
+        self.interval = cfg.interval_minutes * 60.0
+        self.runs = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.last_new = 0
+        self.last_error: str | None = None
+        self.last_started: float | None = None
+        self.last_finished: float | None = None
+        self.next_run_at: float | None = None
+        self.latencies: deque = deque(maxlen=100)
+        self._pending = 0  # 本轮运行期间合并的触发数
+        self._requested = 0  # request_trigger 累计次数，只增不减，run_forever 与已处理数比较
+        self._running = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def next_interval(self, new_items: int, now: datetime | None = None) -> float:
+        cfg = self.cfg
+        lo, hi = cfg.min_interval_minutes * 60.0, cfg.max_interval_minutes * 60.0
+        if new_items > 0:
+            # 新公告越多收缩越快，披露高峰期很快降到最小间隔
+            self.interval = self.interval / (4 if new_items >= cfg.burst_threshold else 2)
+        else:
+            self.interval = self.interval * cfg.backoff_factor
+        self.interval = min(max(self.interval, lo), hi)
+        interval = self.interval
+        if in_report_season(now or datetime.now(), cfg.season_windows):
+            interval = min(interval, cfg.season_interval_minutes * 60.0)
+        return max(lo, interval + random.uniform(-cfg.jitter_seconds, cfg.jitter_seconds))
+
+    def trigger(self) -> bool:
+        """请求执行一次；已有任务在运行时合并为一次待执行，返回是否立即启动。"""
+        with self._lock:
+            if self._running:
+                self._pending += 1
+                self.coalesced += 1
+                return False
+            self._running = True
+        threading.Thread(target=self._run, name=f"{self.name}-job", daemon=True).start()
+        return True
+
+    def request_trigger(self) -> None:
+        """信号处理函数中使用：只递增计数，不取锁、不启动线程，由 run_forever 下一次循环调用 trigger()。
+
+        信号处理函数运行在主线程上，若直接调用 trigger()，而主线程此刻正持有 _lock，就会死锁。
+        """
+        self._requested += 1
+
+    def _run(self) -> None:
+        while True:
+            start = time.time()
+            self.last_started = start
+            try:
+                new_items = int(self.job() or 0)
+                self.last_error = None
+            except Exception as e:
+                new_items = 0
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+            finished = time.time()
+            self.latencies.append(finished - start)
+            self.runs += 1
+            self.last_new = new_items
+            self.last_finished = finished
+            self.next_run_at = finished + self.next_interval(new_items)
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                # 运行期间有新的触发：无论几次，都合并成紧接着的一次运行
+                self._pending = 0
+
+    def run_forever(self, on_tick: Callable[[Dict[str, Any]], None] | None = None) -> None:
+        """阻塞运行，直到 stop() 被调用。"""
+        self.next_run_at = time.time()
+        handled = self._requested
+        while not self._stop.is_set():
+            with self._lock:
+                # _requested 只由信号处理函数递增，这里只读，不会与之竞争
+                requested = self._requested
+            if requested != handled:
+                handled = requested
+                self.trigger()
+            if self.next_run_at is not None and time.time() >= self.next_run_at:
+                self.next_run_at = None
+                self.trigger()
+            if on_tick is not None:
+                on_tick(self.snapshot())
+            self._stop.wait(1.0)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+        now = time.time()
+        return {
+            "job": self.name,
+            "running": self._running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "backlog": self._pending,
+            "running_for": now - self.last_started if self._running and self.last_started else 0.0,
+            "last_new": self.last_new,
+            "last_error": self.last_error,
+            "last_latency": self.latencies[-1] if self.latencies else 0.0,
+            "p50_latency": lat[len(lat) // 2] if lat else 0.0,
+            "max_latency": lat[-1] if lat else 0.0,
+            "interval_seconds": self.interval,
+            "next_run_in": max(0.0, self.next_run_at - now) if self.next_run_at else None,
+        }
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Iterable, List
+from collections import Counter
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 可选：只有 Parquet 输出需要
+    pa = None
+    pq = None
+
+
+class JsonlSink:
+    """逐条写入 JSON Lines 文件的流式输出，内存占用与记录总数无关。
+
+    每写入 flush_every 条刷新一次缓冲区，下游可以边抓取边读取；
+    同时维护按交易所（column）的运行计数。
+    """
+
+    def __init__(self, path: str, flush_every: int = 50):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.total = 0
+        self.column_counts: Counter = Counter()
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write("\n")
+        self.total += 1
+        self.column_counts[record.get("column", "")] += 1
+        if self.total % self.flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            self._f.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# 公告记录的列式结构；column / category 取值很少，用字典编码
+REPORT_FIELDS = ("title", "pdf_url", "url_path", "column", "category", "announcementTime", "secCode", "secName")
+
+
+def _report_schema():
+    return pa.schema([
+        ("title", pa.string()),
+        ("pdf_url", pa.string()),
+        ("url_path", pa.string()),
+        ("column", pa.dictionary(pa.int8(), pa.string())),
+        ("category", pa.dictionary(pa.int8(), pa.string())),
+        ("announcementTime", pa.timestamp("ms", tz="Asia/Shanghai")),
+        ("secCode", pa.string()),
+        ("secName", pa.string()),
+    ])
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet 输出需要 pyarrow：pip install pyarrow")
+
+
+class ParquetSink:
+    """按行组（row group）批量写入 Parquet 文件的公告记录输出，接口与 JsonlSink 相同。
+
+    缓冲满 row_group_size 条写出一个行组，内存占用与记录总数无关；
+    每个行组带各列的最值统计，下游按 column / secCode 过滤时可跳过无关行组。
+    """
+
+    def __init__(self, path: str, row_group_size: int = 1000, compression: str = "zstd"):
+        _require_pyarrow()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.row_group_size = max(1, row_group_size)
+        self.total = 0
+        self.column_counts: Counter = Counter()
+        self.schema = _report_schema()
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        self.total += 1
+        self.column_counts[record.get("column", "")] += 1
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        columns = {name: [r.get(name) for r in self._buffer] for name in REPORT_FIELDS}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self._buffer = []
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_sink(path: str, fmt: str = "jsonl"):
+    """按格式创建输出：jsonl → JsonlSink，parquet → ParquetSink。"""
+    if fmt == "parquet":
+        return ParquetSink(path)
+    return JsonlSink(path)
+
+
+def read_reports(
+    path: str,
+    columns: Iterable[str] | None = None,
+    column: str | None = None,
+    sec_codes: Iterable[str] | None = None,
+):
+    """以内存映射方式打开 Parquet 公告文件，返回 pyarrow.Table。
+
+    column（sse/szse）与 sec_codes 作为过滤条件下推到行组统计，不满足的行组不会读入；
+    columns 只读取需要的列。需要 Python 对象时调用 .to_pylist()。
+    """
+    _require_pyarrow()
+    filters = []
+    if column is not None:
+        filters.append(("column", "=", column))
+    if sec_codes is not None:
+        filters.append(("secCode", "in", list(sec_codes)))
+    return pq.read_table(
+        path,
+        columns=list(columns) if columns is not None else None,
+        filters=filters or None,
+        memory_map=True,
+    )
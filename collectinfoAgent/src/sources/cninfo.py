@@ -1,7 +1,15 @@
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Set, Tuple, Iterator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import math
+import threading
 import re
 
+from src import metrics
+from src.http_client import get_client
+from src.storage import WatermarkStore
+
 # 巨潮历史公告查询接口
 API_URL = "https://www.cninfo.com.cn/new/hisAnnouncement/query"
 PDF_BASE = "https://static.cninfo.com.cn/"
@@ -18,82 +26,311 @@ HEADERS = {
     "Referer": "https://www.cninfo.com.cn/",
 }
 
-def fetch_semiannual_reports(page_size: int = 100, max_pages: int = 60, max_total: int = 6000, se_date: str = "2025-01-01~2025-12-31") -> List[Dict[str, Any]]:
+COLUMNS = ["szse", "sse"]  # 深交所/上交所
+
+# 列表页请求失败（重试耗尽）的记录，供调用方汇总；键为 (column, category)
+crawl_stats: Counter = Counter()
+dropped_pages: List[Tuple[str, str, int, str]] = []
+_stats_lock = threading.Lock()
+
+
+def _record_drop(column: str, cat: str, page_num: int, err: Exception) -> None:
+    """重试耗尽仍失败的页：计数并告警，而不是静默丢弃。"""
+    with _stats_lock:
+        crawl_stats["dropped_pages"] += 1
+        metrics.inc("list_pages_dropped_total", column=column)
+        dropped_pages.append((column, cat, page_num, f"{type(err).__name__}: {err}"))
+    print(f"[警告] 列表页抓取失败已跳过: column={column} category={cat} page={page_num} error={err}")
+
+
+def reset_crawl_stats() -> None:
+    """清零抓取统计（含 HTTP 计数），常驻进程每轮采集开始前调用，crawl_summary() 只反映本轮。"""
+    with _stats_lock:
+        crawl_stats.clear()
+        dropped_pages.clear()
+    get_client().reset_stats()
+
+
+def crawl_summary() -> Dict[str, Any]:
+    """返回自上次 reset_crawl_stats()（或进程启动）以来的抓取统计：成功页数、丢弃页数及 HTTP 重试计数。"""
+    with _stats_lock:
+        summary = dict(crawl_stats)
+        summary["dropped"] = list(dropped_pages)
+    summary["http"] = get_client().stats()
+    return summary
+
+
+def fetch_semiannual_reports(page_size: int = 100, max_pages: int = 60, max_total: int = 6000, se_date: str = "2025-01-01~2025-12-31", concurrency: int = 1, watermarks: WatermarkStore | None = None) -> List[Dict[str, Any]]:
     """专门获取半年报数据，支持获取6000只股票"""
-    return fetch_announcements(
+    return list(iter_semiannual_reports(page_size, max_pages, max_total, se_date, concurrency, watermarks))
+
+
+def iter_semiannual_reports(page_size: int = 100, max_pages: int = 60, max_total: int = 6000, se_date: str = "2025-01-01~2025-12-31", concurrency: int = 1, watermarks: WatermarkStore | None = None) -> Iterator[Dict[str, Any]]:
+    """fetch_semiannual_reports 的流式版本：每页返回后立即逐条产出。"""
+    return iter_announcements(
         periods=["semiannual"],
         page_size=page_size,
         max_pages=max_pages,
         max_total=max_total,
         se_date=se_date,
-        title_keywords=None
+        title_keywords=None,
+        concurrency=concurrency,
+        watermarks=watermarks,
     )
 
 
-def fetch_announcements(periods: List[str], page_size: int = 50, max_pages: int = 1, max_total: int = 50, se_date: str | None = None, title_keywords: List[str] | None = None) -> List[Dict[str, Any]]:
-    all_items: List[Dict[str, Any]] = []
-    seen = set()
-    columns = ["szse", "sse"]  # 深交所/上交所
+def _query_page(column: str, cat: str, page_num: int, page_size: int, se_date: str | None) -> Dict[str, Any]:
+    """请求一页公告列表，网络或解析异常直接抛出。"""
+    payload = {
+        "pageNum": page_num,
+        "pageSize": page_size,
+        "column": column,
+        "tabName": "fulltext",
+        "category": cat,
+        "seDate": se_date or "",  # 不限定时间范围，获取所有半年报
+        "plate": "",
+        "stock": "",
+        "searchkey": "",  # 不限定搜索关键词，获取所有半年报
+        "sortName": "announcementTime",  # 按公告时间排序
+        "sortType": "desc",  # 降序排列
+        "trade": "",
+    }
+    with metrics.timer("list_page_seconds", column=column):
+        resp = get_client().post(API_URL, data=payload, headers=HEADERS, timeout=15)
+        resp.raise_for_status()
+        data = resp.json()
+    metrics.inc("list_pages_total", column=column)
+    with _stats_lock:
+        crawl_stats["pages"] += 1
+    return data
+
+
+def _page_items(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return data.get("announcements") or data.get("classifiedAnnouncements") or []
+
+
+def _last_page(data: Dict[str, Any], page_size: int, max_pages: int) -> int:
+    """根据第一页返回的总条数估算需要抓取的末页，拿不到总数时退回 max_pages。"""
+    total = data.get("totalAnnouncement") or data.get("totalRecordNum")
+    try:
+        total = int(total)
+    except (TypeError, ValueError):
+        return max_pages
+    if total <= 0:
+        return max_pages
+    return min(max_pages, math.ceil(total / page_size))
+
+
+def _to_record(it: Dict[str, Any], column: str, cat: str, seen: set, title_keywords: List[str] | None) -> Dict[str, Any] | None:
+    """过滤 + 去重，返回结果记录；不符合条件返回 None。"""
+    title = it.get("announcementTitle") or ""
+    url_path = it.get("adjunctUrl") or ""
+    if not url_path:
+        return None
+    # 修改重复检测逻辑：考虑交易所信息
+    unique_key = f"{column}:{url_path}"
+    if unique_key in seen:
+        return None
+    seen.add(unique_key)
+    pdf_url = PDF_BASE + url_path
+    # 标题过滤：严格限定2025，且排除“更正/更正版/更新后”
+    title_clean = title.replace(" ", "")
+    # 放宽过滤条件，只排除明显无效的报告
+    # 只排除纯英文标题或完全无效的报告
+    if re.search(r"^(英文版|H股公告|境外上市外文版)$", title_clean):
+        return None
+    # 确保是半年报（放宽匹配条件）
+    if not re.search(r"(半年报|半年度报告|中期报告)", title_clean):
+        return None
+    # 不限定年份，获取所有年份的半年报
+    if title_keywords:
+        # 需要同时包含关键词与年份匹配
+        if not any(kw in title for kw in title_keywords):
+            return None
+    return {
+        "title": title,
+        "pdf_url": pdf_url,
+        "url_path": url_path,
+        "column": column,
+        "category": cat,
+        "announcementTime": it.get("announcementTime"),
+        "secCode": it.get("secCode"),
+        "secName": it.get("secName"),
+    }
+
+
+def _crawl_pairs(periods: List[str]) -> List[Tuple[str, str]]:
+    """按原有遍历顺序展开 (column, category) 组合：period → column → category。"""
+    pairs: List[Tuple[str, str]] = []
     for period in periods:
         cats = CATEGORY_MAP.get(period, [])
-        for column in columns:
+        for column in COLUMNS:
             for cat in cats:
-                for page_num in range(1, max_pages + 1):
-                    payload = {
-                        "pageNum": page_num,
-                        "pageSize": page_size,
-                        "column": column,
-                        "tabName": "fulltext",
-                        "category": cat,
-                        "seDate": se_date or "",  # 不限定时间范围，获取所有半年报
-                        "plate": "",
-                        "stock": "",
-                        "searchkey": "",  # 不限定搜索关键词，获取所有半年报
-                        "sortName": "announcementTime",  # 按公告时间排序
-                        "sortType": "desc",  # 降序排列
-                        "trade": "",
-                    }
-                    try:
-                        resp = requests.post(API_URL, data=payload, headers=HEADERS, timeout=15)
-                        resp.raise_for_status()
-                        data = resp.json()
-                    except Exception:
+                pairs.append((column, cat))
+    return pairs
+
+
+def fetch_announcements(periods: List[str], page_size: int = 50, max_pages: int = 1, max_total: int = 50, se_date: str | None = None, title_keywords: List[str] | None = None, concurrency: int = 1, watermarks: WatermarkStore | None = None) -> List[Dict[str, Any]]:
+    """抓取公告列表。
+
+    concurrency > 1 时启用并发抓取：多个 (column, category) 组合和页码区间并行请求，
+    结果仍按串行模式的顺序（period → column → category → 页码）合并、去重，
+    达到 max_total 后立即停止并取消尚未发出的请求。
+
+    传入 watermarks 时为增量模式：遇到早于水位线时间的公告即停止该组合的翻页，
+    与水位线同一时间戳的公告按已见过的 url_path 跳过；组合完整抓取结束后把本次最新的
+    时间戳及其下的全部公告写回水位线。
+
+    请求经 src.http_client 统一限速、重试；重试耗尽的页记入 crawl_summary() 并跳过，
+    出现过失败页的组合不会推进水位线，下次运行会重新覆盖。
+    """
+    return list(iter_announcements(periods, page_size, max_pages, max_total, se_date, title_keywords, concurrency, watermarks))
+
+
+def iter_announcements(periods: List[str], page_size: int = 50, max_pages: int = 1, max_total: int = 50, se_date: str | None = None, title_keywords: List[str] | None = None, concurrency: int = 1, watermarks: WatermarkStore | None = None) -> Iterator[Dict[str, Any]]:
+    """fetch_announcements 的流式版本：每页到达后立即逐条产出，顺序与去重规则不变。
+
+    调用方提前停止迭代时，尚未发出的请求会被取消，水位线也不会前移。
+    """
+    pairs = _crawl_pairs(periods)
+    stopped: set = set()  # 已碰到水位线、无需继续翻页的组合
+    if concurrency and concurrency > 1:
+        pages = _iter_pages_concurrent(pairs, page_size, max_pages, se_date, concurrency, stopped)
+    else:
+        pages = _iter_pages_serial(pairs, page_size, max_pages, se_date, stopped)
+
+    count = 0
+    seen = set()
+    current = None
+    mark = None
+    newest: List[Any] = []  # [本次最新时间戳, 该时间戳下的 url_path 集合]
+    failed = False
+    try:
+        for column, cat, items in pages:
+            if (column, cat) != current:
+                if watermarks is not None and current is not None and not failed:
+                    _advance_watermark(watermarks, current, se_date, mark, newest)
+                current = (column, cat)
+                mark = watermarks.get(column, cat, se_date) if watermarks is not None else None
+                newest = []
+                failed = False
+            if items is None:
+                failed = True
+                continue
+            for it in items:
+                ts, url_path = it.get("announcementTime"), it.get("adjunctUrl") or ""
+                if not newest:
+                    newest = [ts, set()]
+                if ts == newest[0] and url_path:
+                    newest[1].add(url_path)
+                if mark is not None:
+                    if _before_watermark(ts, mark):
+                        stopped.add(current)
+                        break
+                    if ts == mark[0] and url_path in mark[1]:
+                        # 水位线时间戳下已见过的公告：跳过但继续翻页，同一天的新公告可能排在其后
+                        continue
+                rec = _to_record(it, column, cat, seen, title_keywords)
+                if rec is None:
+                    continue
+                yield rec
+                count += 1
+                if count >= max_total:
+                    return
+        if watermarks is not None and current is not None and not failed:
+            _advance_watermark(watermarks, current, se_date, mark, newest)
+    finally:
+        pages.close()
+
+
+def _before_watermark(ts: int | None, mark: Tuple[int | None, Set[str]]) -> bool:
+    """列表按时间降序：严格早于水位线时间，说明后面都已见过。
+
+    announcementTime 只精确到天，同一时间戳内的顺序不固定，不能以某一条公告为界停止；
+    与水位线同一时间戳的公告由调用方按已见过的 url_path 集合逐条判断。
+    """
+    mark_time = mark[0]
+    return ts is not None and mark_time is not None and ts < mark_time
+
+
+def _advance_watermark(watermarks: WatermarkStore, pair: Tuple[str, str], se_date: str | None, mark, newest) -> None:
+    if not newest or not newest[1]:
+        return
+    newest_time, urls = newest
+    if mark is not None and newest_time == mark[0]:
+        # 最新时间戳没变：并入上次已见过的公告
+        if urls <= mark[1]:
+            return
+        urls = urls | mark[1]
+    watermarks.set(pair[0], pair[1], se_date, newest_time, urls)
+
+
+def _iter_pages_serial(pairs: List[Tuple[str, str]], page_size: int, max_pages: int, se_date: str | None, stopped: set) -> Iterator[Tuple[str, str, List[Dict[str, Any]] | None]]:
+    """按顺序逐页产出 (column, category, items)。
+
+    单页在 HTTP 层重试耗尽后产出 items=None 并继续后面的页；第一页失败时拿不到总条数，
+    只能结束该组合。
+    """
+    for column, cat in pairs:
+        last_page = max_pages
+        for page_num in range(1, max_pages + 1):
+            if page_num > last_page:
+                break
+            try:
+                data = _query_page(column, cat, page_num, page_size, se_date)
+            except Exception as e:
+                _record_drop(column, cat, page_num, e)
+                yield column, cat, None
+                if page_num == 1:
+                    break
+                continue
+            items = _page_items(data)
+            if not items:
+                break
+            if page_num == 1:
+                last_page = _last_page(data, page_size, max_pages)
+            yield column, cat, items
+            if (column, cat) in stopped:
+                break
+
+
+def _iter_pages_concurrent(pairs: List[Tuple[str, str]], page_size: int, max_pages: int, se_date: str | None, concurrency: int, stopped: set) -> Iterator[Tuple[str, str, List[Dict[str, Any]] | None]]:
+    """与 _iter_pages_serial 产出顺序相同，但页面请求在线程池中并发预取。"""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # 所有组合的第一页同时发出，顺便拿到总条数以确定页码区间
+        first_pages = [pool.submit(_query_page, column, cat, 1, page_size, se_date) for column, cat in pairs]
+        pending: deque = deque()
+        try:
+            for (column, cat), first in zip(pairs, first_pages):
+                try:
+                    data = first.result()
+                except Exception as e:
+                    _record_drop(column, cat, 1, e)
+                    yield column, cat, None
+                    continue
+                items = _page_items(data)
+                last_page = _last_page(data, page_size, max_pages)
+                next_page = 2
+                while items is None or items:
+                    yield column, cat, items
+                    if (column, cat) in stopped:
                         break
-                    items = data.get("announcements") or data.get("classifiedAnnouncements") or []
-                    if not items:
+                    # 保持最多 concurrency 个后续页在途，按页码顺序消费
+                    while next_page <= last_page and len(pending) < concurrency:
+                        pending.append((next_page, pool.submit(_query_page, column, cat, next_page, page_size, se_date)))
+                        next_page += 1
+                    if not pending:
                         break
-                    for it in items:
-                        title = it.get("announcementTitle") or ""
-                        url_path = it.get("adjunctUrl") or ""
-                        if not url_path:
-                            continue
-                        # 修改重复检测逻辑：考虑交易所信息
-                        unique_key = f"{column}:{url_path}"
-                        if unique_key in seen:
-                            continue
-                        seen.add(unique_key)
-                        pdf_url = PDF_BASE + url_path
-                        # 标题过滤：严格限定2025，且排除“更正/更正版/更新后”
-                        title_clean = title.replace(" ", "")
-                        # 放宽过滤条件，只排除明显无效的报告
-                        # 只排除纯英文标题或完全无效的报告
-                        if re.search(r"^(英文版|H股公告|境外上市外文版)$", title_clean):
-                            continue
-                        # 确保是半年报（放宽匹配条件）
-                        if not re.search(r"(半年报|半年度报告|中期报告)", title_clean):
-                            continue
-                        # 不限定年份，获取所有年份的半年报
-                        if title_keywords:
-                            # 需要同时包含关键词与年份匹配
-                            if not any(kw in title for kw in title_keywords):
-                                continue
-                        all_items.append({
-                            "title": title,
-                            "pdf_url": pdf_url,
-                            "url_path": url_path,
-                            "column": column,
-                            "category": cat,
-                        })
-                        if len(all_items) >= max_total:
-                            return all_items
-    return all_items
+                    page_num, fut = pending.popleft()
+                    try:
+                        items = _page_items(fut.result())
+                    except Exception as e:
+                        # 单页失败不影响后续页码
+                        _record_drop(column, cat, page_num, e)
+                        items = None
+                # 本组合提前结束（空页/水位线）时丢弃预取的页
+                while pending:
+                    pending.popleft()[1].cancel()
+        finally:
+            for fut in [f for _, f in pending] + first_pages:
+                fut.cancel()
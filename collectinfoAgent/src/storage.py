@@ -0,0 +1,221 @@
+from typing import Any, Dict, Iterable, List, Set, Tuple
+import os
+import sqlite3
+import time
+
+from src import metrics
+
+
+def connect(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """打开 SQLite 数据库（自动创建目录，启用 WAL 以便抓取与读取并发）。"""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class WatermarkStore:
+    """增量抓取水位线：记录每个 (column, category, seDate) 已见过的最新公告时间，
+    以及该时间戳下已见过的全部公告（url_path）。
+
+    公告列表按 announcementTime 降序返回，下次抓取遇到更早的公告即可停止翻页；
+    announcementTime 只精确到天，同一时间戳内顺序不固定，需按 url_path 集合区分新旧。
+    """
+
+    def __init__(self, sqlite_path: str):
+        self.conn = connect(sqlite_path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_watermarks (
+                column_name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                se_date TEXT NOT NULL,
+                announcement_time INTEGER,
+                url_path TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (column_name, category, se_date)
+            );
+            CREATE TABLE IF NOT EXISTS crawl_watermark_urls (
+                column_name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                se_date TEXT NOT NULL,
+                url_path TEXT NOT NULL,        -- 水位线时间戳下已见过的公告
+                PRIMARY KEY (column_name, category, se_date, url_path)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def get(self, column: str, category: str, se_date: str | None) -> Tuple[int | None, Set[str]] | None:
+        """返回 (水位线时间, 该时间戳下已见过的 url_path 集合)，没有水位线时返回 None。"""
+        key = (column, category, se_date or "")
+        row = self.conn.execute(
+            "SELECT announcement_time, url_path FROM crawl_watermarks WHERE column_name=? AND category=? AND se_date=?", key
+        ).fetchone()
+        if not row:
+            return None
+        urls = {r[0] for r in self.conn.execute(
+            "SELECT url_path FROM crawl_watermark_urls WHERE column_name=? AND category=? AND se_date=?", key
+        )}
+        urls.add(row[1])
+        return row[0], urls
+
+    def set(self, column: str, category: str, se_date: str | None, announcement_time: int | None, url_paths: Iterable[str]) -> None:
+        """写入水位线：url_paths 为 announcement_time 时间戳下已见过的全部公告（替换原集合）。"""
+        key = (column, category, se_date or "")
+        urls = sorted(set(url_paths))
+        with self.conn:
+            self.conn.execute("DELETE FROM crawl_watermark_urls WHERE column_name=? AND category=? AND se_date=?", key)
+            self.conn.executemany(
+                "INSERT INTO crawl_watermark_urls (column_name, category, se_date, url_path) VALUES (?, ?, ?, ?)",
+                [(*key, url) for url in urls],
+            )
+            self.conn.execute(
+                """
+                INSERT INTO crawl_watermarks (column_name, category, se_date, announcement_time, url_path, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (column_name, category, se_date) DO UPDATE SET
+                    announcement_time=excluded.announcement_time,
+                    url_path=excluded.url_path,
+                    updated_at=excluded.updated_at
+                """,
+                (*key, announcement_time, urls[0] if urls else "", time.time()),
+            )
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM crawl_watermarks")
+            self.conn.execute("DELETE FROM crawl_watermark_urls")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+HOLDING_FIELDS = ("investor", "stock_code", "stock_name", "period", "shares", "ratio", "share_class", "url_path")
+
+
+# 两期持仓对比：按 period 索引取出一期，再用主键 (investor, stock_code, period) 逐条查另一期
+DIFF_PERIODS_SQL = """
+SELECT c.investor, c.stock_code, COALESCE(c.stock_name, p.stock_name), p.shares, c.shares,
+       CASE
+           WHEN p.investor IS NULL THEN 'new_entry'
+           WHEN c.shares > p.shares THEN 'increase'
+           WHEN c.shares < p.shares THEN 'decrease'
+           ELSE 'unchanged'
+       END
+FROM holdings c LEFT JOIN holdings p
+    ON p.period = :prev AND p.investor = c.investor AND p.stock_code = c.stock_code
+WHERE c.period = :curr
+UNION ALL
+SELECT p.investor, p.stock_code, p.stock_name, p.shares, NULL, 'exit'
+FROM holdings p
+WHERE p.period = :prev AND NOT EXISTS (
+    SELECT 1 FROM holdings c
+    WHERE c.period = :curr AND c.investor = p.investor AND c.stock_code = p.stock_code
+)
+"""
+
+
+class HoldingsStore:
+    """前十大股东持仓库（StorageCfg.sqlite_path）。
+
+    - insert_many 在单个事务内批量写入（WAL 模式），同一 (投资人, 股票, 报告期) 重复写入时覆盖；
+    - (investor, period) 与 (stock_code, period) 上建覆盖索引，按人/按股查询不回表；
+    - diff_periods 用一条集合查询对比两个报告期，给出 new_entry/increase/decrease/exit。
+    """
+
+    def __init__(self, sqlite_path: str):
+        self.conn = connect(sqlite_path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS holdings (
+                investor TEXT NOT NULL,
+                stock_code TEXT NOT NULL,
+                stock_name TEXT,
+                period TEXT NOT NULL,          -- 报告期，如 2025-06-30
+                shares INTEGER,                -- 期末持股数量（股）
+                ratio REAL,                    -- 持股比例（%）
+                share_class TEXT,              -- 股份类别，如 A股/流通A股
+                url_path TEXT,                 -- 来源报告
+                PRIMARY KEY (investor, stock_code, period)
+            );
+            CREATE INDEX IF NOT EXISTS idx_holdings_investor_period
+                ON holdings (investor, period, stock_code, shares, stock_name);
+            CREATE INDEX IF NOT EXISTS idx_holdings_stock_period
+                ON holdings (stock_code, period, investor, shares);
+            -- diff_periods 按报告期取全量持仓，period 打头才能走索引区间而非全表扫描
+            CREATE INDEX IF NOT EXISTS idx_holdings_period
+                ON holdings (period, investor, stock_code, shares, stock_name);
+            """
+        )
+        self.conn.commit()
+
+    def insert_many(self, rows, batch_size: int = 5000) -> int:
+        """批量写入持仓记录（字典，字段见 HOLDING_FIELDS），返回写入条数。"""
+        sql = (
+            f"INSERT INTO holdings ({', '.join(HOLDING_FIELDS)}) VALUES ({', '.join('?' * len(HOLDING_FIELDS))}) "
+            "ON CONFLICT (investor, stock_code, period) DO UPDATE SET "
+            "stock_name=excluded.stock_name, shares=excluded.shares, ratio=excluded.ratio, "
+            "share_class=excluded.share_class, url_path=excluded.url_path"
+        )
+        total = 0
+        batch = []
+        with metrics.timer("db_write_seconds", table="holdings"), self.conn:
+            for row in rows:
+                batch.append(tuple(row.get(f) for f in HOLDING_FIELDS))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(sql, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                total += len(batch)
+        metrics.inc("db_rows_written_total", total, table="holdings")
+        return total
+
+    def investors(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT investor FROM holdings ORDER BY investor")]
+
+    def periods(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT period FROM holdings ORDER BY period")]
+
+    def holdings_of(self, investor: str, period: str | None = None) -> List[Dict[str, Any]]:
+        sql = "SELECT investor, stock_code, stock_name, period, shares FROM holdings WHERE investor=?"
+        params: list = [investor]
+        if period:
+            sql += " AND period=?"
+            params.append(period)
+        cols = ("investor", "stock_code", "stock_name", "period", "shares")
+        return [dict(zip(cols, r)) for r in self.conn.execute(sql + " ORDER BY period, stock_code", params)]
+
+    def diff_periods(self, prev_period: str, curr_period: str, include_unchanged: bool = False) -> List[Dict[str, Any]]:
+        """对比两个报告期的全部持仓变化。
+
+        change_type: new_entry（新进前十）/ increase / decrease / exit（退出前十）/ unchanged。
+        注意前十大股东口径下 exit 只表示跌出前十，不一定是清仓。
+        """
+        rows = self.conn.execute(DIFF_PERIODS_SQL, {"prev": prev_period, "curr": curr_period}).fetchall()
+        changes = []
+        for investor, stock_code, stock_name, prev_shares, curr_shares, change_type in rows:
+            if change_type == "unchanged" and not include_unchanged:
+                continue
+            change = (curr_shares or 0) - (prev_shares or 0)
+            changes.append({
+                "investor": investor,
+                "stock_code": stock_code,
+                "stock_name": stock_name,
+                "prev_period": prev_period,
+                "period": curr_period,
+                "prev_shares": prev_shares,
+                "shares": curr_shares,
+                "change_shares": change,
+                "change_ratio": change / prev_shares if prev_shares else None,
+                "change_type": change_type,
+            })
+        return changes
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 与各脚本一致：以 collectinfoAgent 目录为根导入 src.*；benchmarks/ 下的模拟服务与合成PDF用作测试数据
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
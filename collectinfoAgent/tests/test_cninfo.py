@@ -0,0 +1,80 @@
+import pytest
+
+from fake_cninfo import FakeCninfo
+from src import http_client
+from src.sources import cninfo
+from src.storage import WatermarkStore
+
+SE_DATE = "2025-01-01~2025-12-31"
+CATEGORY = "category_bndbg_szsh"
+NEWEST = 1756310400000  # FakeCninfo 列表第一条的 announcementTime
+DAY_MS = 86400 * 1000
+
+
+class GrowingCninfo(FakeCninfo):
+    """可以在列表最前面发布新公告的模拟服务（列表按时间降序）。"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.base = self.reports
+        self.published = []
+
+    def publish(self, ts, code):
+        self.published.insert(0, (ts, code))
+        self.reports += 1
+
+    def announcements(self, column, page_num, page_size):
+        items = [{
+            "secCode": code, "secName": f"新{code}", "announcementTitle": f"新{code}：2025年半年度报告",
+            "adjunctUrl": f"finalpage/new/{column}{code}.PDF", "announcementTime": ts,
+        } for ts, code in self.published]
+        items += super().announcements(column, 1, self.base)
+        start = (page_num - 1) * page_size
+        return items[start:start + page_size]
+
+
+@pytest.fixture
+def fake_cninfo(monkeypatch):
+    fake = GrowingCninfo(reports=25).start()
+    saved = http_client.http_settings()
+    http_client.configure_http(default_rate=1000, burst=1000)
+    monkeypatch.setattr(cninfo, "API_URL", fake.api_url)
+    monkeypatch.setattr(cninfo, "PDF_BASE", fake.base_url)
+    yield fake
+    fake.stop()
+    http_client.configure_http(**saved)
+
+
+def _crawl(marks):
+    return list(cninfo.iter_semiannual_reports(page_size=10, max_pages=5, se_date=SE_DATE, watermarks=marks))
+
+
+def test_watermark_advance(fake_cninfo, tmp_path):
+    marks = WatermarkStore(str(tmp_path / "marks.db"))
+    assert len(_crawl(marks)) == 50
+    for column, first in (("szse", "000000"), ("sse", "1000000")):
+        assert marks.get(column, CATEGORY, SE_DATE) == (NEWEST, {f"finalpage/2025-08-28/{column}{first}.PDF"})
+
+    # 没有新公告：每个交易所只请求第一页，碰到早于水位线的公告即停止
+    before = fake_cninfo.requests["query"]
+    assert _crawl(marks) == []
+    assert fake_cninfo.requests["query"] - before == 2
+
+    # 同一天（时间戳相同）新披露的公告排在已见过的公告之后也能取到，并入水位线集合
+    fake_cninfo.publish(NEWEST, "900001")
+    assert sorted(r["url_path"] for r in _crawl(marks)) == [
+        "finalpage/new/sse900001.PDF", "finalpage/new/szse900001.PDF"]
+    assert len(marks.get("szse", CATEGORY, SE_DATE)[1]) == 2
+    assert _crawl(marks) == []
+
+    # 更晚的公告：水位线时间前移，集合只保留最新时间戳下的公告
+    fake_cninfo.publish(NEWEST + DAY_MS, "900002")
+    assert [r["secCode"] for r in _crawl(marks)] == ["900002", "900002"]
+    assert marks.get("sse", CATEGORY, SE_DATE) == (NEWEST + DAY_MS, {"finalpage/new/sse900002.PDF"})
+
+
+def test_no_watermark_without_store(fake_cninfo):
+    reports = cninfo.fetch_semiannual_reports(page_size=10, max_pages=2, se_date=SE_DATE)
+    # 每个交易所只翻 max_pages 页
+    assert len(reports) == 40
+    assert {r["column"] for r in reports} == {"szse", "sse"}
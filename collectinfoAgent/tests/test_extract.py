@@ -0,0 +1,78 @@
+import pytest
+
+from src.extract import TOP10, TOP10_TRADABLE, holding_rows, parse_int, parse_ratio, parse_shareholder_tables, report_period
+from src.names import NameMatcher
+
+HEADER = ["股东名称", "股东性质", "持股比例(%)", "报告期末持股数量", "报告期内增减变动情况"]
+TRADABLE_HEADER = ["股东名称", "持有无限售条件流通股的数量", "股份种类"]
+
+
+def _row(n, name=None):
+    return [name or f"股东{n}", "境内自然人", f"{10 - n}.00", f"{(10 - n) * 1000:,}", "0"]
+
+
+def test_table_continues_on_next_page():
+    pages = [
+        {"page": 7, "raw_tables": [[HEADER] + [_row(n) for n in range(6)]]},
+        {"page": 8, "raw_tables": [[_row(n) for n in range(6, 10)], [TRADABLE_HEADER, ["葛 卫 东", "5,000", "人民币普通股"]]]},
+    ]
+    rows = parse_shareholder_tables(pages)
+    top10 = [r for r in rows if r.table == TOP10]
+    assert [r.holder for r in top10] == [f"股东{n}" for n in range(10)]
+    assert {r.page for r in top10} == {7}
+    assert top10[-1].shares == 1000 and top10[0].ratio == 10.0
+    tradable = [r for r in rows if r.table == TOP10_TRADABLE]
+    assert [(r.holder, r.shares, r.share_class) for r in tradable] == [("葛卫东", 5000, "人民币普通股")]
+
+
+@pytest.mark.parametrize("second_page", [
+    {"page": 8, "raw_tables": [[["其他", "表格"], ["1", "2"]]]},          # 列数不同
+    {"page": 9, "raw_tables": [[_row(n) for n in range(6, 10)]]},            # 不是下一页
+    {"page": 8, "raw_tables": [[["无关"] * 5], [_row(n) for n in range(6, 10)]]},  # 不是该页第一张表
+])
+def test_unrelated_table_is_not_a_continuation(second_page):
+    pages = [{"page": 7, "raw_tables": [[HEADER] + [_row(n) for n in range(6)]]}, second_page]
+    assert len(parse_shareholder_tables(pages)) == 6
+
+
+def test_full_table_is_not_continued_and_other_tables_skipped():
+    pages = [
+        {"page": 7, "raw_tables": [[HEADER] + [_row(n) for n in range(10)] + [["上述股东关联关系说明", "", "", "", ""]]]},
+        {"page": 8, "raw_tables": [[_row(0, "转融通出借股东")], [["参与转融通业务股东名称", "持股数量"], ["某基金", "100"]]]},
+    ]
+    assert len(parse_shareholder_tables(pages)) == 10
+
+
+def test_split_table_in_synthetic_report():
+    pytest.importorskip("pdfplumber")
+    from synthetic_pdf import build_report
+    from src.parsers.pdf_parser import extract_pages
+
+    def holders(split):
+        pages = extract_pages(build_report(10, "测试公司", 3, split_table=split), locate=True, raw_tables=True)
+        return pages, parse_shareholder_tables(pages)
+
+    pages, rows = holders(split=True)
+    assert sum(1 for p in pages if p.get("raw_tables")) >= 2
+    assert rows == holders(split=False)[1]
+    assert len(rows) == 10
+    assert {"葛卫东", "葛贵莲", "王孝安"} <= {r.holder for r in rows}
+
+
+def test_holding_rows_prefers_top10_table():
+    pages = [
+        {"page": 7, "raw_tables": [[HEADER] + [_row(0, "葛卫东"), _row(1, "葛卫东投资有限公司")]]},
+        {"page": 9, "raw_tables": [[TRADABLE_HEADER, ["葛卫东", "1,234", "人民币普通股"]]]},
+    ]
+    report = {"secCode": "000001", "secName": "测试", "title": "测试：2025年半年度报告", "url_path": "finalpage/a.PDF"}
+    rows = holding_rows(parse_shareholder_tables(pages), report, NameMatcher(["葛卫东"]))
+    assert len(rows) == 1
+    assert rows[0]["investor"] == "葛卫东" and rows[0]["period"] == "2025-06-30" and rows[0]["shares"] == 10000
+
+
+def test_number_and_period_parsing():
+    assert parse_int("1,234,567") == 1234567
+    assert parse_int("-") is None
+    assert parse_ratio("12.5%") == 12.5
+    assert report_period("2024年年度报告") == "2024-12-31"
+    assert report_period("关于召开股东大会的通知") is None
@@ -0,0 +1,24 @@
+from src.fulltext import ReportTextIndex
+
+
+def test_missing_keeps_order_and_skips_indexed(tmp_path):
+    index = ReportTextIndex(str(tmp_path / "t.db"))
+    index.add_many([
+        {"url_path": "finalpage/b.PDF", "text": "b"},
+        {"url_path": "finalpage/d.PDF", "text": "d"},
+    ])
+    paths = [f"finalpage/{c}.PDF" for c in "abcde"]
+    assert index.missing(paths, chunk_size=2) == ["finalpage/a.PDF", "finalpage/c.PDF", "finalpage/e.PDF"]
+    assert index.missing(iter([])) == []
+
+
+def test_search_ignores_whitespace_and_short_queries(tmp_path):
+    index = ReportTextIndex(str(tmp_path / "t.db"))
+    index.add("finalpage/a.PDF", "前十名股东 葛 卫 东 持股 1,000", title="A公司2025年半年度报告", column="szse")
+    index.add("finalpage/b.PDF", "前十名股东 王孝安", title="B公司2025年半年度报告", column="sse")
+    assert [h["url_path"] for h in index.search("葛卫东")] == ["finalpage/a.PDF"]
+    assert [h["url_path"] for h in index.search("孝安")] == ["finalpage/b.PDF"]
+    assert index.search("不存在的人") == []
+    # 内容不变时不重复写入
+    assert index.add("finalpage/b.PDF", "前十名股东 王孝安") is False
+    assert index.count() == 2
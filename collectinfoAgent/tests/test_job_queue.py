@@ -0,0 +1,85 @@
+import time
+
+from src.job_queue import JobQueue
+
+
+def _reports(n):
+    return [{"url_path": f"finalpage/2025-08-28/{i}.PDF", "title": f"报告{i}"} for i in range(n)]
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    assert queue.enqueue_many(_reports(5)) == 5
+    assert queue.enqueue_many(_reports(7)) == 2
+    assert queue.counts()["pending"] == 7
+
+
+def test_claims_are_exclusive_across_connections(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    a, b = JobQueue(path), JobQueue(path)
+    a.enqueue_many(_reports(10))
+    got_a = {j["url_path"] for j in a.claim("a", limit=6)}
+    got_b = {j["url_path"] for j in b.claim("b", limit=6)}
+    assert len(got_a) == 6 and len(got_b) == 4 and not got_a & got_b
+    assert b.claim("b") == []
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_rejected(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue_many(_reports(1))
+    [job] = queue.claim("a", lease_seconds=0.05)
+    assert queue.claim("b") == []
+    time.sleep(0.1)
+    [again] = queue.claim("b")
+    assert again["url_path"] == job["url_path"] and again["attempts"] == 0
+    assert queue.advance(job["url_path"], "stored", "a") is False
+    assert queue.advance(job["url_path"], "stored", "b") is True
+    assert queue.counts()["done"] == 1
+
+
+def test_release_returns_leases_immediately(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue_many(_reports(3))
+    queue.claim("a")
+    assert queue.release("a") == 3
+    assert len(queue.claim("a")) == 3
+    assert queue.renew("a") == 3
+
+
+def test_failures_retry_until_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    queue.enqueue_many(_reports(1))
+    [job] = queue.claim("a")
+    queue.fail(job["url_path"], "a", "HTTPError: 503")
+    [job] = queue.claim("a")
+    assert job["attempts"] == 1
+    queue.fail(job["url_path"], "a", "HTTPError: 503")
+    assert queue.claim("a") == []
+    assert queue.failures() == [{"url_path": job["url_path"], "state": "listed", "attempts": 2, "error": "HTTPError: 503"}]
+    assert queue.retry_failed() == 1
+    assert queue.claim("a")[0]["attempts"] == 0
+
+
+def test_parsed_result_survives_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path)
+    queue.enqueue_many(_reports(1))
+    [job] = queue.claim("w")
+    assert queue.advance(job["url_path"], "parsed", "w", result={"url_path": job["url_path"], "text": "正文"})
+    queue.close()
+
+    queue = JobQueue(path)
+    queue.release("w")
+    [job] = queue.claim("w")
+    assert job["state"] == "parsed"
+    assert queue.saved_result(job["url_path"])["text"] == "正文"
+    assert queue.advance(job["url_path"], "stored", "w")
+    assert queue.saved_result(job["url_path"]) is None
+
+
+def test_shards_partition_the_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue_many(_reports(40))
+    shards = [{j["url_path"] for j in queue.claim(f"w{i}", limit=100, shard=i, num_shards=3)} for i in range(3)]
+    assert sum(len(s) for s in shards) == 40
+    assert not (shards[0] & shards[1] or shards[0] & shards[2] or shards[1] & shards[2])
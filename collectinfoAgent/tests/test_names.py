@@ -0,0 +1,16 @@
+from src.names import NameMatcher
+
+
+def test_find_all_matches_spaced_names_and_aliases():
+    matcher = NameMatcher({"葛卫东": ["葛衛東"], "王孝安": []})
+    text = "1 葛 卫 东 境内自然人\n2 王孝安\n3 葛衛東"
+    matches = matcher.find_all(text)
+    assert [(m.investor, m.alias) for m in matches] == [("葛卫东", "葛卫东"), ("王孝安", "王孝安"), ("葛卫东", "葛衛東")]
+    first = matches[0]
+    assert text[first.start:first.end] == "葛 卫 东"
+
+
+def test_overlapping_patterns_all_reported():
+    matcher = NameMatcher(["葛贵", "葛贵莲"], ignore_spaces=False)
+    assert sorted(m.investor for m in matcher.find_all("葛贵莲")) == ["葛贵", "葛贵莲"]
+    assert matcher.find_all("葛 贵莲") == []
@@ -0,0 +1,47 @@
+import hashlib
+import os
+
+from src import metrics
+from src.parsers.pdf_cache import PdfCache
+
+
+def _blob_count(root):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(root, "objects")))
+
+
+def test_replaced_content_unlinks_old_blob(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("http://static.cninfo.com.cn/finalpage/a.PDF", b"old" * 10)
+    old_blob = cache._blob_path(hashlib.sha256(b"old" * 10).hexdigest())
+    assert os.path.exists(old_blob)
+    cache.put("finalpage/a.PDF", b"new" * 10)
+    assert not os.path.exists(old_blob)
+    assert cache.get("finalpage/a.PDF") == b"new" * 10
+    assert _blob_count(tmp_path) == 1
+
+
+def test_shared_blob_kept_while_referenced(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("finalpage/a.PDF", b"same")
+    cache.put("finalpage/b.PDF", b"same")
+    cache.put("finalpage/a.PDF", b"changed")
+    assert cache.get("finalpage/b.PDF") == b"same"
+    assert _blob_count(tmp_path) == 2
+
+
+def test_hits_and_bytes_saved_go_to_metrics(tmp_path):
+    metrics.REGISTRY.reset()
+    cache = PdfCache(str(tmp_path), max_bytes=1 << 20)
+    cache.put("finalpage/a.PDF", b"x" * 100)
+    assert cache.get("finalpage/a.PDF") is not None
+    assert cache.get_path("finalpage/a.PDF") is not None
+    assert cache.get("finalpage/missing.PDF") is None
+    reg = metrics.REGISTRY
+    assert reg.total("pdf_cache_hits_total") == 2
+    assert reg.total("pdf_cache_misses_total") == 1
+    assert reg.total("pdf_cache_bytes_saved_total") == 200
+    # 子进程 drain() 出的计数合并回父进程
+    state = reg.drain()
+    reg.merge(state)
+    reg.merge(state)
+    assert reg.total("pdf_cache_hits_total") == 4
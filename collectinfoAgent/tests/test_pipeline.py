@@ -0,0 +1,23 @@
+import os
+import time
+
+from src import pipeline
+
+
+def _fake_parse(item, timeout=None, locate=True):
+    # 在子进程中执行：crash 为真时模拟 pdfplumber 段错误之类的进程崩溃
+    if item.get("crash"):
+        os._exit(1)
+    time.sleep(0.05)
+    return {**pipeline._new_result(item, os.getpid()), "ok": True}
+
+
+def test_broken_pool_fails_only_the_crashing_document(monkeypatch):
+    monkeypatch.setattr(pipeline, "parse_report", _fake_parse)
+    items = [{"url_path": f"finalpage/{i}.PDF", "crash": i == 5} for i in range(12)]
+    results = list(pipeline.parse_reports(items, workers=3, timeout=None))
+    assert sorted(r["url_path"] for r in results) == sorted(i["url_path"] for i in items)
+    failed = [r for r in results if not r["ok"]]
+    assert [r["url_path"] for r in failed] == ["finalpage/5.PDF"]
+    assert failed[0]["error"].startswith("worker died")
+    assert set(failed[0]) == set(results[0]) - {"metrics"}
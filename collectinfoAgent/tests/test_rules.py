@@ -0,0 +1,85 @@
+import pytest
+
+from src.config import RulesCfg
+from src.rules import RulesEngine, compile_rules, derive_columns
+
+CHANGES = [
+    {"investor": "葛卫东", "stock_code": "000001", "change_type": "new_entry", "shares": 1000, "prev_shares": None, "change_ratio": None},
+    {"investor": "葛卫东", "stock_code": "000002", "change_type": "increase", "shares": 2000, "prev_shares": 1000, "change_ratio": 1.0, "price": 10.0},
+    {"investor": "王孝安", "stock_code": "000003", "change_type": "increase", "shares": 1050, "prev_shares": 1000, "change_ratio": 0.05},
+    {"investor": "王孝安", "stock_code": "000004", "change_type": "decrease", "shares": 500, "prev_shares": 1000, "change_ratio": -0.5, "price": 1.0},
+    {"investor": "何雪萍", "stock_code": "000005", "change_type": "exit", "shares": None, "prev_shares": 800, "change_ratio": -1.0},
+]
+
+
+def _naive(cfg, records):
+    """逐条按规则语义判断，作为向量化实现的对照。"""
+    result = {}
+    for n, item in enumerate(cfg.notify_on):
+        t = {**cfg.thresholds, **{k: v for k, v in item.items() if k.startswith("min_")}}
+        hits = []
+        for i, r in enumerate(records):
+            mv = r["shares"] * r["price"] if r.get("shares") is not None and r.get("price") is not None else None
+            shares = r["shares"] if r.get("shares") is not None else r.get("prev_shares")
+            ok = (r["change_type"] == item["condition"]
+                  and (t.get("min_change_ratio") is None or r["change_ratio"] is None or abs(r["change_ratio"]) >= t["min_change_ratio"])
+                  and (t.get("min_market_value") is None or mv is None or mv >= t["min_market_value"])
+                  and (t.get("min_shares") is None or (shares or 0) >= t["min_shares"])
+                  and (not item.get("investors") or r["investor"] in item["investors"]))
+            if ok:
+                hits.append(i)
+        result[item.get("name") or item["condition"]] = hits
+    return result
+
+
+CFG = RulesCfg(
+    notify_on=[
+        {"condition": "new_entry"},
+        {"condition": "increase", "min_change_ratio": 0.1},
+        {"condition": "decrease", "investors": ["王孝安"], "min_market_value": 1000},
+        {"condition": "exit", "name": "big_exit", "min_shares": 1000},
+    ],
+    thresholds={"min_change_ratio": 0.01, "min_market_value": 100},
+)
+
+
+def test_matches_agree_with_naive_evaluation():
+    result = RulesEngine(CFG).evaluate(CHANGES)
+    assert result.matches == _naive(CFG, CHANGES)
+    assert result.matches == {"new_entry": [0], "increase": [1], "decrease": [], "big_exit": []}
+    assert result.total == len(CHANGES)
+
+
+def test_missing_price_is_counted_and_warned_once_per_rule(capsys):
+    engine = RulesEngine(CFG)
+    first = engine.evaluate(CHANGES)
+    # 3 条记录没有 price，市值门槛放行并计数
+    assert {s.name: s.unknown for s in first.stats} == {"new_entry": 3, "increase": 3, "decrease": 3, "big_exit": 3}
+    assert capsys.readouterr().out.count("[警告]") == 4
+    second = engine.evaluate(CHANGES)
+    assert [s.unknown for s in second.stats] == [s.unknown for s in first.stats]
+    assert capsys.readouterr().out == ""
+
+
+def test_column_input_and_alerts():
+    engine = RulesEngine(RulesCfg(notify_on=[{"condition": "increase"}, {"condition": "increase", "investors": ["葛卫东"]}]))
+    cols = {k: [r.get(k) for r in CHANGES] for k in ("investor", "change_type", "shares", "prev_shares", "change_ratio", "price")}
+    assert engine.evaluate(cols).matches == {"increase": [1, 2], "increase#1": [1]}
+    alerts = engine.alerts(CHANGES)
+    assert [(a["stock_code"], a["rules"]) for a in alerts] == [("000002", ["increase", "increase#1"]), ("000003", ["increase"])]
+
+
+def test_derived_columns():
+    cols = derive_columns({"change_type": ["exit", "increase"], "shares": [None, 10], "prev_shares": [5, 1], "price": [2.0, 3.0]})
+    assert list(cols["shares_or_prev"]) == [5, 10]
+    assert cols["market_value"][1] == 30.0
+
+
+def test_unknown_condition_rejected():
+    with pytest.raises(ValueError):
+        compile_rules(RulesCfg(notify_on=[{"condition": "doubled"}]))
+
+
+def test_empty_input():
+    result = RulesEngine(CFG).evaluate([])
+    assert result.total == 0 and all(not hits for hits in result.matches.values())
@@ -0,0 +1,57 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.config import ScheduleCfg
+from src.scheduler import AdaptiveScheduler, in_report_season
+
+WINDOWS = ["03-20~04-30", "07-15~08-31", "12-15~01-31"]
+
+
+@pytest.mark.parametrize("day, expected", [
+    ("2025-03-20", True), ("2025-04-30", True), ("2025-05-01", False), ("2025-08-15", True),
+    ("2025-12-14", False), ("2025-12-15", True), ("2025-12-31", True), ("2026-01-01", True),
+    ("2026-01-31", True), ("2026-02-01", False),
+])
+def test_in_report_season_including_year_wrap(day, expected):
+    assert in_report_season(datetime.fromisoformat(day), WINDOWS) is expected
+
+
+def test_in_report_season_without_windows():
+    assert in_report_season(datetime(2025, 8, 15), []) is False
+
+
+def test_next_interval_adapts_and_caps_in_season():
+    cfg = ScheduleCfg(interval_minutes=60, min_interval_minutes=5, max_interval_minutes=240, backoff_factor=2,
+                      burst_threshold=50, jitter_seconds=0, season_windows=["08-01~08-31"], season_interval_minutes=10)
+    sched = AdaptiveScheduler(lambda: 0, cfg)
+    quiet = datetime(2025, 6, 1)
+    assert sched.next_interval(0, quiet) == 120 * 60
+    assert sched.next_interval(0, quiet) == 240 * 60      # 不超过 max_interval
+    assert sched.next_interval(10, quiet) == 120 * 60
+    assert sched.next_interval(100, quiet) == 30 * 60     # 达到 burst_threshold 时缩为 1/4
+    assert sched.next_interval(0, datetime(2025, 8, 15)) == 10 * 60
+
+
+def test_triggers_during_a_run_are_coalesced():
+    release = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(time.time())
+        release.wait(5)
+        return 0
+
+    sched = AdaptiveScheduler(job, ScheduleCfg(jitter_seconds=0))
+    assert sched.trigger() is True
+    for _ in range(3):
+        assert sched.trigger() is False
+    assert sched.snapshot()["backlog"] == 3
+    release.set()
+    deadline = time.time() + 5
+    while sched.snapshot()["running"] and time.time() < deadline:
+        time.sleep(0.01)
+    # 运行期间的 3 次触发只合并成紧接着的一次运行
+    assert len(calls) == 2 and sched.runs == 2 and sched.coalesced == 3
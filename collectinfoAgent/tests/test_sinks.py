@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from src.sinks import JsonlSink, ParquetSink, open_sink, read_reports
+
+RECORDS = [
+    {
+        "title": f"{name}2025年半年度报告", "pdf_url": f"http://static.cninfo.com.cn/finalpage/{code}.PDF",
+        "url_path": f"finalpage/{code}.PDF", "column": column, "category": "category_bndbg_szsh",
+        "announcementTime": 1756483200000 + i, "secCode": code, "secName": name,
+    }
+    for i, (code, name, column) in enumerate([
+        ("600001", "沪一", "sse"), ("000002", "深二", "szse"), ("600003", "沪三", "sse"), ("000004", "深四", "szse"),
+    ])
+]
+
+
+def _write(sink):
+    with sink:
+        for record in RECORDS:
+            sink.write(record)
+    return sink
+
+
+def test_jsonl_round_trip(tmp_path):
+    sink = _write(JsonlSink(str(tmp_path / "out" / "reports.jsonl"), flush_every=3))
+    assert sink.total == 4 and sink.column_counts == {"sse": 2, "szse": 2}
+    with open(sink.path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == RECORDS
+
+
+def test_parquet_round_trip_and_filters(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "reports.parquet")
+    # 每两条一个行组，过滤条件可以跳过整组
+    sink = _write(ParquetSink(path, row_group_size=2))
+    assert sink.total == 4
+    with open_sink(str(tmp_path / "other.parquet"), "parquet") as other:
+        assert isinstance(other, ParquetSink)
+
+    rows = read_reports(path).to_pylist()
+    assert [{k: v for k, v in r.items() if k != "announcementTime"} for r in rows] == [
+        {k: v for k, v in r.items() if k != "announcementTime"} for r in RECORDS]
+    assert [int(r["announcementTime"].timestamp() * 1000) for r in rows] == [r["announcementTime"] for r in RECORDS]
+
+    sse = read_reports(path, columns=["secCode"], column="sse").to_pylist()
+    assert sse == [{"secCode": "600001"}, {"secCode": "600003"}]
+    assert read_reports(path, columns=["secName"], sec_codes=["000004"]).to_pylist() == [{"secName": "深四"}]
@@ -0,0 +1,72 @@
+import random
+
+from src.storage import DIFF_PERIODS_SQL, HoldingsStore
+
+
+def _naive_diff(rows, prev_period, curr_period):
+    prev = {(r["investor"], r["stock_code"]): r for r in rows if r["period"] == prev_period}
+    curr = {(r["investor"], r["stock_code"]): r for r in rows if r["period"] == curr_period}
+    changes = {}
+    for key, c in curr.items():
+        p = prev.get(key)
+        if p is None:
+            change_type = "new_entry"
+        elif c["shares"] > p["shares"]:
+            change_type = "increase"
+        elif c["shares"] < p["shares"]:
+            change_type = "decrease"
+        else:
+            continue
+        changes[key] = (change_type, p["shares"] if p else None, c["shares"])
+    for key, p in prev.items():
+        if key not in curr:
+            changes[key] = ("exit", p["shares"], None)
+    return changes
+
+
+def _random_rows(seed=7):
+    rnd = random.Random(seed)
+    rows = []
+    for period in ("2024-06-30", "2024-12-31", "2025-06-30"):
+        for investor in ("葛卫东", "王孝安", "赵建平"):
+            for code in rnd.sample([f"{i:06d}" for i in range(40)], 15):
+                rows.append({
+                    "investor": investor, "stock_code": code, "stock_name": f"股票{code}",
+                    "period": period, "shares": rnd.choice([1000, 2000, 3000]),
+                })
+    return rows
+
+
+def test_diff_periods_matches_naive_diff():
+    rows = _random_rows()
+    store = HoldingsStore(":memory:")
+    store.insert_many(rows)
+    for prev_period, curr_period in (("2024-06-30", "2024-12-31"), ("2024-12-31", "2025-06-30")):
+        got = {
+            (c["investor"], c["stock_code"]): (c["change_type"], c["prev_shares"], c["shares"])
+            for c in store.diff_periods(prev_period, curr_period)
+        }
+        assert got == _naive_diff(rows, prev_period, curr_period)
+    assert {c["change_type"] for c in store.diff_periods("2024-12-31", "2025-06-30")} == {
+        "new_entry", "increase", "decrease", "exit"}
+
+
+def test_diff_periods_include_unchanged_and_ratio():
+    store = HoldingsStore(":memory:")
+    store.insert_many([
+        {"investor": "葛卫东", "stock_code": "000001", "period": "2024-12-31", "shares": 100},
+        {"investor": "葛卫东", "stock_code": "000001", "period": "2025-06-30", "shares": 150},
+        {"investor": "葛卫东", "stock_code": "000002", "period": "2024-12-31", "shares": 100},
+        {"investor": "葛卫东", "stock_code": "000002", "period": "2025-06-30", "shares": 100},
+    ])
+    assert [c["stock_code"] for c in store.diff_periods("2024-12-31", "2025-06-30")] == ["000001"]
+    changes = store.diff_periods("2024-12-31", "2025-06-30", include_unchanged=True)
+    assert {c["stock_code"]: c["change_type"] for c in changes} == {"000001": "increase", "000002": "unchanged"}
+    assert changes[0]["change_ratio"] == 0.5
+
+
+def test_diff_periods_uses_period_index():
+    store = HoldingsStore(":memory:")
+    plan = [r[3] for r in store.conn.execute("EXPLAIN QUERY PLAN " + DIFF_PERIODS_SQL, {"prev": "a", "curr": "b"})]
+    assert not any(step.startswith("SCAN") for step in plan), plan
+    assert any("idx_holdings_period" in step for step in plan), plan
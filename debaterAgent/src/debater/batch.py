@@ -0,0 +1,80 @@
+"""
+批量并发辩论：多只股票的辩论同时进行，LLM 在途请求数有上限
+
+    from debater.batch import run_debates
+    from debater.graph import build_debate_graph
+    from debater.roles import DummyLLM
+
+    results = run_debates(events, build_debate_graph, DummyLLM(), max_rounds=3,
+                          max_debates=8, max_llm_in_flight=4, cache_path="data/llm_cache.db")
+
+辩论图本身是同步的：每个事件在线程中运行 build_debate_graph(llm, max_rounds)(event)，
+所有辩论共享同一个 CachedLLM，因此并发度由 max_llm_in_flight 统一控制，
+重复事件的提示词直接命中缓存。
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+from debater.llm_cache import CachedLLM, LLMResponseCache, DEFAULT_TTL_SECONDS
+
+
+def _event_key(event: Any) -> str:
+    if isinstance(event, dict):
+        return str(event.get("ticker"))
+    return str(getattr(event, "ticker", event))
+
+
+async def run_debates_async(
+    events: Iterable[Any],
+    build_graph: Callable[[Any, int], Callable[[Any], Any]],
+    llm: Any,
+    max_rounds: int = 3,
+    max_debates: int = 8,
+    max_llm_in_flight: int = 4,
+    cache: LLMResponseCache | None = None,
+) -> List[Dict[str, Any]]:
+    """并发运行多场辩论，按输入顺序返回 [{"ticker", "ok", "result", "error", "elapsed"}]。
+
+    max_debates 限制同时进行的辩论场数，max_llm_in_flight 限制同时发出的 LLM 请求数。
+    """
+    wrapped = llm if isinstance(llm, CachedLLM) else CachedLLM(llm, cache, max_llm_in_flight)
+    graph = build_graph(wrapped, max_rounds)
+    gate = asyncio.Semaphore(max_debates)
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=max_debates, thread_name_prefix="debate")
+
+    async def one(event: Any) -> Dict[str, Any]:
+        async with gate:
+            start = time.time()
+            try:
+                result = await loop.run_in_executor(pool, graph, event)
+                return {"ticker": _event_key(event), "ok": True, "result": result, "error": None, "elapsed": time.time() - start}
+            except Exception as e:
+                return {"ticker": _event_key(event), "ok": False, "result": None, "error": f"{type(e).__name__}: {e}", "elapsed": time.time() - start}
+
+    try:
+        return list(await asyncio.gather(*(one(e) for e in events)))
+    finally:
+        pool.shutdown(wait=False)
+
+
+def run_debates(
+    events: Iterable[Any],
+    build_graph: Callable[[Any, int], Callable[[Any], Any]],
+    llm: Any,
+    max_rounds: int = 3,
+    max_debates: int = 8,
+    max_llm_in_flight: int = 4,
+    cache_path: str | None = "data/llm_cache.db",
+    ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+) -> List[Dict[str, Any]]:
+    """run_debates_async 的同步入口；cache_path 为 None 时不使用缓存。"""
+    cache = LLMResponseCache(cache_path, ttl_seconds) if cache_path else None
+    try:
+        return asyncio.run(run_debates_async(events, build_graph, llm, max_rounds, max_debates, max_llm_in_flight, cache))
+    finally:
+        if cache is not None:
+            cache.close()
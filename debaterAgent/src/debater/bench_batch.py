@@ -0,0 +1,108 @@
+"""
+批量辩论基准：串行 vs 并发 vs 缓存重跑
+
+使用带固定延迟的本地模拟LLM，不产生任何API费用：
+
+    cd debaterAgent/src
+    python -m debater.bench_batch --events 20 --rounds 3 --latency 0.2 --max-llm 4
+
+能导入 debater.graph / debater.roles 时使用真实的 build_debate_graph 与 DummyLLM
+（为其注入延迟）；否则使用每轮多空各调用一次LLM的简化辩论流程。
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+from debater.batch import run_debates
+
+
+class LatencyLLM:
+    """模拟LLM：每次调用固定等待 latency 秒，返回由提示词决定的确定性文本。"""
+
+    def __init__(self, latency: float = 0.2, inner: Any = None):
+        self.latency = latency
+        self.inner = inner
+        self.model = f"latency-{latency}"
+
+    def __call__(self, prompt: Any, *args: Any, **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        if self.inner is not None:
+            return self.inner(prompt, *args, **kwargs)
+        return f"观点：{str(prompt)[-40:]}"
+
+    def __getattr__(self, name: str) -> Any:
+        inner = self.__dict__.get("inner")
+        attr = getattr(inner, name)
+        if callable(attr):
+            def slow(*args, **kwargs):
+                time.sleep(self.latency)
+                return attr(*args, **kwargs)
+            return slow
+        return attr
+
+
+def simple_debate_graph(llm: Any, max_rounds: int):
+    """简化辩论流程：每轮多头、空头各一次LLM调用，最后一次总结。"""
+    def run(event: Dict[str, Any]) -> Dict[str, Any]:
+        topic = f"{event['name']}（{event['ticker']}）{event['changeType']} {event.get('industry', '')}"
+        turns = []
+        for i in range(1, max_rounds + 1):
+            for speaker in ("bull", "bear"):
+                claim = llm(f"第{i}轮 {speaker} 就 {topic} 发言")
+                turns.append({"round_index": i, "speaker": speaker, "claim": claim})
+        summary = llm(f"总结 {topic} 的多空分歧")
+        return {"event": event, "max_rounds": max_rounds, "turns": turns, "summary": {"notes": summary}}
+    return run
+
+
+def _load_graph_and_llm(latency: float):
+    try:
+        from debater.graph import build_debate_graph
+        from debater.roles import DummyLLM
+        return build_debate_graph, LatencyLLM(latency, DummyLLM())
+    except ImportError:
+        return simple_debate_graph, LatencyLLM(latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量辩论基准")
+    parser.add_argument("--events", type=int, default=20, help="事件（股票）数")
+    parser.add_argument("--rounds", type=int, default=3, help="辩论轮次")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟LLM单次延迟（秒）")
+    parser.add_argument("--max-debates", type=int, default=8, help="同时进行的辩论场数")
+    parser.add_argument("--max-llm", type=int, default=4, help="同时在途的LLM请求数")
+    args = parser.parse_args()
+
+    build_graph, llm = _load_graph_and_llm(args.latency)
+    events = [
+        {"ticker": f"{600000 + i}", "name": f"样本{i}", "changeType": "increase", "industry": "汽车制造"}
+        for i in range(args.events)
+    ]
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="llm_cache_"), "llm_cache.db")
+
+    start = time.time()
+    run_debates(events, build_graph, llm, args.rounds, max_debates=1, max_llm_in_flight=1, cache_path=None)
+    serial = time.time() - start
+
+    start = time.time()
+    results = run_debates(events, build_graph, llm, args.rounds, args.max_debates, args.max_llm, cache_path=cache_path)
+    concurrent = time.time() - start
+
+    start = time.time()
+    run_debates(events, build_graph, llm, args.rounds, args.max_debates, args.max_llm, cache_path=cache_path)
+    cached = time.time() - start
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"事件数: {args.events}，轮次: {args.rounds}，LLM延迟: {args.latency}s")
+    print(f"串行:     {serial:.2f} 秒")
+    print(f"并发:     {concurrent:.2f} 秒（辩论 {args.max_debates} 场 / LLM {args.max_llm} 路）")
+    print(f"缓存重跑: {cached:.2f} 秒")
+    if failed:
+        print(f"失败 {len(failed)} 场，例如: {failed[0]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+LLM 调用的持久化缓存与并发限制
+
+- LLMResponseCache：SQLite 保存 “请求内容哈希 → 响应”，带 TTL，过期条目按需清理；
+  响应以 JSON 保存（文本 + 元数据），不用 pickle，缓存库被篡改也不会执行任意代码；
+- CachedLLM：包装任意 LLM 对象（DummyLLM / OpenAI / DashScope 后端），
+  对其同步调用方法（__call__ / invoke / generate / chat）先查缓存，未命中时再真正请求，
+  并用信号量限制同时在途的请求数。其余属性原样透传。
+
+同一事件（ticker、changeType、industry 相同）重复分析时，辩论各轮的提示词不变，全部命中缓存。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Tuple
+
+CACHED_METHODS = ("__call__", "invoke", "generate", "chat")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+_MISS = object()
+
+
+def _canonical(value: Any) -> Any:
+    """把参数转成可稳定序列化的结构（pydantic 模型、dataclass 等取其字段）。"""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if hasattr(value, "model_dump"):
+        return _canonical(value.model_dump())
+    if hasattr(value, "dict") and callable(value.dict):
+        return _canonical(value.dict())
+    if hasattr(value, "__dict__"):
+        return {"__type__": type(value).__name__, **_canonical(vars(value))}
+    return repr(value)
+
+
+def llm_identity(llm: Any) -> str:
+    """缓存键中区分不同后端/模型的标识。"""
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or ""
+    return f"{type(llm).__module__}.{type(llm).__name__}:{model}"
+
+
+def cache_key(identity: str, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    payload = json.dumps([identity, method, _canonical(list(args)), _canonical(kwargs)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedMessage(NamedTuple):
+    """从缓存读回的聊天消息（如 AIMessage）：只保留文本与可 JSON 序列化的元数据。"""
+    content: str
+    metadata: Dict[str, Any]
+
+    @property
+    def text(self) -> str:
+        return self.content
+
+    def __str__(self) -> str:
+        return self.content
+
+
+# 聊天消息对象上随文本一起保存的元数据字段
+_MESSAGE_METADATA = ("response_metadata", "usage_metadata", "additional_kwargs")
+
+
+def _is_json(value: Any) -> bool:
+    try:
+        json.dumps(value, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def encode_response(value: Any) -> str | None:
+    """把响应编码成 JSON 文本；无法无损表示的对象返回 None（不缓存）。"""
+    if isinstance(value, str):
+        return json.dumps({"text": value}, ensure_ascii=False)
+    content = getattr(value, "content", None)
+    if isinstance(content, str):
+        metadata: Dict[str, Any] = {"type": type(value).__name__}
+        for attr in _MESSAGE_METADATA:
+            extra = getattr(value, attr, None)
+            if extra and _is_json(extra):
+                metadata[attr] = extra
+        return json.dumps({"text": content, "metadata": metadata}, ensure_ascii=False)
+    if _is_json(value):
+        return json.dumps({"json": value}, ensure_ascii=False)
+    return None
+
+
+def decode_response(payload: str | bytes) -> Any:
+    data = json.loads(payload)
+    if "text" in data:
+        return CachedMessage(data["text"], data["metadata"]) if "metadata" in data else data["text"]
+    return data["json"]
+
+
+class LLMResponseCache:
+    """LLM 响应缓存（SQLite，线程安全）。ttl_seconds 为 None 时永不过期。"""
+
+    def __init__(self, path: str = "data/llm_cache.db", ttl_seconds: float | None = DEFAULT_TTL_SECONDS):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # 无法 JSON 表示而未缓存的响应数
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,        -- encode_response 生成的 JSON
+                created_at REAL NOT NULL,
+                expires_at REAL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Any:
+        """命中返回缓存值，未命中或已过期返回内部哨兵 _MISS（用 is_miss 判断）。"""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT value, expires_at FROM llm_cache WHERE key=?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return _MISS
+            try:
+                value = decode_response(row[0])
+            except (ValueError, KeyError, TypeError):
+                # 旧版本写入的 pickle 条目或损坏的条目：按未命中处理，重新请求后覆盖
+                self.misses += 1
+                return _MISS
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires = now + self.ttl_seconds if self.ttl_seconds else None
+        payload = encode_response(value)
+        if payload is None:
+            with self._lock:
+                self.skipped += 1
+            return
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, expires),
+            )
+
+    def purge_expired(self) -> int:
+        """删除已过期条目，返回删除条数。"""
+        with self._lock, self.conn:
+            cur = self.conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "skipped": self.skipped, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def is_miss(value: Any) -> bool:
+    return value is _MISS
+
+
+class CachedLLM:
+    """LLM 包装器：缓存 + 在途请求数限制，见模块说明。
+
+    cache 为 None 时只做并发限制；max_in_flight 为 None 时不限制。
+    """
+
+    def __init__(self, llm: Any, cache: LLMResponseCache | None = None, max_in_flight: int | None = None):
+        self._llm = llm
+        self._cache = cache
+        self._identity = llm_identity(llm)
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.calls = 0  # 实际发给后端的请求数
+        self._calls_lock = threading.Lock()
+
+    def _call(self, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        target = self._llm if method == "__call__" else getattr(self._llm, method)
+        key = None
+        if self._cache is not None:
+            key = cache_key(self._identity, method, args, kwargs)
+            value = self._cache.get(key)
+            if not is_miss(value):
+                return value
+        if self._slots is not None:
+            with self._slots:
+                value = target(*args, **kwargs)
+        else:
+            value = target(*args, **kwargs)
+        with self._calls_lock:
+            self.calls += 1
+        if key is not None:
+            self._cache.put(key, value)
+        return value
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._call("__call__", args, kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._llm, name)
+        if name in CACHED_METHODS and callable(attr):
+            return lambda *args, **kwargs: self._call(name, args, kwargs)
+        return attr
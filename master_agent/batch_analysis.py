@@ -0,0 +1,131 @@
+"""
+多投资人批量分析：同一只股票的技术面/辩论/决策只计算一次
+
+葛卫东、葛贵莲等关联账户的持仓大量重合，逐个调用 analyze_investor 会让同一只股票
+被重复分析。analyze_investors 先汇总所有投资人的持仓并按股票代码去重，按股票并行
+执行分析，再把结果按投资人分发，单个投资人的结果结构与 analyze_investor 一致：
+
+    {
+        "investor": 投资人,
+        "success": bool,
+        "total_stocks": 持仓股票数,
+        "analyzed_stocks": 分析成功的股票数,
+        "duration_seconds": 本批次耗时,
+        "error": 错误信息或 None,
+        "results": {股票代码: {"holding_info": 该投资人的持仓, "technical": ..., "debate": ..., "decision": ...}},
+    }
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List
+
+
+def _stock_code(holding: Dict[str, Any]) -> str:
+    return str(holding.get("stock_code") or holding.get("code") or "")
+
+
+def collect_unique_stocks(holdings_by_investor: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """按股票代码合并所有投资人的持仓，返回 {股票代码: 首次出现的持仓记录}"""
+    unique: Dict[str, Dict[str, Any]] = {}
+    for holdings in holdings_by_investor.values():
+        for holding in holdings:
+            code = _stock_code(holding)
+            if code and code not in unique:
+                unique[code] = holding
+    return unique
+
+
+def analyze_investors(
+    investors: Iterable[str],
+    get_holdings: Callable[[str], List[Dict[str, Any]]],
+    analyze_stock: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+    max_workers: int = 4,
+    progress: Callable[[str, int, int], None] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """批量分析多个投资人，返回 {投资人: analyze_investor 同结构的结果}
+
+    get_holdings(investor) 返回持仓列表（如 DataManager.get_investor_holdings）；
+    analyze_stock(stock_code, holding_info) 对单只股票运行技术面、辩论、决策节点，
+    返回含 technical / debate / decision 的字典。每只股票只调用一次，
+    holding_info 为该股票首次出现的持仓记录，只应使用其中的股票级字段。
+    progress(stock_code, done, total) 在每只股票完成后回调。
+    """
+    start = time.time()
+    investors = list(dict.fromkeys(investors))
+    holdings_by_investor: Dict[str, List[Dict[str, Any]]] = {}
+    holding_errors: Dict[str, str] = {}
+    for investor in investors:
+        try:
+            holdings_by_investor[investor] = list(get_holdings(investor) or [])
+        except Exception as e:
+            holdings_by_investor[investor] = []
+            holding_errors[investor] = f"获取持仓失败: {e}"
+
+    unique = collect_unique_stocks(holdings_by_investor)
+    stock_results: Dict[str, Dict[str, Any]] = {}
+    stock_errors: Dict[str, str] = {}
+    if unique:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+            futures = {pool.submit(analyze_stock, code, holding): code for code, holding in unique.items()}
+            for done, fut in enumerate(as_completed(futures), 1):
+                code = futures[fut]
+                try:
+                    stock_results[code] = fut.result() or {}
+                except Exception as e:
+                    stock_errors[code] = str(e)
+                if progress is not None:
+                    progress(code, done, len(futures))
+
+    duration = time.time() - start
+    results: Dict[str, Dict[str, Any]] = {}
+    for investor in investors:
+        holdings = holdings_by_investor[investor]
+        per_stock: Dict[str, Dict[str, Any]] = {}
+        failed: List[str] = []
+        for holding in holdings:
+            code = _stock_code(holding)
+            if code in stock_results:
+                per_stock[code] = {**stock_results[code], "holding_info": holding}
+            elif code in stock_errors:
+                failed.append(f"{code}: {stock_errors[code]}")
+        error = holding_errors.get(investor)
+        if error is None and failed:
+            error = f"{len(failed)} 只股票分析失败（{'; '.join(failed[:5])}）"
+        results[investor] = {
+            "investor": investor,
+            "success": investor not in holding_errors and (bool(per_stock) or not holdings),
+            "total_stocks": len(holdings),
+            "analyzed_stocks": len(per_stock),
+            "duration_seconds": duration,
+            "error": error,
+            "results": per_stock,
+        }
+    return results
+
+
+def analyze_investors_with(
+    coordinator: Any,
+    investors: Iterable[str],
+    get_holdings: Callable[[str], List[Dict[str, Any]]] | None = None,
+    max_workers: int = 4,
+) -> Dict[str, Dict[str, Any]]:
+    """用协调器批量分析多个投资人，按协调器提供的接口选择去重方式：
+
+    - 协调器自带 analyze_investors(investors) 时直接调用；
+    - 有单股票入口 analyze_stock(stock_code, holding_info) 时，用上面的 analyze_investors
+      汇总持仓、每只股票只分析一次（get_holdings 默认取 DataManager().get_investor_holdings）；
+    - 两者都没有时退回逐个调用 analyze_investor，并打印提示：重合持仓会被重复分析。
+    """
+    investors = list(dict.fromkeys(investors))
+    if hasattr(coordinator, "analyze_investors"):
+        return coordinator.analyze_investors(investors)
+    if hasattr(coordinator, "analyze_stock"):
+        if get_holdings is None:
+            from master_agent.data_manager import DataManager
+            get_holdings = DataManager().get_investor_holdings
+        return analyze_investors(investors, get_holdings, coordinator.analyze_stock, max_workers=max_workers)
+    if len(investors) > 1:
+        print(f"⚠ {type(coordinator).__name__} 未提供 analyze_investors/analyze_stock，"
+              f"退回逐个投资人分析（{len(investors)} 人），重合持仓将重复分析")
+    return {investor: coordinator.analyze_investor(investor) for investor in investors}
@@ -0,0 +1,71 @@
+"""
+总控启动脚本的延迟初始化
+
+tushare / pandas / LangGraph 及各智能体的导入都较慢，启动脚本不再在模块导入时加载，
+而是在所选模式真正需要时调用这里的函数；每一步的耗时记录下来，可用 import_report 查看。
+"""
+
+import importlib
+import os
+import time
+import warnings
+from typing import Any, Dict, List, Tuple
+
+_timings: List[Tuple[str, float]] = []
+_loaded: Dict[str, Any] = {}
+_process_start = time.perf_counter()
+
+
+def timed_import(module: str) -> Any:
+    """导入模块并记录耗时（已导入的直接返回）。"""
+    if module in _loaded:
+        return _loaded[module]
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    _timings.append((module, time.perf_counter() - start))
+    _loaded[module] = mod
+    return mod
+
+
+def ensure_tushare() -> Any:
+    """加载 pandas 与 tushare，打 DataFrame.append 兼容补丁并设置 token，只执行一次。"""
+    if "tushare" in _loaded:
+        return _loaded["tushare"]
+
+    # 抑制pandas兼容性警告
+    warnings.filterwarnings('ignore', category=FutureWarning, module='tushare')
+    warnings.filterwarnings('ignore', category=FutureWarning, module='pandas')
+
+    pd = timed_import("pandas")
+    # pandas兼容性补丁 - 修复DataFrame.append()方法
+    if not hasattr(pd.DataFrame, 'append'):
+        def dataframe_append(self, other, ignore_index=False, verify_integrity=False, sort=False):
+            """兼容性补丁：模拟旧的DataFrame.append()方法"""
+            return pd.concat([self, other], ignore_index=ignore_index, sort=sort)
+
+        pd.DataFrame.append = dataframe_append
+
+    ts = timed_import("tushare")
+    token = os.getenv('TUSHARE_TOKEN')
+    if token:
+        ts.set_token(token)
+    else:
+        print("警告: 未设置TUSHARE_TOKEN环境变量，tushare功能可能无法正常使用")
+    return ts
+
+
+def load_coordinator_class() -> Any:
+    """分析模式所需：tushare 初始化 + LangGraph 协调器。"""
+    ensure_tushare()
+    return timed_import("master_agent.langgraph_coordinator").LangGraphCoordinator
+
+
+def import_report() -> str:
+    """各延迟导入的耗时及进程启动至今的总耗时。"""
+    lines = ["导入耗时:"]
+    for name, seconds in _timings:
+        lines.append(f"  {name:<40} {seconds * 1000:8.1f} ms")
+    if not _timings:
+        lines.append("  （未加载任何重型依赖）")
+    lines.append(f"  {'启动至今':<36} {(time.perf_counter() - _process_start) * 1000:8.1f} ms")
+    return "\n".join(lines)
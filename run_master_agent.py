@@ -5,48 +5,49 @@
 """
 
 import sys
-import os
+import re
+import argparse
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-# 添加tushare token配置
-import warnings
-import tushare as ts
-import os
-import pandas as pd
+# tushare / pandas / LangGraph 等重型依赖在所选模式需要时才加载，见 master_agent/lazy_init.py
+from master_agent.lazy_init import ensure_tushare, load_coordinator_class, timed_import, import_report
 
-# 抑制pandas兼容性警告
-warnings.filterwarnings('ignore', category=FutureWarning, module='tushare')
-warnings.filterwarnings('ignore', category=FutureWarning, module='pandas')
+MODES = {"gui": "1", "cli": "2", "langgraph": "3", "test": "4"}
 
-# pandas兼容性补丁 - 修复DataFrame.append()方法
-if not hasattr(pd.DataFrame, 'append'):
-    def dataframe_append(self, other, ignore_index=False, verify_integrity=False, sort=False):
-        """兼容性补丁：模拟旧的DataFrame.append()方法"""
-        return pd.concat([self, other], ignore_index=ignore_index, sort=sort)
-    
-    pd.DataFrame.append = dataframe_append
 
-token = os.getenv('TUSHARE_TOKEN')
-if token:
-    ts.set_token(token)
-else:
-    print("警告: 未设置TUSHARE_TOKEN环境变量，tushare功能可能无法正常使用")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="牛散投资分析总控智能体")
+    parser.add_argument("--mode", choices=list(MODES) + list(MODES.values()),
+                        help="运行模式（gui/cli/langgraph/test 或 1-4），指定后不再交互询问")
+    parser.add_argument("--investor", help="要分析的牛散姓名，langgraph 模式可用逗号分隔多个")
+    parser.add_argument("--import-report", action="store_true", help="结束时打印各依赖的导入耗时")
+    return parser.parse_args(argv)
+
 
-def main():
+def main(argv=None):
     """主启动函数"""
+    args = parse_args(argv)
+    try:
+        run(args)
+    finally:
+        if args.import_report:
+            print(import_report())
+
+
+def run(args):
     print("=" * 60)
     print("牛散投资分析总控智能体")
     print("=" * 60)
     
-    # 检查依赖
-    try:
-        import tkinter
+    # 检查依赖（只查找模块，不真正导入）
+    import importlib.util
+    if importlib.util.find_spec("tkinter") is not None:
         print("✓ GUI支持可用")
-    except ImportError:
+    else:
         print("✗ GUI支持不可用，将使用命令行模式")
     
     # 检查数据库
@@ -57,45 +58,53 @@ def main():
         print("⚠ 持仓数据库不存在，请先运行数据收集智能体")
     
     # 选择运行模式
-    print("\n请选择运行模式:")
-    print("1. 图形界面模式 (LangGraph模式)")
-    print("2. 命令行模式 (传统模式)")
-    print("3. LangGraph模式 (新一代架构)")
-    print("4. 测试模式")
-    
-    choice = input("\n请输入选择 (1-4, 默认1): ").strip()
+    if args.mode:
+        choice = MODES.get(args.mode, args.mode)
+    else:
+        print("\n请选择运行模式:")
+        print("1. 图形界面模式 (LangGraph模式)")
+        print("2. 命令行模式 (传统模式)")
+        print("3. LangGraph模式 (新一代架构)")
+        print("4. 测试模式")
+        
+        choice = input("\n请输入选择 (1-4, 默认1): ").strip()
     
     if choice == "2":
         # 命令行模式（传统）
-        investor = input("请输入要分析的牛散姓名 (如: 葛卫东): ").strip()
+        investor = args.investor or input("请输入要分析的牛散姓名 (如: 葛卫东): ").strip()
         if not investor:
             print("未输入投资人姓名，退出")
             return
             
-        from master_agent.main import run_cli_analysis
+        ensure_tushare()
+        run_cli_analysis = timed_import("master_agent.main").run_cli_analysis
         run_cli_analysis(investor)
         
     elif choice == "3":
         # LangGraph模式
-        investor = input("请输入要分析的牛散姓名 (如: 葛卫东): ").strip()
-        if not investor:
+        names = args.investor or input("请输入要分析的牛散姓名，多个用逗号分隔 (如: 葛卫东,葛贵莲): ").strip()
+        investors = [n for n in re.split(r"[,，\s]+", names) if n]
+        if not investors:
             print("未输入投资人姓名，退出")
             return
             
-        print(f"\n启动LangGraph模式分析: {investor}")
-        from master_agent.langgraph_coordinator import LangGraphCoordinator
+        print(f"\n启动LangGraph模式分析: {'、'.join(investors)}")
+        LangGraphCoordinator = load_coordinator_class()
         coordinator = LangGraphCoordinator()
-        result = coordinator.analyze_investor(investor)
-        
-        print(f"\n分析完成!")
-        print(f"成功: {result['success']}")
-        print(f"分析股票数量: {result['analyzed_stocks']}/{result['total_stocks']}")
-        print(f"耗时: {result['duration_seconds']:.2f}秒")
+        # 多个投资人：持仓去重后每只股票只分析一次，再按投资人分发结果（协调器不支持时会提示退回逐个分析）
+        from master_agent.batch_analysis import analyze_investors_with
+        results = analyze_investors_with(coordinator, investors)
         
-        if result['error']:
-            print(f"错误: {result['error']}")
-        else:
-            print("结果已保存到输出目录")
+        for investor, result in results.items():
+            print(f"\n{investor} 分析完成!")
+            print(f"成功: {result['success']}")
+            print(f"分析股票数量: {result['analyzed_stocks']}/{result['total_stocks']}")
+            print(f"耗时: {result['duration_seconds']:.2f}秒")
+            
+            if result['error']:
+                print(f"错误: {result['error']}")
+            else:
+                print("结果已保存到输出目录")
             
     elif choice == "4":
         # 测试模式
@@ -117,7 +126,7 @@ def main():
             
             # 测试LangGraph协调器
             try:
-                from master_agent.langgraph_coordinator import LangGraphCoordinator
+                LangGraphCoordinator = load_coordinator_class()
                 coordinator = LangGraphCoordinator()
                 print("✓ LangGraph协调器初始化成功")
             except Exception as e:
@@ -129,7 +138,6 @@ def main():
             import tkinter as tk
             from tkinter import ttk, messagebox
             import threading
-            from master_agent.langgraph_coordinator import LangGraphCoordinator
             
             class LangGraphGUI:
                 """基于LangGraph的图形界面"""
@@ -215,7 +223,10 @@ def main():
                 def run_analysis(self, investor):
                     """运行分析"""
                     try:
-                        self.coordinator = LangGraphCoordinator()
+                        # 复用同一个协调器，避免每次点击都重新初始化各智能体；
+                        # 重型依赖在第一次点击分析时才在后台线程加载，窗口可立即打开
+                        if self.coordinator is None:
+                            self.coordinator = load_coordinator_class()()
                         result = self.coordinator.analyze_investor(investor)
                         
                         # 在主线程中更新UI
@@ -0,0 +1,153 @@
+"""
+批量技术指标引擎：一次计算 (股票数 × K线数) 矩阵上全部股票的指标
+
+输入为按时间升序、右对齐的二维数组（每行一只股票，最后一列为最新K线，
+上市不足的股票左侧用 NaN 补齐，可由 ohlcv_store.stack_column 生成）。
+所有计算都沿时间轴对整张矩阵做向量运算，股票数增加基本不增加 Python 层开销。
+
+口径（与逐只股票用 pandas 计算的结果一致）：
+- MA(n)：rolling(n).mean()，窗口内有 NaN 时为 NaN；
+- EMA(n)：ewm(span=n, adjust=False).mean()，从第一根有效K线起算；
+- RSI(n)：Wilder 平滑，即涨跌幅分别做 ewm(alpha=1/n, adjust=False)，前 n 根为 NaN；
+- MACD：DIF = EMA12 − EMA26，DEA = EMA9(DIF)，柱 = 2 × (DIF − DEA)（国内行情软件口径）；
+- 布林带：中轨 MA20，上下轨 ± 2 × rolling(20).std(ddof=1)，带宽 = (上轨 − 下轨) / 中轨；
+- VWAP：典型价 (H+L+C)/3 按成交量的累计加权均价（自窗口第一根有效K线起）；
+- OBV：按收盘涨跌对成交量累加，第一根为 0。
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+MA_WINDOWS = (5, 10, 20, 60)
+EMA_SPANS = (12, 26)
+
+
+def _as_matrix(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.float64)
+    return arr.reshape(1, -1) if arr.ndim == 1 else arr
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """沿时间轴的滑动均值，窗口内存在 NaN 时结果为 NaN。"""
+    x = _as_matrix(x)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] < window:
+        return out
+    valid = np.isfinite(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    ccount = np.cumsum(valid, axis=1)
+    csum = np.concatenate([np.zeros((x.shape[0], 1)), csum], axis=1)
+    ccount = np.concatenate([np.zeros((x.shape[0], 1), dtype=ccount.dtype), ccount], axis=1)
+    sums = csum[:, window:] - csum[:, :-window]
+    counts = ccount[:, window:] - ccount[:, :-window]
+    out[:, window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """滑动标准差；先减去各行均值再累加平方，降低大数相消带来的误差。"""
+    x = _as_matrix(x)
+    center = np.nanmean(x, axis=1, keepdims=True) if x.size else x
+    center = np.where(np.isfinite(center), center, 0.0)
+    d = x - center
+    mean = rolling_mean(d, window)
+    mean_sq = rolling_mean(d * d, window)
+    var = (mean_sq - mean * mean) * window / (window - ddof)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def ewm(x: np.ndarray, alpha: float) -> np.ndarray:
+    """等价于 pandas ewm(alpha=alpha, adjust=False).mean()：从每行第一根有效值起递推，NaN 处沿用上一值。"""
+    x = _as_matrix(x)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        nxt = alpha * col + (1 - alpha) * prev
+        prev = np.where(np.isnan(prev), col, np.where(np.isnan(col), prev, nxt))
+        out[:, t] = prev
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    return ewm(x, 2.0 / (span + 1))
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    close = _as_matrix(close)
+    diff = np.diff(close, axis=1)
+    gain = np.where(diff > 0, diff, np.where(np.isnan(diff), np.nan, 0.0))
+    loss = np.where(diff < 0, -diff, np.where(np.isnan(diff), np.nan, 0.0))
+    avg_gain = ewm(gain, 1.0 / period)
+    avg_loss = ewm(loss, 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    value = np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, value)
+    # 每行前 period 个涨跌值不足以形成平滑，置为 NaN
+    seen = np.cumsum(np.isfinite(diff), axis=1)
+    value = np.where(seen >= period, value, np.nan)
+    return np.concatenate([np.full((close.shape[0], 1), np.nan), value], axis=1)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    dif = ema(close, fast) - ema(close, slow)
+    dea = ema(dif, signal)
+    return dif, dea, 2.0 * (dif - dea)
+
+
+def bollinger(close: np.ndarray, window: int = 20, k: float = 2.0) -> Dict[str, np.ndarray]:
+    mid = rolling_mean(close, window)
+    std = rolling_std(close, window)
+    upper, lower = mid + k * std, mid - k * std
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width = (upper - lower) / mid
+    return {"boll_upper": upper, "boll_middle": mid, "boll_lower": lower, "boll_width": width}
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    typical = (_as_matrix(high) + _as_matrix(low) + _as_matrix(close)) / 3.0
+    volume = _as_matrix(volume)
+    valid = np.isfinite(typical) & np.isfinite(volume)
+    pv = np.cumsum(np.where(valid, typical * volume, 0.0), axis=1)
+    vol = np.cumsum(np.where(valid, volume, 0.0), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = pv / vol
+    return np.where(vol > 0, out, np.nan)
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    close, volume = _as_matrix(close), _as_matrix(volume)
+    direction = np.sign(np.diff(close, axis=1))
+    step = np.where(np.isfinite(direction) & np.isfinite(volume[:, 1:]), direction * volume[:, 1:], 0.0)
+    out = np.concatenate([np.zeros((close.shape[0], 1)), np.cumsum(step, axis=1)], axis=1)
+    # 上市前（收盘价为 NaN）的位置保持 NaN
+    return np.where(np.isfinite(close), out, np.nan)
+
+
+def compute_all(close, high=None, low=None, volume=None) -> Dict[str, np.ndarray]:
+    """计算全部指标，返回 {指标名: (股票数 × K线数) 数组}。
+
+    缺少 high/low 时用 close 代替；缺少 volume 时不输出 VWAP 与 OBV。
+    """
+    close = _as_matrix(close)
+    high = close if high is None else _as_matrix(high)
+    low = close if low is None else _as_matrix(low)
+    result: Dict[str, np.ndarray] = {}
+    for n in MA_WINDOWS:
+        result[f"ma{n}"] = rolling_mean(close, n)
+    for n in EMA_SPANS:
+        result[f"ema{n}"] = ema(close, n)
+    result["rsi14"] = rsi(close, 14)
+    result["macd_dif"], result["macd_dea"], result["macd_hist"] = macd(close)
+    result.update(bollinger(close))
+    if volume is not None:
+        volume = _as_matrix(volume)
+        result["vwap"] = vwap(high, low, close, volume)
+        result["obv"] = obv(close, volume)
+    return result
+
+
+def latest(indicators: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """各指标的最新值（每只股票一个），用于全市场筛选。"""
+    return {name: values[:, -1] for name, values in indicators.items()}
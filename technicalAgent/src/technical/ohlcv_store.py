@@ -0,0 +1,215 @@
+"""
+本地列式K线存储：按 股票 × 时间框架 保存可内存映射的 OHLCV 数组，增量追加
+
+目录结构：
+    <root>/<timeframe>/<ticker>/
+        ts.i8        每根K线的时间戳（秒，int64）
+        open.f8 high.f8 low.f8 close.f8 volume.f8 amount.f8
+        meta.json    {"rows": 已提交的行数}
+
+- 每列是一个裸的 little-endian 数组文件，可直接 np.memmap，读取最近 N 根K线不复制数据；
+- append 只写入时间晚于已存最后一根的K线；各列先追加，最后更新 meta.json 的 rows，
+  中途中断时多出的尾部数据在下次追加前截掉；
+- update 配合数据源（akshare / tushare）只请求缺失区间，重复分析时基本都是本地读取。
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+
+TIMEFRAMES = ("daily", "weekly", "monthly", "5min", "30min", "60min")
+COLUMNS = ("open", "high", "low", "close", "volume", "amount")
+TS_FILE = "ts.i8"
+
+# 数据源字段名 → 标准列名（tushare: trade_date/vol；akshare: 中文列名）
+ALIASES = {
+    "date": "ts", "trade_date": "ts", "datetime": "ts", "trade_time": "ts", "日期": "ts", "时间": "ts",
+    "open": "open", "开盘": "open",
+    "high": "high", "最高": "high",
+    "low": "low", "最低": "low",
+    "close": "close", "收盘": "close",
+    "volume": "volume", "vol": "volume", "成交量": "volume",
+    "amount": "amount", "成交额": "amount",
+}
+
+
+def to_timestamps(values: Iterable[Any]) -> np.ndarray:
+    """把日期（"20250102" / "2025-01-02" / "2025-01-02 09:35:00" / date / datetime64）转成秒级 int64 时间戳。"""
+    out = []
+    for v in values:
+        if isinstance(v, (int, np.integer)) and not (19000101 <= int(v) <= 99991231):
+            out.append(int(v))
+            continue
+        if isinstance(v, (datetime, date)):
+            v = v.isoformat()
+        s = str(v).strip()
+        if len(s) == 8 and s.isdigit():
+            s = f"{s[:4]}-{s[4:6]}-{s[6:]}"
+        out.append(np.datetime64(s.replace(" ", "T"), "s").astype(np.int64))
+    return np.asarray(out, dtype=np.int64)
+
+
+def _normalize_bars(bars: Any) -> Dict[str, np.ndarray]:
+    """接受列字典、DataFrame 或K线字典列表，返回按时间升序、含 ts 与全部标准列的数组字典。"""
+    if isinstance(bars, list):
+        keys = set().union(*(b.keys() for b in bars)) if bars else set()
+        bars = {k: [b.get(k) for b in bars] for k in keys}
+    columns: Dict[str, Any] = {}
+    for key in list(bars.keys()):
+        std = ALIASES.get(str(key).lower(), ALIASES.get(str(key)))
+        if std and std not in columns:
+            columns[std] = list(bars[key])
+    if "ts" not in columns:
+        raise ValueError("K线数据缺少日期列（date / trade_date / 日期）")
+    n = len(columns["ts"])
+    result = {"ts": to_timestamps(columns["ts"])}
+    for col in COLUMNS:
+        values = columns.get(col)
+        result[col] = np.asarray(values, dtype=np.float64) if values is not None else np.full(n, np.nan)
+    order = np.argsort(result["ts"], kind="stable")
+    if not np.all(order == np.arange(n)):
+        result = {k: v[order] for k, v in result.items()}
+    # 同一时间戳只保留最后一条
+    if n > 1:
+        keep = np.append(result["ts"][1:] != result["ts"][:-1], True)
+        if not keep.all():
+            result = {k: v[keep] for k, v in result.items()}
+    return result
+
+
+class OhlcvStore:
+    """本地K线库，见模块说明。线程安全；同一目录不支持多进程同时写。
+
+    打开的 memmap 按 LRU 缓存，最多 max_open_maps 个（每只股票每列一个），
+    扫描全市场时文件句柄与映射数量不会随股票数增长。
+    """
+
+    def __init__(self, root: str = "data/ohlcv", max_open_maps: int = 256):
+        self.root = root
+        self.max_open_maps = max(1, max_open_maps)
+        self._lock = threading.Lock()
+        self._maps: "OrderedDict[tuple, tuple]" = OrderedDict()  # (timeframe, ticker, col) → (rows, memmap)
+
+    def _dir(self, ticker: str, timeframe: str) -> str:
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"不支持的时间框架: {timeframe}")
+        return os.path.join(self.root, timeframe, str(ticker))
+
+    def _read_rows(self, path: str) -> int:
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                return int(json.load(f).get("rows", 0))
+        except FileNotFoundError:
+            return 0
+
+    def length(self, ticker: str, timeframe: str = "daily") -> int:
+        return self._read_rows(self._dir(ticker, timeframe))
+
+    def last_timestamp(self, ticker: str, timeframe: str = "daily") -> np.datetime64 | None:
+        """最后一根K线的时间，尚无数据时返回 None。"""
+        ts = self.read(ticker, timeframe, 1)["ts"]
+        return ts[-1].astype("datetime64[s]") if len(ts) else None
+
+    def append(self, ticker: str, timeframe: str, bars: Any) -> int:
+        """追加K线，只写入晚于已存最后一根的部分，返回实际写入的根数。"""
+        data = _normalize_bars(bars)
+        path = self._dir(ticker, timeframe)
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            rows = self._read_rows(path)
+            if rows:
+                last = np.fromfile(os.path.join(path, TS_FILE), dtype="<i8", count=1, offset=(rows - 1) * 8)[0]
+                newer = data["ts"] > last
+                if not newer.all():
+                    data = {k: v[newer] for k, v in data.items()}
+            added = len(data["ts"])
+            if not added:
+                return 0
+            for col, suffix in [("ts", ".i8")] + [(c, ".f8") for c in COLUMNS]:
+                file_path = os.path.join(path, col + suffix)
+                dtype = "<i8" if col == "ts" else "<f8"
+                with open(file_path, "ab") as f:
+                    # 截掉上次中断留下的未提交尾部
+                    f.truncate(rows * 8)
+                    f.write(np.ascontiguousarray(data[col], dtype=dtype).tobytes())
+            tmp = os.path.join(path, "meta.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"ticker": str(ticker), "timeframe": timeframe, "rows": rows + added}, f)
+            os.replace(tmp, os.path.join(path, "meta.json"))
+        return added
+
+    def _column(self, path: str, key: tuple, col: str, rows: int) -> np.ndarray:
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == rows:
+            self._maps.move_to_end(key)
+            return cached[1]
+        dtype = "<i8" if col == "ts" else "<f8"
+        suffix = ".i8" if col == "ts" else ".f8"
+        arr = np.memmap(os.path.join(path, col + suffix), dtype=dtype, mode="r", shape=(rows,))
+        self._maps[key] = (rows, arr)
+        self._maps.move_to_end(key)
+        while len(self._maps) > self.max_open_maps:
+            # 淘汰最久未用的映射；调用方仍持有的视图在其释放前保持有效
+            self._maps.popitem(last=False)
+        return arr
+
+    def read(self, ticker: str, timeframe: str = "daily", periods: int | None = None,
+             columns: Iterable[str] = ("ts",) + COLUMNS) -> Dict[str, np.ndarray]:
+        """返回最近 periods 根K线（None 为全部），各列为只读 memmap 的切片视图，不复制数据。
+
+        ts 为秒级 int64，可用 arr.astype("datetime64[s]") 转为日期。
+        """
+        path = self._dir(ticker, timeframe)
+        rows = self._read_rows(path)
+        cols = list(columns)
+        if rows == 0:
+            return {c: np.empty(0, dtype=np.int64 if c == "ts" else np.float64) for c in cols}
+        start = max(0, rows - periods) if periods else 0
+        with self._lock:
+            return {c: self._column(path, (timeframe, str(ticker), c), c, rows)[start:] for c in cols}
+
+    def update(self, ticker: str, timeframe: str, fetch: Callable[[str | None], Any], until: Any = None) -> int:
+        """增量更新：fetch(start_date) 拉取 start_date（YYYYMMDD，含当天）之后的K线。
+
+        已有数据时 start_date 为最后一根K线的日期（数据源按日过滤，重复部分由 append 去掉）；
+        until 给定且本地最后一根不早于 until 时不调用 fetch，直接返回 0，节省接口额度。
+        """
+        last = self.last_timestamp(ticker, timeframe)
+        if last is not None and until is not None and last >= to_timestamps([until])[0].astype("datetime64[s]"):
+            return 0
+        start = None if last is None else str(last.astype("datetime64[D]")).replace("-", "")
+        bars = fetch(start)
+        if bars is None or len(bars) == 0:
+            return 0
+        return self.append(ticker, timeframe, bars)
+
+    def tickers(self, timeframe: str = "daily") -> List[str]:
+        base = os.path.join(self.root, timeframe)
+        if not os.path.isdir(base):
+            return []
+        return sorted(t for t in os.listdir(base) if os.path.exists(os.path.join(base, t, "meta.json")))
+
+    def close(self) -> None:
+        """释放缓存的 memmap（已返回给调用方的视图仍然有效）。"""
+        with self._lock:
+            self._maps.clear()
+
+
+def stack_column(store: OhlcvStore, tickers: List[str], column: str = "close", timeframe: str = "daily",
+                 periods: int = 250) -> Dict[str, Any]:
+    """把多只股票最近 periods 根K线的某一列按位置右对齐成 (股票数 × periods) 矩阵，不足的部分左侧补 NaN。
+
+    停牌造成的日期差异不做对齐，各行的最后一列都是该股票最新的一根K线。
+    返回 {"tickers": [...], "values": ndarray}，供批量指标计算使用。
+    """
+    values = np.full((len(tickers), periods), np.nan)
+    for i, ticker in enumerate(tickers):
+        col = store.read(ticker, timeframe, periods, columns=(column,))[column]
+        if len(col):
+            values[i, periods - len(col):] = col
+    return {"tickers": list(tickers), "values": values}